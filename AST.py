@@ -0,0 +1,277 @@
+"""
+The node classes of the abstract syntax tree built by the Parser class.
+Every node records the source offset where its phrase starts, and uses
+__slots__, so that the tree of a large program stays small.
+A field of a phrase that could not be parsed because of a syntax error is None.
+"""
+
+
+class Node:
+	"""
+	The base class of every node
+	"""
+	__slots__ = ("start",)
+
+	def __init__(self, start):
+		"""
+		Arguments:
+			start {int} -- the source offset of the first token of the phrase
+		"""
+		self.start = start
+
+
+class Identifier(Node):
+	"""
+	An identifier being declared, with the SymbolEntry the Analyzer entered for it
+	"""
+	__slots__ = ("symbol", "entry")
+
+	def __init__(self, start, symbol):
+		super(Identifier, self).__init__(start)
+		self.symbol = symbol
+		self.entry = None
+
+
+# declarations
+
+class SubprogramBody(Node):
+	"""
+	subprogramBody = subprogramSpecification "is" declarativePart
+			"begin" sequenceOfStatements "end" [ <procedure>identifier ] ";"
+	"""
+	__slots__ = ("name", "specified", "parameters", "declarations", "statements", "closed", "endName")
+
+	def __init__(self, start):
+		super(SubprogramBody, self).__init__(start)
+		# the procedure identifier, once it is accepted
+		self.name = None
+		# whether the whole subprogramSpecification was accepted
+		self.specified = False
+		self.parameters = []
+		self.declarations = []
+		self.statements = []
+		# whether "end" was accepted, which closes the scope of the procedure
+		self.closed = False
+		self.endName = None
+
+
+class ParameterSpecification(Node):
+	"""
+	parameterSpecification = identifierList ":" mode <type>name
+	"""
+	__slots__ = ("identifiers", "mode", "type")
+
+	def __init__(self, start, identifiers):
+		super(ParameterSpecification, self).__init__(start)
+		self.identifiers = identifiers
+		# the codes of the mode keywords ("in", "out")
+		self.mode = ()
+		self.type = None
+
+
+class NumberDeclaration(Node):
+	"""
+	numberDeclaration = identifierList ":" "constant" ":=" <static>expression ";"
+	"""
+	__slots__ = ("identifiers", "expression")
+
+	def __init__(self, start, identifiers, expression):
+		super(NumberDeclaration, self).__init__(start)
+		self.identifiers = identifiers
+		self.expression = expression
+
+
+class ObjectDeclaration(Node):
+	"""
+	objectDeclaration = identifierList ":" typeDefinition ";"
+	"""
+	__slots__ = ("identifiers", "type")
+
+	def __init__(self, start, identifiers, type):
+		super(ObjectDeclaration, self).__init__(start)
+		self.identifiers = identifiers
+		self.type = type
+
+
+class TypeDeclaration(Node):
+	"""
+	typeDeclaration = "type" identifier "is" typeDefinition ";"
+	"""
+	__slots__ = ("identifier", "type")
+
+	def __init__(self, start, identifier, type):
+		super(TypeDeclaration, self).__init__(start)
+		self.identifier = identifier
+		self.type = type
+
+
+# type definitions (a <type>name is a Name)
+
+class EnumerationType(Node):
+	"""
+	enumerationTypeDefinition = "(" identifierList ")"
+	"""
+	__slots__ = ("identifiers",)
+
+	def __init__(self, start, identifiers):
+		super(EnumerationType, self).__init__(start)
+		self.identifiers = identifiers
+
+
+class ArrayType(Node):
+	"""
+	arrayTypeDefinition = "array" "(" index { "," index } ")" "of" <type>name
+	"""
+	__slots__ = ("indexes", "elementType")
+
+	def __init__(self, start, indexes, elementType):
+		super(ArrayType, self).__init__(start)
+		# Range or <type>Name nodes
+		self.indexes = indexes
+		self.elementType = elementType
+
+
+class Range(Node):
+	"""
+	range = "range" simpleExpression ".." simpleExpression
+	"""
+	__slots__ = ("low", "high")
+
+	def __init__(self, start, low, high):
+		super(Range, self).__init__(start)
+		self.low = low
+		self.high = high
+
+
+# statements
+
+class NullStatement(Node):
+	"""
+	nullStatement = "null" ";"
+	"""
+	__slots__ = ()
+
+
+class ExitStatement(Node):
+	"""
+	exitStatement = "exit" [ "when" condition ] ";"
+	"""
+	__slots__ = ("condition",)
+
+	def __init__(self, start):
+		super(ExitStatement, self).__init__(start)
+		self.condition = None
+
+
+class AssignmentStatement(Node):
+	"""
+	assignmentStatement = <variable>name ":=" expression ";"
+	"""
+	__slots__ = ("target", "expression")
+
+	def __init__(self, start, target):
+		super(AssignmentStatement, self).__init__(start)
+		self.target = target
+		self.expression = None
+
+
+class ProcedureCallStatement(Node):
+	"""
+	procedureCallStatement = <procedure>name [ actualParameterPart ] ";"
+	the actual parameters are the indexes of the name, which have the same syntax
+	"""
+	__slots__ = ("name",)
+
+	def __init__(self, start, name):
+		super(ProcedureCallStatement, self).__init__(start)
+		self.name = name
+
+
+class PrintStatement(Node):
+	"""
+	a call of the predefined print procedure, which prints the values of its parameters
+	"""
+	__slots__ = ("name",)
+
+	def __init__(self, start, name):
+		super(PrintStatement, self).__init__(start)
+		self.name = name
+
+
+class IfStatement(Node):
+	"""
+	ifStatement = "if" condition "then" sequenceOfStatements
+			{ "elsif" condition "then" sequenceOfStatements }
+			[ "else" sequenceOfStatements ] "end" "if" ";"
+	"""
+	__slots__ = ("branches", "elseStatements")
+
+	def __init__(self, start):
+		super(IfStatement, self).__init__(start)
+		# (condition, statements) of "if" and each "elsif"
+		self.branches = []
+		self.elseStatements = None
+
+
+class LoopStatement(Node):
+	"""
+	loopStatement = [ "while" condition ] "loop" sequenceOfStatements "end" "loop" ";"
+	"""
+	__slots__ = ("condition", "statements")
+
+	def __init__(self, start):
+		super(LoopStatement, self).__init__(start)
+		self.condition = None
+		self.statements = []
+
+
+# expressions
+
+class Literal(Node):
+	"""
+	a numeric literal (int) or a string literal (str)
+	"""
+	__slots__ = ("value",)
+
+	def __init__(self, start, value):
+		super(Literal, self).__init__(start)
+		self.value = value
+
+
+class Name(Node):
+	"""
+	name = identifier [ indexedComponent ], with the SymbolEntry the Analyzer found for it
+	"""
+	__slots__ = ("symbol", "indexes", "entry")
+
+	def __init__(self, start, symbol):
+		super(Name, self).__init__(start)
+		self.symbol = symbol
+		# the expressions in parentheses, None without parentheses
+		self.indexes = None
+		self.entry = None
+
+
+class UnaryOperation(Node):
+	"""
+	a unary adding operator or "not" applied to an operand
+	"""
+	__slots__ = ("operator", "operand")
+
+	def __init__(self, start, operator, operand):
+		super(UnaryOperation, self).__init__(start)
+		self.operator = operator
+		self.operand = operand
+
+
+class BinaryOperation(Node):
+	"""
+	a binary operator applied to two operands
+	"""
+	__slots__ = ("operator", "left", "right")
+
+	def __init__(self, start, operator, left, right):
+		super(BinaryOperation, self).__init__(start)
+		self.operator = operator
+		self.left = left
+		self.right = right
@@ -0,0 +1,298 @@
+from SymbolTable import SymbolTable
+from SymbolEntry import SymbolEntry
+from NameTable import NameTable
+from Trampoline import trampoline
+from AST import SubprogramBody, NumberDeclaration, ObjectDeclaration, TypeDeclaration, \
+	EnumerationType, ArrayType, Range, \
+	ExitStatement, AssignmentStatement, ProcedureCallStatement, PrintStatement, \
+	IfStatement, LoopStatement, \
+	Name, UnaryOperation, BinaryOperation
+
+
+class Analyzer:
+	"""
+	The Analyzer class checks the roles of the identifiers in the syntax tree
+	built by the Parser class. It walks the tree in source order, declaring
+	identifiers in a SymbolTable and resolving each name to its SymbolEntry,
+	which the Evaluator uses afterwards.
+	Nested subprogram bodies and compound statements are checked by generators
+	run by trampoline(), and expressions over a stack of their own, so that
+	the depth of the tree is not limited by the recursion limit.
+	"""
+
+	# the predefined identifiers, built once and shared by every Analyzer
+	PRELUDE = SymbolTable.freezeScope((
+		("BOOLEAN", SymbolEntry.TYPE, None),
+		("CHAR", SymbolEntry.TYPE, None),
+		("INTEGER", SymbolEntry.TYPE, None),
+		("MATRIX", SymbolEntry.TYPE, None),
+		("PRINT", SymbolEntry.PROC, None),
+		("TRUE", SymbolEntry.CONST, True),
+		("FALSE", SymbolEntry.CONST, False),
+	))
+
+	def __init__(self, chario, table=None):
+		"""
+		Arguments:
+			chario {Chario} -- where the semantic errors are reported
+
+		Keyword Arguments:
+			table {SymbolTable, None} -- the SymbolTable to use, e.g. an InstrumentedSymbolTable,
+				a new SymbolTable over Analyzer.PRELUDE if omitted (default: {None})
+		"""
+		self.chario = chario
+		self.table = table if table is not None else SymbolTable(chario, self.PRELUDE)
+
+
+	def reset(self, chario):
+		"""
+		prepare the Analyzer for another program, reusing its symbol table
+		"""
+		self.chario = chario
+		self.table.reset(chario)
+
+
+	def analyze(self, tree):
+		"""
+		check the syntax tree of a program
+
+		Arguments:
+			tree {SubprogramBody} -- the tree returned by Parser.parse()
+		"""
+		self.subprogramBody(tree)
+
+
+	def pushSymbols(self, identifiers, role=None, value=None):
+		"""
+		push identifiers into the table stack
+
+		Arguments:
+			identifiers {[iterable]} -- container of Identifier nodes
+
+		Keyword Arguments:
+			role {[str, None]} -- SymbolEntry role constants, optional (default: {None})
+		"""
+		for identifier in identifiers:
+			identifier.entry = self.table.enterSymbol(identifier.symbol, role, value, identifier.start)
+
+
+	def acceptRole(self, identifier, expected, offset=None):
+		"""
+		accept the identifier is expected
+
+		Arguments:
+			identifier {int} -- NameTable ID of the identifier
+			expected {str} -- SymbolEntry role constants
+
+		Keyword Arguments:
+			offset {int, None} -- source offset of the identifier (default: {None})
+		"""
+		entry = self.table.findSymbol(identifier, offset)
+		if (not entry is None and entry.role != expected):
+			if expected == SymbolEntry.VAR and entry.role == SymbolEntry.PARAM:
+				return
+			self.chario.PrintErrorMessage(entry.name + ": expected " + expected + " identifier, not " + entry.role, offset)
+
+
+	def typeName(self, node):
+		"""
+		check a <type>name
+		"""
+		entry = self.name(node)
+		if entry != None and entry.role != SymbolEntry.TYPE:
+			self.chario.PrintErrorMessage(entry.name + ": expected " + SymbolEntry.TYPE + " identifier, not " + entry.role, node.start)
+
+
+	def subprogramBody(self, node):
+		"""
+		declare a procedure, and check its parameters, declarations and statements in its own scope
+		"""
+		trampoline(self.subprogramBodySteps(node))
+
+
+	def subprogramBodySteps(self, node):
+		"""
+		the steps of subprogramBody(), yielding the steps of the nested bodies and statements
+		"""
+		if node.name is not None:
+			node.name.entry = self.table.enterSymbol(node.name.symbol, SymbolEntry.PROC, None, node.name.start)
+		# the scope is opened even if the specification had errors,
+		# in order to keep the procedure's local identifiers inside it
+		self.table.enterScope()
+
+		for specification in node.parameters:
+			self.pushSymbols(specification.identifiers, SymbolEntry.PARAM)
+			if specification.type is not None:
+				self.typeName(specification.type)
+
+		for declaration in node.declarations:
+			if isinstance(declaration, SubprogramBody):
+				yield self.subprogramBodySteps(declaration)
+			else:
+				self.basicDeclaration(declaration)
+
+		yield self.sequenceOfStatementsSteps(node.statements)
+
+		if not node.closed:
+			return
+		self.table.exitScope()
+
+		# force <procedure>identifier
+		if node.endName is not None:
+			identifier = node.endName.symbol
+			start = node.endName.start
+			self.acceptRole(identifier, SymbolEntry.PROC, start)
+			if not node.specified:
+				self.chario.PrintErrorMessage(
+					"failed to check if [" + NameTable.Name(identifier) + "] is valid "+\
+					"after procedure's END keyword, because the procedure's "+\
+					"name was not recognized properly due to an error in "+\
+					"subprogram specification", start)
+			elif identifier != node.name.symbol:
+				self.chario.PrintErrorMessage(
+					"unexpected name [" + NameTable.Name(identifier) + "] was used after "+\
+					"END keyword in procedure [" + NameTable.Name(node.name.symbol) + "]. "+\
+					"it should be equal to the procedure's name ", start)
+
+
+	def basicDeclaration(self, node):
+		"""
+		check a declaration and declare its identifiers
+		"""
+		if isinstance(node, NumberDeclaration):
+			self.expression(node.expression)
+			self.pushSymbols(node.identifiers, SymbolEntry.CONST)
+		elif isinstance(node, ObjectDeclaration):
+			self.typeDefinition(node.type)
+			self.pushSymbols(node.identifiers, SymbolEntry.VAR)
+		elif isinstance(node, TypeDeclaration):
+			self.typeDefinition(node.type)
+			self.pushSymbols((node.identifier,), SymbolEntry.TYPE)
+		elif isinstance(node, SubprogramBody):
+			self.subprogramBody(node)
+
+
+	def typeDefinition(self, node):
+		"""
+		check a type definition, declaring the literals of an enumeration
+		"""
+		if isinstance(node, EnumerationType):
+			self.pushSymbols(node.identifiers, SymbolEntry.CONST)
+		elif isinstance(node, ArrayType):
+			for index in node.indexes:
+				self.typeDefinition(index)
+			self.typeName(node.elementType)
+		elif isinstance(node, Range):
+			self.expression(node.low)
+			self.expression(node.high)
+		elif isinstance(node, Name):
+			self.typeName(node)
+
+
+	def sequenceOfStatements(self, statements):
+		"""
+		check statements in order
+		"""
+		trampoline(self.sequenceOfStatementsSteps(statements))
+
+
+	def sequenceOfStatementsSteps(self, statements):
+		"""
+		the steps of sequenceOfStatements(), yielding the steps of the compound statements
+		"""
+		for statement in statements:
+			if isinstance(statement, (IfStatement, LoopStatement)):
+				yield self.compoundStatementSteps(statement)
+			else:
+				self.statement(statement)
+
+
+	def compoundStatementSteps(self, node):
+		"""
+		check the conditions and the statements of an if or a loop statement
+		"""
+		if isinstance(node, IfStatement):
+			for condition, statements in node.branches:
+				self.expression(condition)
+				yield self.sequenceOfStatementsSteps(statements)
+			if node.elseStatements is not None:
+				yield self.sequenceOfStatementsSteps(node.elseStatements)
+		else:
+			self.expression(node.condition)
+			yield self.sequenceOfStatementsSteps(node.statements)
+
+
+	def statement(self, node):
+		"""
+		check the names used in a statement and their roles
+		"""
+		if isinstance(node, AssignmentStatement):
+			# force <variable>name
+			entry = self.name(node.target)
+			if node.expression is None:
+				return
+			self.expression(node.expression)
+			if entry != None and entry.role not in (SymbolEntry.VAR, SymbolEntry.PARAM):
+				self.chario.PrintErrorMessage(\
+					entry.name + ": expected " + SymbolEntry.VAR + " or " +\
+					SymbolEntry.PARAM + " identifier, not " + entry.role, node.start)
+		elif isinstance(node, PrintStatement):
+			self.name(node.name)
+		elif isinstance(node, ProcedureCallStatement):
+			# force <procedure>name, before checking the actual parameters
+			name = node.name
+			name.entry = self.table.findSymbol(name.symbol, name.start)
+			if name.entry != None and name.entry.role != SymbolEntry.PROC:
+				self.chario.PrintErrorMessage(name.entry.name + ": expected " + SymbolEntry.PROC + " identifier, not " + name.entry.role, node.start)
+			self.expressions(name.indexes)
+		elif isinstance(node, (IfStatement, LoopStatement)):
+			trampoline(self.compoundStatementSteps(node))
+		elif isinstance(node, ExitStatement):
+			self.expression(node.condition)
+
+
+	def expressions(self, nodes):
+		"""
+		check a list of expressions, which may be None
+		"""
+		if nodes is not None:
+			for node in nodes:
+				self.expression(node)
+
+
+	def expression(self, node):
+		"""
+		check the names used in an expression, which may be None, in source order
+		"""
+		# the expressions still to check after the current one
+		nodes = []
+		while True:
+			if isinstance(node, Name):
+				node.entry = self.table.findSymbol(node.symbol, node.start)
+				if node.indexes is not None:
+					# the parser takes the actual parameters of a call for indexes
+					if node.entry != None and node.entry.role == SymbolEntry.PROC:
+						self.chario.PrintErrorMessage(node.entry.name + ": a " + SymbolEntry.PROC + " call is not an expression", node.start)
+					nodes.extend(reversed(node.indexes))
+			elif isinstance(node, BinaryOperation):
+				nodes.append(node.right)
+				node = node.left
+				continue
+			elif isinstance(node, UnaryOperation):
+				node = node.operand
+				continue
+			if not nodes:
+				return
+			node = nodes.pop()
+
+
+	def name(self, node):
+		"""
+		resolve a name to its entry, and check its indexes
+
+		Returns:
+			[SymbolEntry, None] -- the entry found
+		"""
+		node.entry = self.table.findSymbol(node.symbol, node.start)
+		self.expressions(node.indexes)
+		return node.entry
@@ -1,46 +1,290 @@
+import bisect
+import codecs
+import io
+import itertools
+import mmap
+
+from Const import Const
+from Diagnostics import Diagnostics
+
+
 class Chario:
 	"""
 	The Chario class (short for character I/O) converts
 	the source program’s text into a stream of characters for the scanner,
 	thus enabling the scanner to focus on lexical analysis
 	rather than low-level text processing.
-	The Chario class also handles the output of any error messages.
+	The Chario class also handles the output of any error messages,
+	which are collected by a Diagnostics instance.
 	"""
 
-	def __init__(self, sourceFileName):
+	# number of bytes converted at once while loading the source
+	CHUNK_SIZE = 1 << 16
+
+	# where a part of a source folded by FoldText() starts or ends:
+	# between tokens, inside a string literal, or inside an identifier
+	CODE, STRING, WORD = range(3)
+
+	def __init__(self, source, diagnostics=None, encoding="utf-8"):
 		"""
-		open an Ada source file(.txt extension)
+		load the whole text of an Ada source, so that reading and peeking
+		a character are plain index operations.
+		the source is either a file name, the raw bytes of a program,
+		or any readable stream (e.g. sys.stdin.buffer, a pipe);
+		use Chario.FromText() for a program held in a str
+
+		Arguments:
+			source {str, bytes, stream} -- the source program to read
+
+		Keyword Arguments:
+			diagnostics {Diagnostics, None} -- where the messages are reported,
+				a new text Diagnostics if omitted (default: {None})
+			encoding {str} -- the encoding of a source given as bytes (default: {"utf-8"})
 		"""
-		self.sourceFile = open(sourceFileName, 'rb')
+		self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+		# bytes are decoded chunk by chunk; a character split between
+		# two chunks is kept by the decoder until the next chunk arrives
+		self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+		self.foldState = self.CODE
 
+		if isinstance(source, (bytes, bytearray, memoryview)):
+			chunks = self.SplitChunks(source)
+		elif hasattr(source, "read"):
+			chunks = self.ReadChunks(source)
+		else:
+			chunks = self.MapChunks(source)
 
-	def GetNextChar(self):
+		self.Load(itertools.chain(chunks, self.FinalChunk()))
+
+
+	@classmethod
+	def FromBuffer(cls, buffer, diagnostics=None):
+		"""
+		create a Chario over text that is already decoded and converted,
+		e.g. a part of the buffer of another Chario
+
+		Arguments:
+			buffer {str} -- the converted text
+
+		Keyword Arguments:
+			diagnostics {Diagnostics, None} -- where the messages are reported (default: {None})
+		"""
+		chario = cls.__new__(cls)
+		chario.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+		chario.Load((buffer,))
+		return chario
+
+
+	@classmethod
+	def FromLineStarts(cls, lineStarts, diagnostics=None):
 		"""
-		Read a single character and convert it to lower case
+		create a Chario without text, which only converts offsets into
+		lines and columns for the messages, e.g. for tokens loaded from a token file
+
+		Arguments:
+			lineStarts {sequence} -- offsets of the first character of each line, starting with 0
+
+		Keyword Arguments:
+			diagnostics {Diagnostics, None} -- where the messages are reported (default: {None})
 		"""
-		escapeSequence = {b'\n' : "\n", b'\t' : "\t", b'\r' : "\r"}
+		chario = cls.__new__(cls)
+		chario.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+		chario.lineStarts = lineStarts
+		chario.buffer = ""
+		chario.position = 0
+		return chario
+
+
+	def Load(self, chunks):
+		"""
+		Join converted chunks into the buffer and put the cursor at its beginning
+		"""
+		# offsets of the first character of each line, collected chunk by chunk
+		# so that the scanner never has to count lines
+		self.lineStarts = [0]
+		parts = []
+		length = 0
+		for chunk in chunks:
+			newline = chunk.find("\n")
+			while newline >= 0:
+				self.lineStarts.append(length + newline + 1)
+				newline = chunk.find("\n", newline + 1)
+			parts.append(chunk)
+			length += len(chunk)
+
+		self.buffer = "".join(parts)
+		self.position = 0
+
+
+	@classmethod
+	def FromText(cls, text, diagnostics=None):
+		"""
+		create a Chario reading the program given as a str
+
+		Arguments:
+			text {str} -- the source program
+
+		Keyword Arguments:
+			diagnostics {Diagnostics, None} -- where the messages are reported (default: {None})
+		"""
+		return cls(io.StringIO(text), diagnostics)
+
+
+	def ConvertChunk(self, chunk, final=False):
+		"""
+		Decode a chunk of raw source and convert it into lower case text
+		"""
+		if not isinstance(chunk, str):
+			chunk = self.decoder.decode(chunk, final)
+		return self.FoldCase(chunk)
+
+
+	def FoldCase(self, text):
+		"""
+		Convert text into lower case except for the contents of string literals.
+		whether the text starts inside a string literal or an identifier
+		is remembered from the previous chunk
+		"""
+		text, self.foldState = self.FoldText(text, self.foldState)
+		return text
+
 
-		raw = self.sourceFile.read(1)
-		if raw == b'':
+	@staticmethod
+	def FoldText(text, state=CODE):
+		"""
+		Convert a part of a source into lower case except for the contents of string literals.
+		a quote opens a string literal only where the Scanner starts a token:
+		an identifier runs until a delimiter, so a quote inside it is part of the name
+
+		Arguments:
+			text {str} -- the part of the source
+
+		Keyword Arguments:
+			state {int} -- CODE, STRING or WORD, where the part starts (default: {CODE})
+
+		Returns:
+			[tuple] -- (the converted text, CODE, STRING or WORD where the part ends)
+		"""
+		delimiters = Const.DELIMITERS
+		parts = []
+		position = 0
+		while True:
+			if state == Chario.STRING:
+				end = text.find("\"", position)
+				if end < 0:
+					parts.append(text[position:])
+					return "".join(parts), state
+				parts.append(text[position:end + 1])
+				position = end + 1
+				state = Chario.CODE
+				continue
+
+			quote = text.find("\"", position)
+			end = len(text) if quote < 0 else quote
+			# the characters before the quote which are not delimiters are in an
+			# identifier if one of them starts a token as an alphabet
+			start = end
+			while start > position and text[start - 1] not in delimiters:
+				start -= 1
+			inWord = (start == position and state == Chario.WORD) \
+				or any(char.isalpha() for char in text[start:end])
+			state = Chario.WORD if inWord else Chario.CODE
+			if quote < 0:
+				parts.append(text[position:].lower())
+				return "".join(parts), state
+			parts.append(text[position:quote + 1].lower())
+			position = quote + 1
+			if not inWord:
+				state = Chario.STRING
+
+
+	def FinalChunk(self):
+		"""
+		Yield the text still held by the decoder at the end of the source, if any
+		"""
+		tail = self.ConvertChunk(b"", True)
+		if tail:
+			yield tail
+
+
+	def SplitChunks(self, data):
+		"""
+		Yield the text of an in-memory source chunk by chunk
+		"""
+		for start in range(0, len(data), self.CHUNK_SIZE):
+			yield self.ConvertChunk(data[start:start + self.CHUNK_SIZE])
+
+
+	def ReadChunks(self, stream):
+		"""
+		Yield the text of a stream chunk by chunk.
+		only read() is used, so pipes and other unseekable streams are fine
+		"""
+		while True:
+			chunk = stream.read(self.CHUNK_SIZE)
+			if not chunk:
+				return
+			yield self.ConvertChunk(chunk)
+
+
+	def MapChunks(self, sourceFileName):
+		"""
+		Map the source file into memory (or read it in large chunks if it cannot be mapped)
+		and yield its text chunk by chunk
+
+		Arguments:
+			sourceFileName {str} -- the name of the source file
+		"""
+		with open(sourceFileName, 'rb') as sourceFile:
+			try:
+				data = mmap.mmap(sourceFile.fileno(), 0, access=mmap.ACCESS_READ)
+			except (ValueError, OSError):
+				# empty files and special files cannot be mapped
+				yield from self.ReadChunks(sourceFile)
+				return
+
+			with data:
+				yield from self.SplitChunks(data)
+
+
+	def GetNextChar(self):
+		"""
+		Read a single character (already converted to lower case outside of string literals)
+		"""
+		if self.position >= len(self.buffer):
 			return "EOF"
-		elif raw in escapeSequence:
-			return escapeSequence[raw]
-		else:
-			return str(raw)[2:3].lower()
+
+		char = self.buffer[self.position]
+		self.position += 1
+		return char
 
 
 	def PeekNextChar(self):
 		"""
-		Read a single character without changing file pointer
+		Read a single character without moving the cursor
+		"""
+		if self.position >= len(self.buffer):
+			return "EOF"
+
+		return self.buffer[self.position]
+
+	def LineColumn(self, offset):
+		"""
+		Convert a source offset into a line and a column, both starting from 1
+
+		Arguments:
+			offset {int} -- the offset of a character in the source
+
+		Returns:
+			[tuple] -- (line, column)
 		"""
-		rtn = self.GetNextChar()
-		if rtn != "EOF":
-			self.sourceFile.seek(-1, 1)
+		line = bisect.bisect_right(self.lineStarts, offset)
+		return line, offset - self.lineStarts[line - 1] + 1
 
-		return rtn
 
-	def PrintErrorMessage(self, message):
+	def PrintErrorMessage(self, message, offset=None):
 		"""
-		Print an error message with prefix "E: "
+		Report an error message, which is printed with prefix "E: "
+		followed by "line:column: " if the offset of the error is known
 		"""
-		print("E: " + message)
+		self.diagnostics.Error(message, None if offset is None else self.LineColumn(offset))
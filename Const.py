@@ -1,82 +1,127 @@
 class Const:
 	"""
 	The Const class contains the reserved codes of the Token class.
+	Token codes are small integers, so that the parser compares them
+	as integers and classifies them with frozenset lookups;
+	Const.names converts a code back into its readable name.
 	"""
-	
-	# delimiter
+
+	# no instance attributes, so that Token instances keep their compact layout
+	__slots__ = ()
+
+	# characters ignored or delimiting tokens (not token codes)
 	BLANK =" "
-	NEWLINE ="\n"
 	TAB ="\t"
 	CR = "\r"
 	BACKSLASH = "\\"
-	COMMA = ","
-	COLON = ":"
-	SEMICOLON = ";"
-	DOT_DOT = ".."
-	PARENTHESIS_OPEN = "("
-	PARENTHESIS_CLOSE = ")"
-	COLON_EQ = ":="
+	# characters which end an identifier or a reserved word; "EOF" is what
+	# Chario.PeekNextChar() returns at the end of the source
+	DELIMITERS = frozenset((" ", "\n", "\r", "\t", "\\", ",", ":", "<", ">", "=", ";", "+", "-", "*", "/", "(", ")", "EOF"))
+
+	# delimiter
+	COMMA = 0
+	COLON = 1
+	SEMICOLON = 2
+	DOT_DOT = 3
+	PARENTHESIS_OPEN = 4
+	PARENTHESIS_CLOSE = 5
+	COLON_EQ = 6
+	NEWLINE = 7
 
 	# reserved words
-	IS ="is"
-	BEGIN = "begin"
-	END = "end"
-	RANGE = "range"
-	ARRAY = "array"
-	OF = "of"
-	IN = "in"
-	OUT = "out"
-	THEN = "then"
-	ELSIF = "elsif"
-	ELSE = "else"
-	WHEN = "when"
-	CONSTANT = "constant"
-	TYPE = "type"
-	PROC = "procedure"
-	EXIT = "exit"
-	IF = "if"
-	LOOP = "loop"
-	NULL ="null"		# page 249
-	WHILE = "while"
+	IS = 8
+	BEGIN = 9
+	END = 10
+	RANGE = 11
+	ARRAY = 12
+	OF = 13
+	IN = 14
+	OUT = 15
+	THEN = 16
+	ELSIF = 17
+	ELSE = 18
+	WHEN = 19
+	CONSTANT = 20
+	TYPE = 21
+	PROC = 22
+	EXIT = 23
+	IF = 24
+	LOOP = 25
+	NULL = 26		# page 249
+	WHILE = 27
 
 	# operators
-	PLUS ="+"
-	MINUS ="-"
-	MUL ="*"
-	DIV = "/"
-	SQUARE ="**"
-	EQ ="=" 
-	NE ="/=" 
-	LT ="<" 
-	LE ="<=" 
-	GT =">" 
-	GE =">="
-	MOD ="mod"	# note
-	NOT ="not"
-	AND ="and"
-	OR ="or"
+	PLUS = 28
+	MINUS = 29
+	MUL = 30
+	DIV = 31
+	SQUARE = 32
+	EQ = 33
+	NE = 34
+	LT = 35
+	LE = 36
+	GT = 37
+	GE = 38
+	MOD = 39	# note
+	NOT = 40
+	AND = 41
+	OR = 42
 
 	# special codes
-	ID = "identifier"
-	numericalLiteral = "numericalLiteral"
-	stringLiteral = "stringLiteral"
-	EOF = "EOF"
-	UET = "unexpectedToken"
-
-	basicDeclarationHandles = (ID, PROC, TYPE)
-	statementHandles = (EXIT, ID, IF, LOOP, NULL, WHILE)
-	relationalOperator = (EQ, NE, LT, LE, GT, GE,)
-	addingOperator = (PLUS, MINUS)
-	multiplyingOperator = (MUL, DIV, MOD)
-
-	reservedWords = (
-		IS, BEGIN, END, RANGE, ARRAY, OF, IN, OUT, 
-		THEN, ELSIF, ELSE, WHEN, CONSTANT, 
-		TYPE, PROC, 
-		EXIT, IF, LOOP, NULL, WHILE, 
-		MOD, NOT, AND, OR
+	ID = 43
+	numericalLiteral = 44
+	stringLiteral = 45
+	EOF = 46
+	UET = 47
+
+	# readable name of each code, indexed by the code
+	names = (
+		",", ":", ";", "..", "(", ")", ":=", "\n",
+		"is", "begin", "end", "range", "array", "of", "in", "out",
+		"then", "elsif", "else", "when", "constant",
+		"type", "procedure",
+		"exit", "if", "loop", "null", "while",
+		"+", "-", "*", "/", "**", "=", "/=", "<", "<=", ">", ">=",
+		"mod", "not", "and", "or",
+		"identifier", "numericalLiteral", "stringLiteral", "EOF", "unexpectedToken",
 	)
 
+	statementHandles = frozenset((EXIT, ID, IF, LOOP, NULL, WHILE))
+	relationalOperator = frozenset((EQ, NE, LT, LE, GT, GE,))
+	addingOperator = frozenset((PLUS, MINUS))
+	multiplyingOperator = frozenset((MUL, DIV, MOD))
+	# tokens that always appear at the end of a line
+	lineTerminatingTokens = frozenset((IS, LOOP, SEMICOLON, BEGIN, THEN, ELSE))
+	# tokens that end the discarded part of a line with a syntax error
+	lineEnds = frozenset((NEWLINE, EOF))
+	# tokens skipped before parsing a token
+	ignoredTokens = frozenset((NEWLINE, UET))
+
+	# codes of the tokens which have a value
+	valuedTokens = frozenset((ID, numericalLiteral, stringLiteral, UET))
+	# codes of the tokens whose value is a part of their descriptive string
+	printedValues = frozenset((numericalLiteral, ID, UET))
+	# codes of the literals whose value is sliced out of the source
+	literals = frozenset((numericalLiteral, stringLiteral))
+
+	# code of each reserved word, by its spelling
+	reservedWords = {
+		"is": IS, "begin": BEGIN, "end": END, "range": RANGE, "array": ARRAY,
+		"of": OF, "in": IN, "out": OUT, 
+		"then": THEN, "elsif": ELSIF, "else": ELSE, "when": WHEN, "constant": CONSTANT, 
+		"type": TYPE, "procedure": PROC, 
+		"exit": EXIT, "if": IF, "loop": LOOP, "null": NULL, "while": WHILE, 
+		"mod": MOD, "not": NOT, "and": AND, "or": OR
+	}
+
+	# code of each operator and delimiter symbol, by its spelling
+	operators = {
+		",": COMMA, ":": COLON, ";": SEMICOLON, "..": DOT_DOT,
+		"(": PARENTHESIS_OPEN, ")": PARENTHESIS_CLOSE, ":=": COLON_EQ,
+		"+": PLUS, "-": MINUS, "*": MUL, "/": DIV, "**": SQUARE,
+		"=": EQ, "/=": NE, "<": LT, "<=": LE, ">": GT, ">=": GE
+	}
+
 
 # factorOperator = pd.Series({
 # 	"SQUARE": "**"
@@ -0,0 +1,141 @@
+import json
+import sys
+
+
+class ErrorLimitExceeded(Exception):
+	"""
+	Raised when the number of reported errors reaches the limit of Diagnostics,
+	in order to stop the analysis early
+	"""
+
+
+class Diagnostics(object):
+	"""
+	The Diagnostics class collects every message of an analysis
+	(errors, recovery notes and the output of print) as records
+	and writes them in bulk, either as text or as JSON Lines.
+	Repeated identical errors can be coalesced into a single record with a count.
+	Since the count of an error may grow until the end, the records from the
+	first coalesced error on are kept until the final flush, so that the output
+	is the same whatever the size of the buffer.
+	"""
+
+	ERROR = "error"			# "E: ..." messages
+	NOTE = "note"			# discarded tokens
+	RECOVERY = "recovery"	# how the parser continues after a syntax error
+	OUTPUT = "output"		# values printed by the print procedure
+
+	FORMATS = ("text", "jsonl")
+
+	def __init__(self, stream=None, format="text", coalesce=False, maxErrors=None, bufferSize=4096):
+		"""
+		Keyword Arguments:
+			stream {file, None} -- where the records are written, sys.stdout if omitted (default: {None})
+			format {str} -- either "text" or "jsonl" (default: {"text"})
+			coalesce {bool} -- merge errors with the same message into one record (default: {False})
+			maxErrors {int, None} -- stop the analysis after this many errors (default: {None})
+			bufferSize {int} -- number of records kept before they are written (default: {4096})
+		"""
+		if format not in self.FORMATS:
+			raise ValueError("unknown diagnostics format: " + str(format))
+
+		self.stream = stream
+		self.format = format
+		self.coalesce = coalesce
+		self.maxErrors = maxErrors
+		self.bufferSize = bufferSize
+		self.errorCount = 0
+		self.records = []
+		# message -> the record of the first error with that message
+		self.coalesced = {}
+
+
+	def Report(self, kind, message, position=None):
+		"""
+		Buffer a record, merging it with an identical error if coalescing is enabled
+
+		Arguments:
+			kind {str} -- one of ERROR, NOTE, RECOVERY and OUTPUT
+			message {str} -- the message text
+
+		Keyword Arguments:
+			position {tuple, None} -- (line, column) of the message (default: {None})
+		"""
+		if kind == self.ERROR:
+			self.errorCount += 1
+			if self.coalesce and message in self.coalesced:
+				self.coalesced[message][4] += 1
+				self.CheckErrorLimit()
+				return
+
+		line, column = position if position is not None else (None, None)
+		record = [kind, message, line, column, 1]
+		self.records.append(record)
+		if kind == self.ERROR:
+			if self.coalesce:
+				self.coalesced[message] = record
+			self.CheckErrorLimit()
+
+		# a coalesced error holds back itself and every record after it
+		if len(self.records) >= self.bufferSize and not self.coalesced:
+			self.Flush()
+
+
+	def Error(self, message, position=None):
+		self.Report(self.ERROR, message, position)
+
+
+	def Note(self, message):
+		self.Report(self.NOTE, message)
+
+
+	def Recovery(self, message):
+		self.Report(self.RECOVERY, message)
+
+
+	def Output(self, message):
+		self.Report(self.OUTPUT, message)
+
+
+	def CheckErrorLimit(self):
+		"""
+		Raise ErrorLimitExceeded once the number of errors reaches maxErrors
+		"""
+		if self.maxErrors is not None and self.errorCount >= self.maxErrors:
+			raise ErrorLimitExceeded("too many errors (" + str(self.errorCount) + "), analysis stopped")
+
+
+	def FormatRecord(self, record):
+		"""
+		Convert a record into a line of output, including the newline
+		"""
+		kind, message, line, column, count = record
+
+		if self.format == "jsonl":
+			return json.dumps({
+				"kind": kind, "message": message,
+				"line": line, "column": column, "count": count
+			}) + "\n"
+
+		if kind == self.ERROR:
+			prefix = "E: " if line is None else "E: %d:%d: " % (line, column)
+			suffix = "" if count == 1 else " (" + str(count) + " times)"
+			return prefix + message + suffix + "\n"
+		elif kind == self.RECOVERY:
+			# recovery messages are followed by an empty line
+			return message + "\n\n"
+		else:
+			return message + "\n"
+
+
+	def Flush(self):
+		"""
+		Write all buffered records at once and empty the buffer
+		"""
+		if self.records:
+			stream = self.stream if self.stream is not None else sys.stdout
+			stream.write("".join([self.FormatRecord(record) for record in self.records]))
+			stream.flush()
+
+		self.records = []
+		self.coalesced = {}
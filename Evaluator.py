@@ -0,0 +1,206 @@
+from Const import Const
+from SymbolEntry import SymbolEntry
+from Trampoline import trampoline
+from AST import SubprogramBody, NumberDeclaration, ObjectDeclaration, AssignmentStatement, PrintStatement, \
+	IfStatement, LoopStatement, Literal, Name, UnaryOperation, BinaryOperation
+
+
+class Evaluator:
+	"""
+	The Evaluator class runs the print procedure calls of a syntax tree
+	checked by the Analyzer class. As the checker always did, it goes through
+	the statements once in source order without following the control flow:
+	constants and assigned variables keep their last value in their SymbolEntry,
+	and each print outputs the values of its parameters.
+	A value which cannot be computed (e.g. of an undefined name) is None.
+	Like the Analyzer, it walks nested bodies and statements with trampoline()
+	and expressions over a stack of its own.
+	"""
+
+	# operation of each binary operator
+	OPERATIONS = {
+		Const.AND : (lambda lhs, rhs : lhs and rhs),
+		Const.OR : (lambda lhs, rhs : lhs or rhs),
+		Const.EQ : (lambda lhs, rhs : lhs == rhs),
+		Const.NE : (lambda lhs, rhs : lhs != rhs),
+		Const.LT : (lambda lhs, rhs : lhs < rhs),
+		Const.LE : (lambda lhs, rhs : lhs <= rhs),
+		Const.GT : (lambda lhs, rhs : lhs > rhs),
+		Const.GE : (lambda lhs, rhs : lhs >= rhs),
+		Const.PLUS : (lambda lhs, rhs : lhs + rhs),
+		Const.MINUS : (lambda lhs, rhs : lhs - rhs),
+		Const.MUL : (lambda lhs, rhs : lhs * rhs),
+		Const.DIV : (lambda lhs, rhs : lhs // rhs),
+		Const.MOD : (lambda lhs, rhs : lhs % rhs),
+		Const.SQUARE : (lambda lhs, rhs : lhs ** rhs),
+	}
+
+	# operation of each unary operator; a unary adding operator multiplies its operand by the sign
+	UNARY_OPERATIONS = {
+		Const.NOT : (lambda lhs, rhs : not lhs),
+		Const.PLUS : (lambda lhs, rhs : lhs * 1),
+		Const.MINUS : (lambda lhs, rhs : lhs * -1),
+	}
+
+	def __init__(self, diagnostics):
+		"""
+		Arguments:
+			diagnostics {Diagnostics} -- where the output of print is written
+		"""
+		self.diagnostics = diagnostics
+
+
+	def evaluate(self, tree):
+		"""
+		run the syntax tree of a program
+
+		Arguments:
+			tree {SubprogramBody} -- the tree checked by Analyzer.analyze()
+		"""
+		self.subprogramBody(tree)
+
+
+	def calculate(self, lhs, rhs, operation):
+		"""
+		try to return operation(lhs, rhs), then return None if the operation fails
+		(e.g. on None or on operands of different types, or a division by zero)
+
+		Arguments:
+			lhs - left hand operand
+			rhs - right hand operand
+			operation - a lambda with two parameter which does return a value
+		"""
+		try:
+			return operation(lhs, rhs)
+		except Exception:
+			return None
+
+
+	def subprogramBody(self, node):
+		"""
+		give the constants their values, and run the statements
+		"""
+		trampoline(self.subprogramBodySteps(node))
+
+
+	def subprogramBodySteps(self, node):
+		"""
+		the steps of subprogramBody(), yielding the steps of the nested bodies and statements
+		"""
+		# forget the values of an earlier evaluation of the same tree
+		for specification in node.parameters:
+			self.forget(specification.identifiers)
+		for declaration in node.declarations:
+			if isinstance(declaration, (NumberDeclaration, ObjectDeclaration)):
+				self.forget(declaration.identifiers)
+
+		for declaration in node.declarations:
+			if isinstance(declaration, NumberDeclaration):
+				value = self.expression(declaration.expression)
+				for identifier in declaration.identifiers:
+					if identifier.entry is not None:
+						identifier.entry.value = value
+			elif isinstance(declaration, SubprogramBody):
+				yield self.subprogramBodySteps(declaration)
+
+		yield self.sequenceOfStatementsSteps(node.statements)
+
+
+	def forget(self, identifiers):
+		"""
+		clear the values of declared identifiers, which are None until they are given one
+		"""
+		for identifier in identifiers:
+			if identifier.entry is not None:
+				identifier.entry.value = None
+
+
+	def sequenceOfStatements(self, statements):
+		"""
+		run statements in order
+		"""
+		trampoline(self.sequenceOfStatementsSteps(statements))
+
+
+	def sequenceOfStatementsSteps(self, statements):
+		"""
+		the steps of sequenceOfStatements(), yielding the steps of the compound statements
+		"""
+		for statement in statements:
+			if isinstance(statement, (IfStatement, LoopStatement)):
+				yield self.compoundStatementSteps(statement)
+			else:
+				self.statement(statement)
+
+
+	def compoundStatementSteps(self, node):
+		"""
+		run the statements of an if or a loop statement
+		"""
+		if isinstance(node, IfStatement):
+			for condition, statements in node.branches:
+				yield self.sequenceOfStatementsSteps(statements)
+			if node.elseStatements is not None:
+				yield self.sequenceOfStatementsSteps(node.elseStatements)
+		else:
+			yield self.sequenceOfStatementsSteps(node.statements)
+
+
+	def statement(self, node):
+		"""
+		run an assignment or a print, and the statements inside a compound statement
+		"""
+		if isinstance(node, AssignmentStatement):
+			if node.expression is None:
+				return
+			value = self.expression(node.expression)
+			entry = node.target.entry
+			if entry != None and entry.role in (SymbolEntry.VAR, SymbolEntry.PARAM):
+				entry.value = value
+		elif isinstance(node, PrintStatement):
+			params = node.name.indexes if node.name.indexes is not None else []
+			self.diagnostics.Output(" ".join([str(self.expression(param)) for param in params]))
+		elif isinstance(node, (IfStatement, LoopStatement)):
+			trampoline(self.compoundStatementSteps(node))
+
+
+	def expression(self, node):
+		"""
+		compute the value of an expression
+		"""
+		# the operations whose operands are being computed, with the value
+		# of the left operand of a binary operation once it is known
+		operations = []
+		while True:
+			# go down to the first operand
+			while True:
+				if isinstance(node, BinaryOperation):
+					operations.append(node)
+					node = node.left
+				elif isinstance(node, UnaryOperation):
+					operations.append(node)
+					node = node.operand
+				else:
+					break
+			if isinstance(node, Literal):
+				value = node.value
+			elif isinstance(node, Name):
+				value = node.entry.value if node.entry != None else None
+			else:
+				value = None
+
+			# apply the operations whose operands are all computed,
+			# until the right operand of a binary operation is next
+			while operations:
+				operation = operations.pop()
+				if isinstance(operation, tuple):
+					operation, lhs = operation
+					value = self.calculate(lhs, value, self.OPERATIONS[operation.operator])
+				elif isinstance(operation, UnaryOperation):
+					value = self.calculate(value, None, self.UNARY_OPERATIONS[operation.operator])
+				else:
+					operations.append((operation, value))
+					node = operation.right
+					break
+			else:
+				return value
@@ -0,0 +1,197 @@
+from Token import Token
+
+
+class Grammar:
+	"""
+	The Grammar class holds a context-free grammar as plain data,
+	and computes the FIRST and FOLLOW sets of its nonterminals.
+	A production maps a nonterminal to its alternatives, and an alternative
+	is a tuple of symbols: a token code (int) or a nonterminal (str).
+	The empty tuple is the empty alternative, so the { } and [ ] of the EBNF
+	are written as nonterminals of their own.
+	parseTable() checks that the grammar is LL(1), as the recovery sets
+	of the Parser class assume.
+	"""
+
+	def __init__(self, productions, start):
+		"""
+		Arguments:
+			productions {dict} -- nonterminal -> tuple of alternatives
+			start {str} -- the start nonterminal
+		"""
+		self.productions = productions
+		self.start = start
+		self.nullable = set()
+		# nonterminal -> frozenset of token codes
+		self.FIRST = {}
+		self.FOLLOW = {}
+		self.computeFirst()
+		self.computeFollow()
+
+
+	def first(self, symbols):
+		"""
+		return the FIRST set of a sequence of symbols,
+		and whether the whole sequence can derive the empty string
+
+		Arguments:
+			symbols {tuple} -- token codes and nonterminals
+
+		Returns:
+			[tuple] -- (set of token codes, bool)
+		"""
+		codes = set()
+		for symbol in symbols:
+			if isinstance(symbol, int):
+				codes.add(symbol)
+				return codes, False
+			codes |= self.FIRST.get(symbol, frozenset())
+			if symbol not in self.nullable:
+				return codes, False
+		return codes, True
+
+
+	def computeFirst(self):
+		"""
+		compute the nullable nonterminals and the FIRST sets, until nothing changes
+		"""
+		first = {nonterminal: set() for nonterminal in self.productions}
+		self.FIRST = first
+		changed = True
+		while changed:
+			changed = False
+			for nonterminal, alternatives in self.productions.items():
+				for alternative in alternatives:
+					codes, nullable = self.first(alternative)
+					if not codes <= first[nonterminal]:
+						first[nonterminal] |= codes
+						changed = True
+					if nullable and nonterminal not in self.nullable:
+						self.nullable.add(nonterminal)
+						changed = True
+		self.FIRST = {nonterminal: frozenset(codes) for nonterminal, codes in first.items()}
+
+
+	def computeFollow(self):
+		"""
+		compute the FOLLOW sets, until nothing changes
+		"""
+		follow = {nonterminal: set() for nonterminal in self.productions}
+		changed = True
+		while changed:
+			changed = False
+			for nonterminal, alternatives in self.productions.items():
+				for alternative in alternatives:
+					for position, symbol in enumerate(alternative):
+						if isinstance(symbol, int):
+							continue
+						codes, nullable = self.first(alternative[position + 1:])
+						if nullable:
+							codes |= follow[nonterminal]
+						if not codes <= follow[symbol]:
+							follow[symbol] |= codes
+							changed = True
+		self.FOLLOW = {nonterminal: frozenset(codes) for nonterminal, codes in follow.items()}
+
+
+	def parseTable(self):
+		"""
+		compute the LL(1) parse table of the grammar: the alternative of a nonterminal
+		is predicted by the next token, which is in the FIRST set of the alternative,
+		or in the FOLLOW set of the nonterminal for an alternative deriving the empty string
+
+		Returns:
+			[dict] -- nonterminal -> {token code -> alternative}; a missing code is a syntax error
+
+		Raises:
+			ValueError: two alternatives of a nonterminal are predicted by the same token,
+				i.e. the grammar is not LL(1)
+		"""
+		table = {}
+		for nonterminal, alternatives in self.productions.items():
+			row = table[nonterminal] = {}
+			for alternative in alternatives:
+				codes, nullable = self.first(alternative)
+				if nullable:
+					codes |= self.FOLLOW[nonterminal]
+				for code in codes:
+					if code in row:
+						raise ValueError("the grammar is not LL(1): [" + Token.names[code] +
+							"] predicts two alternatives of " + nonterminal)
+					row[code] = alternative
+		return table
+
+
+# the syntax of TinyAda over the tokens the parser sees (newlines are ignored),
+# written the way the Parser class recognizes it:
+# the actualParameterPart of a procedure call is parsed as the indexes of its name,
+# and an expression is a chain of operator levels
+TINYADA = Grammar({
+	"program": (("subprogramBody", Token.EOF),),
+	"subprogramBody": (("subprogramSpecification", Token.IS, "declarativePart",
+		Token.BEGIN, "sequenceOfStatements", Token.END, "endName", Token.SEMICOLON),),
+	"endName": ((Token.ID,), ()),
+	"declarativePart": (("basicDeclaration", "declarativePart"), ()),
+	"basicDeclaration": (("numberOrObjectDeclaration",), ("typeDeclaration",), ("subprogramBody",)),
+	"numberOrObjectDeclaration": (("identifierList", Token.COLON, "declarationRest"),),
+	"declarationRest": (
+		(Token.CONSTANT, Token.COLON_EQ, "expression", Token.SEMICOLON),
+		("typeDefinition", Token.SEMICOLON)),
+	"identifierList": ((Token.ID, "identifierListTail"),),
+	"identifierListTail": ((Token.COMMA, Token.ID, "identifierListTail"), ()),
+	"typeDeclaration": ((Token.TYPE, Token.ID, Token.IS, "typeDefinition", Token.SEMICOLON),),
+	"typeDefinition": (("enumerationTypeDefinition",), ("arrayTypeDefinition",), ("range",), ("name",)),
+	"range": ((Token.RANGE, "simpleExpression", Token.DOT_DOT, "simpleExpression"),),
+	"index": (("range",), ("name",)),
+	"enumerationTypeDefinition": ((Token.PARENTHESIS_OPEN, "identifierList", Token.PARENTHESIS_CLOSE),),
+	"arrayTypeDefinition": ((Token.ARRAY, Token.PARENTHESIS_OPEN, "index", "indexTail",
+		Token.PARENTHESIS_CLOSE, Token.OF, "name"),),
+	"indexTail": ((Token.COMMA, "index", "indexTail"), ()),
+	"subprogramSpecification": ((Token.PROC, Token.ID, "formalPartOption"),),
+	"formalPartOption": (("formalPart",), ()),
+	"formalPart": ((Token.PARENTHESIS_OPEN, "parameterSpecification", "parameterTail", Token.PARENTHESIS_CLOSE),),
+	"parameterTail": ((Token.SEMICOLON, "parameterSpecification", "parameterTail"), ()),
+	"parameterSpecification": (("identifierList", Token.COLON, "mode", "name"),),
+	"mode": ((Token.IN, "outOption"), (Token.OUT,), ()),
+	"outOption": ((Token.OUT,), ()),
+
+	"sequenceOfStatements": (("statement", "statementTail"),),
+	"statementTail": (("statement", "statementTail"), ()),
+	"statement": (("simpleStatement",), ("compoundStatement",)),
+	"simpleStatement": (("nullStatement",), ("nameStatement",), ("exitStatement",)),
+	"nameStatement": (("name", "nameStatementRest"),),
+	"nameStatementRest": ((Token.COLON_EQ, "expression", Token.SEMICOLON), (Token.SEMICOLON,)),
+	"nullStatement": ((Token.NULL, Token.SEMICOLON),),
+	"exitStatement": ((Token.EXIT, "whenOption", Token.SEMICOLON),),
+	"whenOption": ((Token.WHEN, "condition"), ()),
+	"compoundStatement": (("ifStatement",), ("loopStatement",)),
+	"ifStatement": ((Token.IF, "condition", Token.THEN, "sequenceOfStatements",
+		"elsifPart", "elsePart", Token.END, Token.IF, Token.SEMICOLON),),
+	"elsifPart": ((Token.ELSIF, "condition", Token.THEN, "sequenceOfStatements", "elsifPart"), ()),
+	"elsePart": ((Token.ELSE, "sequenceOfStatements"), ()),
+	"loopStatement": (("iterationSchemeOption", Token.LOOP, "sequenceOfStatements",
+		Token.END, Token.LOOP, Token.SEMICOLON),),
+	"iterationSchemeOption": (("iterationScheme",), ()),
+	"iterationScheme": ((Token.WHILE, "condition"),),
+
+	"condition": (("expression",),),
+	"expression": (("relation", "logicalTail"),),
+	"logicalTail": ((Token.AND, "relation", "andTail"), (Token.OR, "relation", "orTail"), ()),
+	"andTail": ((Token.AND, "relation", "andTail"), ()),
+	"orTail": ((Token.OR, "relation", "orTail"), ()),
+	"relation": (("simpleExpression", "relationTail"),),
+	"relationTail": tuple((operator, "simpleExpression") for operator in sorted(Token.relationalOperator)) + ((),),
+	"simpleExpression": (("signOption", "term", "addingTail"),),
+	"signOption": tuple((operator,) for operator in sorted(Token.addingOperator)) + ((),),
+	"addingTail": tuple((operator, "term", "addingTail") for operator in sorted(Token.addingOperator)) + ((),),
+	"term": (("factor", "multiplyingTail"),),
+	"multiplyingTail": tuple((operator, "factor", "multiplyingTail") for operator in sorted(Token.multiplyingOperator)) + ((),),
+	"factor": (("primary", "exponentOption"), (Token.NOT, "primary")),
+	"exponentOption": ((Token.SQUARE, "primary"), ()),
+	"primary": ((Token.numericalLiteral,), (Token.stringLiteral,), ("name",),
+		(Token.PARENTHESIS_OPEN, "expression", Token.PARENTHESIS_CLOSE)),
+	"name": ((Token.ID, "nameSuffix"),),
+	"nameSuffix": (("indexedComponent",), ()),
+	"indexedComponent": ((Token.PARENTHESIS_OPEN, "expression", "expressionListTail", Token.PARENTHESIS_CLOSE),),
+	"expressionListTail": ((Token.COMMA, "expression", "expressionListTail"), ()),
+}, "program")
@@ -0,0 +1,447 @@
+import bisect
+import itertools
+import sys
+
+from Const import Const
+from Chario import Chario
+from Scanner import Scanner
+from Parser import Parser
+from Analyzer import Analyzer
+from Evaluator import Evaluator
+from Diagnostics import Diagnostics
+from AST import Node, SubprogramBody
+
+
+class BodyParser(Parser):
+	"""
+	A Parser which records, for each subprogram body it parses, the range of
+	tokens it consumed and the diagnostics it reported, where the records of
+	a nested body are replaced by the body itself.
+	The parse of a body only depends on its tokens, so it can be parsed again alone.
+	"""
+
+	def __init__(self, chario, tokens):
+		"""
+		Arguments:
+			chario {Chario} -- the instance of Chario
+			tokens {list} -- the tokens of the whole source, up to and including EOF
+		"""
+		self.tokenList = tokens
+		# body -> [index of its first token, index of the token after it]
+		self.ranges = {}
+		# body -> its diagnostics and nested bodies, in the order they were reported
+		self.items = {}
+		super(BodyParser, self).__init__(chario, ())
+
+
+	def indexOf(self, token):
+		"""
+		return the index of a token of the source, whose starts are increasing
+		"""
+		tokens = self.tokenList
+		low, high = 0, len(tokens) - 1
+		while low < high:
+			middle = (low + high) // 2
+			if tokens[middle].start < token.start:
+				low = middle + 1
+			else:
+				high = middle
+		return low
+
+
+	def parseBody(self, first):
+		"""
+		parse the subprogram body starting at a token
+
+		Arguments:
+			first {int} -- the index of the first token of the body
+
+		Returns:
+			[SubprogramBody] -- the new body
+		"""
+		self.reset(itertools.islice(self.tokenList, first, None), self.chario)
+		return self.subprogramBody()
+
+
+	def subprogramBody(self):
+		first = self.indexOf(self.token)
+		outer, self.diagnostics.records = self.diagnostics.records, []
+		node = super(BodyParser, self).subprogramBody()
+		self.items[node], self.diagnostics.records = self.diagnostics.records, outer
+		outer.append(node)
+		# the token after the body was already taken from the token stream
+		self.ranges[node] = [first, self.indexOf(self.token)]
+		return node
+
+
+class BodyAnalyzer(Analyzer):
+	"""
+	An Analyzer which records, for each subprogram body it checks, the state of
+	the symbol table at its start and the diagnostics it reported, where the records
+	of a nested body are replaced by the body itself.
+	"""
+
+	def __init__(self, chario):
+		super(BodyAnalyzer, self).__init__(chario)
+		# body -> SymbolTable.snapshot() taken before the body declares its name
+		self.snapshots = {}
+		self.items = {}
+
+
+	def subprogramBodySteps(self, node):
+		self.snapshots[node] = self.table.snapshot()
+		outer, self.chario.diagnostics.records = self.chario.diagnostics.records, []
+		yield from super(BodyAnalyzer, self).subprogramBodySteps(node)
+		self.items[node], self.chario.diagnostics.records = self.chario.diagnostics.records, outer
+		outer.append(node)
+
+
+class IncrementalChecker:
+	"""
+	The IncrementalChecker class keeps the tokens, the syntax tree and the
+	diagnostics of a program between edits of its text, e.g. in an editor.
+	An edit re-scans the lines it damaged, then parses and checks again
+	the innermost subprogram body around the damaged tokens, starting from
+	the symbol table state captured at the start of that body; the results of
+	everything else are reused. If the body ends at another token than before,
+	or does not leave the same symbol table to the rest of its enclosing body,
+	the enclosing body is done again instead, up to the whole program.
+	The diagnostics reported are identical to those of a full check.
+	"""
+
+	def __init__(self, text=""):
+		"""
+		Arguments:
+			text {str} -- the source program (default: {""})
+		"""
+		# the diagnostics of the passes are recorded, never written
+		self.recorder = Diagnostics(bufferSize=sys.maxsize)
+		self.check(text)
+
+
+	def check(self, text):
+		"""
+		scan, parse and check a whole program
+
+		Arguments:
+			text {str} -- the source program
+		"""
+		self.text = text
+		self.buffer = Chario.FoldText(text)[0]
+		self.chario = Chario.FromBuffer(self.buffer, self.recorder)
+		self.tokens = list(Scanner(self.chario))
+		self.detach(self.tokens)
+		self.parser = BodyParser(self.chario, self.tokens)
+		self.analyzer = BodyAnalyzer(self.chario)
+		self.checkProgram()
+
+
+	def detach(self, tokens):
+		"""
+		take the values of literals out of the buffer, so that the tokens
+		do not keep old buffers alive and can be moved by an edit
+		"""
+		for token in tokens:
+			if token.source is not None:
+				token.value
+				token.source = None
+
+
+	def checkProgram(self):
+		"""
+		parse and check the whole program over the current tokens
+		"""
+		self.parser.ranges.clear()
+		self.parser.items.clear()
+		self.analyzer.snapshots.clear()
+		self.analyzer.items.clear()
+
+		# an unexpected token before the program is reported outside of its body
+		self.recorder.records = []
+		self.parser.reset(self.tokens, self.chario)
+		self.tree = self.parser.subprogramBody()
+		self.syntaxItems = self.recorder.records
+
+		self.recorder.records = []
+		self.analyzer.reset(self.chario)
+		self.analyzer.subprogramBody(self.tree)
+		self.semanticItems = self.recorder.records
+
+
+	def edit(self, start, end, text):
+		"""
+		replace a part of the program and check it again
+
+		Arguments:
+			start {int} -- the offset of the first character replaced
+			end {int} -- the offset after the last character replaced
+			text {str} -- the new text of the part
+		"""
+		old = self.text
+		new = old[:start] + text + old[end:]
+		delta = len(new) - len(old)
+
+		# the damaged lines, from the start of the line of start to the end of the line of end
+		lineStart = old.rfind("\n", 0, start) + 1
+		oldLineEnd = old.find("\n", end)
+		oldLineEnd = len(old) if oldLineEnd < 0 else oldLineEnd + 1
+		newLineEnd = oldLineEnd + delta
+
+		# fold the damaged lines, and the rest of the text if the edit changed
+		# whether it starts inside a string literal
+		# (a line starts either between tokens or inside a string literal)
+		state = Chario.STRING if self.inString(lineStart) else Chario.CODE
+		folded, state = Chario.FoldText(new[lineStart:newLineEnd], state)
+		sameTail = state == (Chario.STRING if self.inString(oldLineEnd) else Chario.CODE)
+		tail = self.buffer[oldLineEnd:] if sameTail else Chario.FoldText(new[newLineEnd:], state)[0]
+		buffer = self.buffer[:lineStart] + folded + tail
+		if len(buffer) != len(new) or len(self.buffer) != len(old):
+			# the case conversion changed the length of some characters
+			self.check(new)
+			return
+
+		oldLineStarts = self.chario.lineStarts
+		keep = bisect.bisect_right(oldLineStarts, lineStart)
+		oldLastLine = bisect.bisect_right(oldLineStarts, oldLineEnd - 1)
+		damagedLines = [index + 1 for index, char in enumerate(folded) if char == "\n"]
+		lineStarts = oldLineStarts[:keep]
+		lineStarts.extend([lineStart + offset for offset in damagedLines])
+		tailLines = bisect.bisect_right(oldLineStarts, oldLineEnd)
+		lineStarts.extend([offset + delta for offset in oldLineStarts[tailLines:]])
+		lineDelta = len(lineStarts) - len(oldLineStarts)
+
+		self.text = new
+		self.buffer = buffer
+		self.chario.buffer = buffer
+		self.chario.lineStarts = lineStarts
+
+		# re-scan from the end of the last token before the damaged lines,
+		# until a token starts where an old one did after them; the token ending
+		# at the damaged lines is scanned again too, as an unterminated string
+		# literal ends at the end of the source
+		tokens = self.tokens
+		first = min(self.indexAfter(lineStart - 1), len(tokens) - 1)
+		self.chario.position = tokens[first - 1].end if first > 0 else 0
+		scanner = Scanner(self.chario)
+		aligned = sameTail and folded.endswith("\n")
+		scanned = []
+		stop = len(tokens)
+		while True:
+			token = scanner.ScanToken()
+			if aligned and token.start >= newLineEnd:
+				index = self.indexFrom(token.start - delta, first)
+				if index < len(tokens) and tokens[index].start == token.start - delta:
+					stop = index
+					break
+			scanned.append(token)
+			if token.code == Const.EOF:
+				break
+		self.detach(scanned)
+
+		# the innermost bodies around the damaged tokens, found before the tokens move
+		path = self.enclosingBodies(first, stop)
+
+		tokenDelta = len(scanned) - (stop - first)
+		for token in itertools.islice(tokens, stop, None):
+			token.start += delta
+			token.end += delta
+		tokens[first:stop] = scanned
+		for bounds in self.parser.ranges.values():
+			for index in (0, 1):
+				if bounds[index] >= stop:
+					bounds[index] += tokenDelta
+		if lineDelta:
+			for items in itertools.chain((self.syntaxItems, self.semanticItems),
+					self.parser.items.values(), self.analyzer.items.values()):
+				for item in items:
+					if isinstance(item, list) and item[2] is not None and item[2] > oldLastLine:
+						item[2] += lineDelta
+
+		self.recheck(path, oldLineEnd, delta)
+
+
+	@staticmethod
+	def shift(tree, offset, delta):
+		"""
+		move the nodes of a tree which start at or after an offset
+
+		Arguments:
+			tree {Node} -- the root of the tree
+			offset {int} -- the first offset moved
+			delta {int} -- the distance the nodes move
+		"""
+		nodes = [tree]
+		while nodes:
+			node = nodes.pop()
+			if isinstance(node, (list, tuple)):
+				nodes.extend(node)
+				continue
+			if not isinstance(node, Node):
+				continue
+			if node.start >= offset:
+				node.start += delta
+			for cls in type(node).__mro__:
+				for field in getattr(cls, "__slots__", ()):
+					if field != "start" and field != "entry":
+						nodes.append(getattr(node, field))
+
+
+	def inString(self, offset):
+		"""
+		return whether an offset of the text is inside a string literal
+		"""
+		index = self.indexAfter(offset)
+		return index < len(self.tokens) and self.tokens[index].code == Const.stringLiteral \
+			and self.tokens[index].start < offset
+
+
+	def indexAfter(self, offset):
+		"""
+		return the index of the first token which ends after an offset
+		"""
+		tokens = self.tokens
+		low, high = 0, len(tokens)
+		while low < high:
+			middle = (low + high) // 2
+			if tokens[middle].end <= offset:
+				low = middle + 1
+			else:
+				high = middle
+		return low
+
+
+	def indexFrom(self, offset, low=0):
+		"""
+		return the index of the first token which starts at or after an offset
+		"""
+		tokens = self.tokens
+		high = len(tokens)
+		while low < high:
+			middle = (low + high) // 2
+			if tokens[middle].start < offset:
+				low = middle + 1
+			else:
+				high = middle
+		return low
+
+
+	def enclosingBodies(self, first, stop):
+		"""
+		return the bodies whose first token and the token after them are not damaged,
+		and which contain the damaged tokens, the outermost first
+
+		Arguments:
+			first {int} -- the index of the first damaged token
+			stop {int} -- the index after the last damaged token
+		"""
+		ranges = self.parser.ranges
+		if ranges[self.tree][1] < first:
+			# the tokens after the end of the program are never parsed
+			return []
+
+		path = [self.tree]
+		nested = True
+		while nested:
+			nested = False
+			for declaration in path[-1].declarations:
+				if not isinstance(declaration, SubprogramBody):
+					continue
+				start, end = ranges[declaration]
+				if start >= first:
+					break
+				if end >= stop:
+					path.append(declaration)
+					nested = True
+					break
+		return path
+
+
+	def recheck(self, path, offset, delta):
+		"""
+		parse and check again the innermost body of a path, and its enclosing ones if needed
+
+		Arguments:
+			path {list} -- the value of enclosingBodies()
+			offset {int} -- the end of the damaged lines in the old text
+			delta {int} -- the change of the length of the text
+		"""
+		while path:
+			body = path.pop()
+			if not path:
+				self.checkProgram()
+				return
+
+			first, end = self.parser.ranges[body]
+			self.recorder.records = []
+			node = self.parser.parseBody(first)
+			if self.parser.ranges[node][1] != end:
+				# the body ends elsewhere: the rest of the enclosing body must be parsed again
+				self.forget(node)
+				continue
+
+			self.analyzer.table.restore(self.analyzer.snapshots[body])
+			self.recorder.records = []
+			self.analyzer.subprogramBody(node)
+			if not (body.closed and node.closed and self.symbol(body.name) == self.symbol(node.name)):
+				# the rest of the enclosing body would see another symbol table
+				self.forget(node)
+				continue
+
+			# the nodes kept after the damaged lines move like their tokens,
+			# before the new body, which has the new offsets, joins the tree
+			if delta:
+				self.shift(self.tree, offset, delta)
+			parent = path[-1]
+			parent.declarations[parent.declarations.index(body)] = node
+			for items in (self.parser.items[parent], self.analyzer.items[parent]):
+				items[items.index(body)] = node
+			self.forget(body)
+			return
+
+
+	@staticmethod
+	def symbol(identifier):
+		return None if identifier is None else identifier.symbol
+
+
+	def forget(self, body):
+		"""
+		drop the records of a body and of its nested bodies
+		"""
+		for item in self.parser.items.pop(body):
+			if isinstance(item, SubprogramBody):
+				self.forget(item)
+		del self.parser.ranges[body]
+		self.analyzer.snapshots.pop(body, None)
+		self.analyzer.items.pop(body, None)
+
+
+	def flatten(self, items, nested, records):
+		"""
+		append the records of items to a list, replacing each body by its own records
+		"""
+		for item in items:
+			if isinstance(item, SubprogramBody):
+				self.flatten(nested[item], nested, records)
+			else:
+				records.append(item)
+		return records
+
+
+	def report(self, diagnostics, evaluate=True):
+		"""
+		report the diagnostics of the program in the order of a full check:
+		syntax errors, semantic errors, then the output of the print calls
+
+		Arguments:
+			diagnostics {Diagnostics} -- where the diagnostics are reported
+
+		Keyword Arguments:
+			evaluate {bool} -- run the print calls (default: {True})
+		"""
+		records = self.flatten(self.syntaxItems, self.parser.items, [])
+		self.flatten(self.semanticItems, self.analyzer.items, records)
+		for kind, message, line, column, count in records:
+			diagnostics.Report(kind, message, None if line is None else (line, column))
+		if evaluate:
+			Evaluator(diagnostics).evaluate(self.tree)
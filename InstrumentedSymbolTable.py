@@ -0,0 +1,83 @@
+from SymbolTable import SymbolTable
+
+
+class InstrumentedSymbolTable(SymbolTable):
+	"""
+	The InstrumentedSymbolTable class is a SymbolTable that counts what it does:
+	scopes entered and exited, the deepest stack, the entries of each scope,
+	found and undefined identifiers, redefinitions, and how many scopes
+	each findSymbol would walk from the innermost one to find its entry.
+	The counters live only in this subclass, so a plain SymbolTable pays nothing for them.
+	"""
+
+	def reset(self, chario):
+		"""
+		Drops every scope but the prelude and clears the counters, for a new program.
+		"""
+		super(InstrumentedSymbolTable, self).reset(chario)
+		self.scopesEntered = 0
+		self.scopesExited = 0
+		self.maxDepth = len(self.stack)
+		# number of entries of each exited scope, in the order of exit
+		self.scopeSizes = []
+		self.hits = 0
+		self.misses = 0
+		self.redefinitions = 0
+		# number of scopes walked by a lookup -> number of lookups
+		self.walks = {}
+
+
+	def enterScope(self):
+		super(InstrumentedSymbolTable, self).enterScope()
+		self.scopesEntered += 1
+		self.maxDepth = max(self.maxDepth, len(self.stack))
+
+
+	def exitScope(self):
+		self.scopeSizes.append(len(self.stack[-1]))
+		super(InstrumentedSymbolTable, self).exitScope()
+		self.scopesExited += 1
+
+
+	def enterSymbol(self, symbol, role=None, value=None, offset=None):
+		entry = super(InstrumentedSymbolTable, self).enterSymbol(symbol, role, value, offset)
+		if entry is None:
+			self.redefinitions += 1
+		return entry
+
+
+	def findSymbol(self, symbol, offset=None):
+		if symbol == None:
+			return None
+
+		# the scopes a lookup through the stack would walk, the missing ones included
+		walked = len(self.stack)
+		for depth, scope in enumerate(reversed(self.stack)):
+			if symbol in scope:
+				walked = depth + 1
+				break
+		self.walks[walked] = self.walks.get(walked, 0) + 1
+
+		entry = super(InstrumentedSymbolTable, self).findSymbol(symbol, offset)
+		if entry is None:
+			self.misses += 1
+		else:
+			self.hits += 1
+		return entry
+
+
+	def statistics(self):
+		"""
+		Returns the counters of the current program as a dict, ready for json.dumps()
+		"""
+		return {
+			"scopesEntered": self.scopesEntered,
+			"scopesExited": self.scopesExited,
+			"maxDepth": self.maxDepth,
+			"scopeSizes": self.scopeSizes,
+			"openScopeSizes": [len(scope) for scope in self.stack],
+			"hits": self.hits,
+			"misses": self.misses,
+			"redefinitions": self.redefinitions,
+			"scopesWalked": {str(walked): count for walked, count in sorted(self.walks.items())},
+		}
@@ -0,0 +1,366 @@
+from Token import Token
+from Trampoline import trampoline
+from Parser import Parser, PRECEDENCE, LEFT_ASSOCIATIVE, LOGICAL, ADDING, MULTIPLYING, EXPONENTIATION, \
+	DECLARATION_HANDLES, COMPOUND_STATEMENT_HANDLES, SEQUENCE_TERMINATORS
+from AST import Identifier, SubprogramBody, IfStatement, LoopStatement, Literal, Name, UnaryOperation, BinaryOperation
+
+
+# states of the frames of the expression machine:
+# an expression at its start, after the operand of a sign, after the primary of "not",
+# after its first primary, and after the right operand of a binary operator
+EXPRESSION = 0
+SIGNED = 1
+NEGATED = 2
+OPERAND = 3
+RIGHT = 4
+# a primary at its start, and after the expression in parentheses
+PRIMARY = 5
+PARENTHESIZED = 6
+# a name at its start, and after each expression of its indexedComponent
+NAME = 7
+INDEXED = 8
+
+
+class IterativeParser(Parser):
+	"""
+	The IterativeParser class recognizes the same phrases as the Parser class,
+	with the same syntax tree and the same diagnostics, without recursing
+	on the Python call stack, so that the nesting depth of a program is only
+	limited by memory and the time to parse it stays linear.
+
+	An expression, with its primaries, names and parentheses, is parsed by a loop
+	over a stack of frames, one per open phrase, instead of a call per phrase.
+	Subprogram bodies, sequences of statements and compound statements are
+	generators run by trampoline(), each yielding the generator of the phrase
+	nested in it; they follow the methods of Parser they replace line by line.
+	"""
+
+	# phrases
+
+	def expression(self, precedence=LOGICAL):
+		return self.phrase([EXPRESSION, precedence, None, None, None, None, None])
+
+
+	def primary(self):
+		return self.phrase([PRIMARY])
+
+
+	def name(self):
+		return self.phrase([NAME])
+
+
+	def phrase(self, frame):
+		"""
+		parse an expression, a primary or a name as Parser does
+
+		Arguments:
+			frame {list} -- the frame of the phrase: its state, followed for an expression by
+				its precedence, start, ceiling, logical operator, node and last operator,
+				and for an indexedComponent by its Name and the expressions parsed
+
+		Returns:
+			[Node, None] -- the node of the phrase, None on a syntax error
+		"""
+		stack = []
+		value = None
+		while True:
+			state = frame[0]
+
+			if state == EXPRESSION:
+				token = self.token
+				frame[2] = token.start
+				if token.code in Token.addingOperator and frame[1] <= ADDING:
+					# the sign applies to the whole first term
+					frame[0] = SIGNED
+					frame[6] = token.code
+					self.token = self.tokens.advance()
+					stack.append(frame)
+					frame = [EXPRESSION, MULTIPLYING, None, None, None, None, None]
+					continue
+				elif token.code == Token.NOT and frame[1] <= EXPONENTIATION:
+					frame[0] = NEGATED
+					self.token = self.tokens.advance()
+					stack.append(frame)
+					frame = [PRIMARY]
+					continue
+				elif token.code in Token.literals:
+					# a literal or a name without indexes is parsed in place, as the operand
+					state = OPERAND
+					value = self.literal()
+				elif token.code == Token.ID and self.tokens.peek().code != Token.PARENTHESIS_OPEN:
+					state = OPERAND
+					value = Name(token.start, token.symbol)
+					self.token = self.tokens.advance()
+				else:
+					frame[0] = OPERAND
+					stack.append(frame)
+					frame = [PRIMARY]
+					continue
+
+			if state <= RIGHT:
+				# the operand of the expression was parsed, as value
+				if state == OPERAND:
+					frame[3] = EXPONENTIATION
+					frame[5] = value
+				elif state == RIGHT:
+					node = frame[5]
+					operator = frame[6]
+					frame[5] = BinaryOperation(node.start, operator, node, value)
+					level = PRECEDENCE[operator]
+					frame[3] = level if level in LEFT_ASSOCIATIVE else level - 1
+				elif state == SIGNED:
+					frame[3] = ADDING
+					frame[5] = UnaryOperation(frame[2], frame[6], value)
+				else:
+					frame[3] = MULTIPLYING
+					frame[5] = UnaryOperation(frame[2], Token.NOT, value)
+
+				# take the next operator between the precedence and the ceiling, if any
+				operator = self.token.code
+				level = PRECEDENCE.get(operator, 0)
+				if not self.panic and frame[1] <= level <= frame[3] and \
+						(level != LOGICAL or frame[4] is None or operator == frame[4]):
+					if level == LOGICAL:
+						# "and" and "or" cannot be mixed without parentheses
+						frame[4] = operator
+					frame[0] = RIGHT
+					frame[6] = operator
+					self.token = self.tokens.advance()
+					stack.append(frame)
+					frame = [EXPRESSION, level + 1, None, None, None, None, None]
+					continue
+				value = frame[5]
+
+			elif state == PRIMARY:
+				token = self.token
+				if token.code in Token.literals:
+					value = self.literal()
+				elif token.code == Token.ID:
+					frame = [NAME]
+					continue
+				elif token.code == Token.PARENTHESIS_OPEN:
+					self.token = self.tokens.advance()
+					frame[0] = PARENTHESIZED
+					stack.append(frame)
+					frame = [EXPRESSION, LOGICAL, None, None, None, None, None]
+					continue
+				else:
+					self.fatalError("expected either a numeric literal, an identifier, or an opening parenthesis but " +
+						str(token) + " was detected")
+					value = None
+
+			elif state == PARENTHESIZED:
+				# the value is the expression in parentheses
+				self.accept(Token.PARENTHESIS_CLOSE)
+
+			elif state == NAME:
+				token = self.accept(Token.ID)
+				if token is None:
+					value = None
+				else:
+					value = Name(token.start, token.symbol)
+					if self.token.code == Token.PARENTHESIS_OPEN:
+						# indexedComponent = "(" expression { "," expression } ")"
+						self.accept(Token.PARENTHESIS_OPEN)
+						stack.append([INDEXED, value, []])
+						frame = [EXPRESSION, LOGICAL, None, None, None, None, None]
+						continue
+
+			else:
+				# INDEXED: an expression of the indexedComponent was parsed
+				frame[2].append(value)
+				if not self.panic and self.token.code == Token.COMMA:
+					self.token = self.tokens.advance()
+					stack.append(frame)
+					frame = [EXPRESSION, LOGICAL, None, None, None, None, None]
+					continue
+				self.accept(Token.PARENTHESIS_CLOSE)
+				value = frame[1]
+				value.indexes = frame[2]
+
+			# the phrase of the frame is complete: return its value to the enclosing one
+			if not stack:
+				return value
+			frame = stack.pop()
+
+
+	def literal(self):
+		"""
+		take a numeric or string literal as a Literal node
+		"""
+		token = self.token
+		value = token.value
+		if token.code == Token.numericalLiteral:
+			value = int(value)
+		self.token = self.tokens.advance()
+		return Literal(token.start, value)
+
+
+	# nested constructs
+
+	def subprogramBody(self):
+		return trampoline(self.subprogramBodySteps())
+
+
+	def declarativePart(self, body):
+		trampoline(self.declarativePartSteps(body))
+
+
+	def basicDeclaration(self):
+		return trampoline(self.basicDeclarationSteps())
+
+
+	def sequenceOfStatements(self):
+		return trampoline(self.sequenceOfStatementsSteps())
+
+
+	def statement(self):
+		trampoline(self.statementSteps())
+
+
+	def compoundStatement(self):
+		trampoline(self.compoundStatementSteps())
+
+
+	def ifStatement(self):
+		trampoline(self.ifStatementSteps())
+
+
+	def loopStatement(self):
+		trampoline(self.loopStatementSteps())
+
+
+	def subprogramBodySteps(self):
+		"""
+		the steps of Parser.subprogramBody()
+		"""
+		node = SubprogramBody(self.token.start)
+		self.subprogramSpecification(node)
+		if not self.panic:
+			node.specified = True
+			self.accept(Token.IS)
+		self.recover("continue parsing from declarative part of subprogram body")
+
+		yield self.declarativePartSteps(node)
+		self.recover("continue parsing from [begin] of subprogram body")
+
+		self.accept(Token.BEGIN)
+		self.recover("continue parsing from sequence of statement of subprogram body")
+
+		node.statements = yield self.sequenceOfStatementsSteps()
+		self.recover("continue parsing from [end] of subprogram body")
+
+		self.accept(Token.END)
+		if not self.panic:
+			node.closed = True
+
+			# <procedure>identifier, checked by the Analyzer
+			if self.token.code == Token.ID:
+				node.endName = Identifier(self.token.start, self.token.symbol)
+				self.token = self.tokens.advance()
+
+			self.accept(Token.SEMICOLON)
+		self.recover("stop parsing subprogram body")
+
+		return node
+
+
+	def declarativePartSteps(self, body):
+		"""
+		the steps of Parser.declarativePart()
+		"""
+		while self.token.code in DECLARATION_HANDLES:
+			declaration = yield self.basicDeclarationSteps()
+			if not self.recover("continue parsing basic declaration of declarative part"):
+				body.declarations.append(declaration)
+
+
+	def basicDeclarationSteps(self):
+		"""
+		the steps of Parser.basicDeclaration()
+		"""
+		if self.token.code == Token.PROC:
+			return (yield self.subprogramBodySteps())
+		return super(IterativeParser, self).basicDeclaration()
+
+
+	def sequenceOfStatementsSteps(self):
+		"""
+		the steps of Parser.sequenceOfStatements()
+		"""
+		outer, self.statements = self.statements, []
+		yield self.statementSteps()
+		while self.token.code not in SEQUENCE_TERMINATORS:
+			yield self.statementSteps()
+
+		statements, self.statements = self.statements, outer
+		return statements
+
+
+	def statementSteps(self):
+		"""
+		the steps of Parser.statement()
+		"""
+		if self.token.code in COMPOUND_STATEMENT_HANDLES:
+			yield self.compoundStatementSteps()
+		else:
+			self.simpleStatement()
+		self.recover("continue parsing next statement")
+
+
+	def compoundStatementSteps(self):
+		"""
+		the steps of Parser.compoundStatement()
+		"""
+		if self.token.code == Token.IF:
+			yield self.ifStatementSteps()
+		else:
+			yield self.loopStatementSteps()
+
+
+	def ifStatementSteps(self):
+		"""
+		the steps of Parser.ifStatement()
+		"""
+		node = IfStatement(self.token.start)
+		self.statements.append(node)
+		self.accept(Token.IF)
+		condition = self.condition()
+		self.accept(Token.THEN)
+		if self.panic:
+			return
+		node.branches.append((condition, (yield self.sequenceOfStatementsSteps())))
+		while self.token.code == Token.ELSIF:
+			self.accept(Token.ELSIF)
+			condition = self.condition()
+			self.accept(Token.THEN)
+			if self.panic:
+				return
+			node.branches.append((condition, (yield self.sequenceOfStatementsSteps())))
+		if self.token.code == Token.ELSE:
+			self.accept(Token.ELSE)
+			node.elseStatements = yield self.sequenceOfStatementsSteps()
+		self.accept(Token.END)
+		self.accept(Token.IF)
+		self.accept(Token.SEMICOLON)
+
+
+	def loopStatementSteps(self):
+		"""
+		the steps of Parser.loopStatement()
+		"""
+		node = LoopStatement(self.token.start)
+		self.statements.append(node)
+		if self.token.code == Token.WHILE:
+			condition = self.iterationScheme()
+			if not self.panic:
+				node.condition = condition
+		self.accept(Token.LOOP)
+		self.recover("continue parsing from sequence of statements of loop statement")
+
+		node.statements = yield self.sequenceOfStatementsSteps()
+
+		self.accept(Token.END)
+		self.accept(Token.LOOP)
+		self.accept(Token.SEMICOLON)
+		self.recover("stop parsing loop statement")
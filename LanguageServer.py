@@ -0,0 +1,390 @@
+import bisect
+import json
+import sys
+import traceback
+
+from Const import Const
+from AST import Node, Identifier, SubprogramBody
+from Diagnostics import Diagnostics
+from NameTable import NameTable
+from IncrementalChecker import IncrementalChecker
+
+
+class Document:
+	"""
+	An open document of the LanguageServer: its IncrementalChecker, which keeps
+	the tokens, the syntax tree and the symbol entries of the last check,
+	and an index of the names of that tree for go-to-definition
+	"""
+
+	def __init__(self, text):
+		self.checker = IncrementalChecker(text)
+		# offset of an identifier -> the Identifier or Name node there; None when out of date
+		self.names = None
+		# SymbolEntry -> the Identifier which declared it
+		self.declarations = None
+
+
+	def lineStarts(self):
+		"""
+		return the offsets of the first character of each line of the text
+		"""
+		checker = self.checker
+		if len(checker.buffer) == len(checker.text):
+			return checker.chario.lineStarts
+		# the case conversion changed the length of some characters
+		lineStarts = [0]
+		offset = checker.text.find("\n")
+		while offset >= 0:
+			lineStarts.append(offset + 1)
+			offset = checker.text.find("\n", offset + 1)
+		return lineStarts
+
+
+	def index(self):
+		"""
+		index the names of the tree, unless it was done since the last change
+		"""
+		if self.names is not None:
+			return
+		self.names = {}
+		self.declarations = {}
+		nodes = [self.checker.tree]
+		while nodes:
+			node = nodes.pop()
+			if isinstance(node, (list, tuple)):
+				nodes.extend(node)
+				continue
+			if not isinstance(node, Node):
+				continue
+			if isinstance(node, SubprogramBody) and node.endName is not None and node.name is not None \
+					and node.endName.symbol == node.name.symbol:
+				# the name after "end" refers to the procedure
+				self.names[node.endName.start] = node.name
+			elif hasattr(node, "entry"):
+				self.names.setdefault(node.start, node)
+				if isinstance(node, Identifier) and node.entry is not None:
+					self.declarations[node.entry] = node
+			for cls in type(node).__mro__:
+				for field in getattr(cls, "__slots__", ()):
+					if field != "entry":
+						nodes.append(getattr(node, field))
+
+
+	def definition(self, offset):
+		"""
+		return the Identifier which declared the name at an offset, None if there is none
+		"""
+		checker = self.checker
+		tokens = checker.tokens
+		index = checker.indexAfter(offset)
+		# the position may also be just after the name
+		for token in tokens[max(index - 1, 0):index + 1]:
+			if token.code == Const.ID and token.start <= offset <= token.end:
+				break
+		else:
+			return None
+
+		self.index()
+		node = self.names.get(token.start)
+		if node is None or node.entry is None:
+			return None
+		return self.declarations.get(node.entry)
+
+
+class LanguageServer:
+	"""
+	The LanguageServer class speaks the Language Server Protocol over a pair of
+	binary streams, e.g. the standard input and output of an editor's child process.
+	The open documents stay checked in memory: each change of a document is
+	applied to its IncrementalChecker, and the syntax and semantic errors are
+	published as diagnostics. Go-to-definition follows the symbol entries
+	which the Analyzer left in the tree.
+	"""
+
+	# JSON-RPC error codes
+	METHOD_NOT_FOUND = -32601
+	INTERNAL_ERROR = -32603
+	SERVER_NOT_INITIALIZED = -32002
+
+	# TextDocumentSyncKind.Incremental
+	INCREMENTAL = 2
+	# DiagnosticSeverity.Error, and MessageType.Error of window/logMessage
+	ERROR = 1
+
+	# names the NameTable may gain beyond twice the names of the open documents
+	# before it is compacted (see collectNames)
+	NAME_SLACK = 4096
+
+	def __init__(self, input, output):
+		"""
+		Arguments:
+			input {file} -- the binary stream the messages are read from
+			output {file} -- the binary stream the messages are written to
+		"""
+		self.input = input
+		self.output = output
+		# uri -> Document
+		self.documents = {}
+		self.initialized = False
+		self.shutdown = False
+		# LSP columns count UTF-16 code units, unless the client agrees on code points
+		self.utf16 = True
+		# the names interned before any document was opened, e.g. the prelude
+		self.nameMark = NameTable.Mark()
+		self.nameLimit = self.nameMark + self.NAME_SLACK
+
+
+	def serve(self):
+		"""
+		answer the messages until the client exits
+
+		Returns:
+			[int] -- the exit code: 0 if a shutdown request came before the exit
+		"""
+		while True:
+			message = self.read()
+			if message is None or message.get("method") == "exit":
+				return 0 if self.shutdown else 1
+			self.dispatch(message)
+
+
+	def read(self):
+		"""
+		read a message, or return None at the end of the input
+		"""
+		length = None
+		while True:
+			line = self.input.readline()
+			if not line:
+				return None
+			line = line.strip()
+			if not line:
+				if length is not None:
+					break
+				continue
+			name, _, value = line.decode("ascii").partition(":")
+			if name.strip().lower() == "content-length":
+				length = int(value)
+		return json.loads(self.input.read(length).decode("utf-8"))
+
+
+	def write(self, message):
+		"""
+		write a message with its header
+		"""
+		message["jsonrpc"] = "2.0"
+		body = json.dumps(message).encode("utf-8")
+		self.output.write(b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n\r\n" + body)
+		self.output.flush()
+
+
+	def notify(self, method, params):
+		self.write({"method": method, "params": params})
+
+
+	def dispatch(self, message):
+		"""
+		call the handler of a request or notification, and answer a request.
+		an exception of a handler does not stop the server: it fails the request
+		with an internal error, and a notification is only logged
+		"""
+		method = message.get("method")
+		params = message.get("params") or {}
+		handler = self.HANDLERS.get(method)
+		if "id" not in message:
+			# notifications are never answered, even the unknown ones
+			if handler is not None and (self.initialized or method == "initialized"):
+				try:
+					handler(self, params)
+				except Exception:
+					self.log(method)
+			return
+
+		response = {"id": message["id"]}
+		if handler is None:
+			response["error"] = {"code": self.METHOD_NOT_FOUND, "message": "unknown method: " + str(method)}
+		elif not self.initialized and method != "initialize":
+			response["error"] = {"code": self.SERVER_NOT_INITIALIZED, "message": "the server is not initialized"}
+		else:
+			try:
+				response["result"] = handler(self, params)
+			except Exception as error:
+				self.log(method)
+				response["error"] = {"code": self.INTERNAL_ERROR, "message": str(method) + " failed: " + repr(error)}
+		self.write(response)
+
+
+	def log(self, method):
+		"""
+		log the exception being handled, raised by the handler of a method
+		"""
+		self.notify("window/logMessage", {"type": self.ERROR,
+			"message": str(method) + " failed:\n" + traceback.format_exc()})
+
+
+	def initializeRequest(self, params):
+		encodings = ((params.get("capabilities") or {}).get("general") or {}).get("positionEncodings") or ()
+		self.utf16 = "utf-32" not in encodings
+		self.initialized = True
+		return {
+			"capabilities": {
+				"positionEncoding": "utf-16" if self.utf16 else "utf-32",
+				"textDocumentSync": {"openClose": True, "change": self.INCREMENTAL},
+				"definitionProvider": True,
+			},
+			"serverInfo": {"name": "tinyada"},
+		}
+
+
+	def initializedNotification(self, params):
+		pass
+
+
+	def shutdownRequest(self, params):
+		self.shutdown = True
+		return None
+
+
+	def didOpen(self, params):
+		item = params["textDocument"]
+		self.documents[item["uri"]] = Document(item["text"])
+		self.publish(item["uri"])
+		self.collectNames()
+
+
+	def didChange(self, params):
+		uri = params["textDocument"]["uri"]
+		document = self.documents.get(uri)
+		if document is None:
+			# a change of a document which is not open
+			return
+		for change in params["contentChanges"]:
+			if "range" in change:
+				start = self.offset(document, change["range"]["start"])
+				end = self.offset(document, change["range"]["end"])
+				document.checker.edit(start, end, change["text"])
+			else:
+				document.checker.check(change["text"])
+		document.names = None
+		self.publish(uri)
+		self.collectNames()
+
+
+	def didClose(self, params):
+		uri = params["textDocument"]["uri"]
+		self.documents.pop(uri, None)
+		self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+		self.collectNames()
+
+
+	def collectNames(self):
+		"""
+		forget the names of the closed documents and of the old versions of the
+		open ones, which the global NameTable would otherwise keep for the whole
+		session. The table is truncated once every document is closed, or when it
+		has grown past twice its size after the last compaction; the open documents
+		are then checked again, since their symbol IDs are no longer valid
+		"""
+		if self.documents and NameTable.Mark() <= self.nameLimit:
+			return
+		NameTable.Truncate(self.nameMark)
+		for document in self.documents.values():
+			document.checker.check(document.checker.text)
+			document.names = None
+		self.nameLimit = self.nameMark + 2 * (NameTable.Mark() - self.nameMark) + self.NAME_SLACK
+
+
+	def definition(self, params):
+		uri = params["textDocument"]["uri"]
+		document = self.documents.get(uri)
+		if document is None:
+			return None
+		identifier = document.definition(self.offset(document, params["position"]))
+		if identifier is None:
+			# an undefined or predefined identifier
+			return None
+		return {"uri": uri, "range": self.range(document, identifier.start, self.tokenLength(document, identifier.start))}
+
+
+	def publish(self, uri):
+		"""
+		publish the errors of a document; the notes, recovery messages
+		and the output of print have no place in the text
+		"""
+		document = self.documents[uri]
+		recorder = Diagnostics(bufferSize=sys.maxsize)
+		document.checker.report(recorder, evaluate=False)
+		lineStarts = document.lineStarts()
+		diagnostics = []
+		for kind, message, line, column, count in recorder.records:
+			if kind != Diagnostics.ERROR:
+				continue
+			offset = 0 if line is None else lineStarts[line - 1] + column - 1
+			diagnostics.append({
+				"range": self.range(document, offset, self.tokenLength(document, offset)),
+				"severity": self.ERROR,
+				"source": "tinyada",
+				"message": message,
+			})
+		self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": diagnostics})
+
+
+	def tokenLength(self, document, offset):
+		"""
+		return the length of the token starting at an offset, at least 1
+		"""
+		checker = document.checker
+		index = checker.indexAfter(offset)
+		if index < len(checker.tokens) and checker.tokens[index].start == offset:
+			return max(checker.tokens[index].end - offset, 1)
+		return 1
+
+
+	def offset(self, document, position):
+		"""
+		convert an LSP position into an offset of the text of a document
+		"""
+		lineStarts = document.lineStarts()
+		text = document.checker.text
+		line = position["line"]
+		if line >= len(lineStarts):
+			return len(text)
+		start = lineStarts[line]
+		end = lineStarts[line + 1] - 1 if line + 1 < len(lineStarts) else len(text)
+		character = position["character"]
+		if not self.utf16:
+			return min(start + character, end)
+		offset = start
+		while offset < end and character > 0:
+			character -= 2 if ord(text[offset]) > 0xFFFF else 1
+			offset += 1
+		return offset
+
+
+	def position(self, document, offset):
+		"""
+		convert an offset of the text of a document into an LSP position
+		"""
+		lineStarts = document.lineStarts()
+		line = bisect.bisect_right(lineStarts, offset) - 1
+		start = lineStarts[line]
+		character = offset - start
+		if self.utf16:
+			character += sum(1 for char in document.checker.text[start:offset] if ord(char) > 0xFFFF)
+		return {"line": line, "character": character}
+
+
+	def range(self, document, offset, length):
+		return {"start": self.position(document, offset), "end": self.position(document, offset + length)}
+
+
+	HANDLERS = {
+		"initialize": initializeRequest,
+		"initialized": initializedNotification,
+		"shutdown": shutdownRequest,
+		"textDocument/didOpen": didOpen,
+		"textDocument/didChange": didChange,
+		"textDocument/didClose": didClose,
+		"textDocument/definition": definition,
+	}
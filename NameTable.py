@@ -0,0 +1,70 @@
+class NameTable:
+	"""
+	The NameTable class interns identifier names into small integer symbol IDs.
+	The scanner interns an identifier the first time it sees it,
+	so that tokens, the symbol table and its entries carry the ID and compare
+	names as integers. Each distinct name is stored once, in lower case,
+	and is looked up again only for diagnostics.
+	The table is global: IDs are shared by every scanner and symbol table
+	of the program. A long-running process (e.g. the LanguageServer) forgets
+	the names of the programs it no longer holds with Mark() and Truncate().
+	"""
+
+	# the name of each ID, in lower case
+	names = []
+	# spellings already seen, mapped to their IDs
+	ids = {}
+
+	@classmethod
+	def Intern(cls, spelling):
+		"""
+		Return the symbol ID of a name, adding the name if it is new
+
+		Arguments:
+			spelling {str} -- the name as written in the source
+
+		Returns:
+			[int] -- the symbol ID, equal for names differing only in case
+		"""
+		symbol = cls.ids.get(spelling)
+		if symbol is None:
+			# the name is lowered only the first time a spelling is seen
+			name = spelling.lower()
+			symbol = cls.ids.get(name)
+			if symbol is None:
+				symbol = cls.ids[name] = len(cls.names)
+				cls.names.append(name)
+			cls.ids[spelling] = symbol
+		return symbol
+
+
+	@classmethod
+	def Name(cls, symbol):
+		"""
+		Return the name of a symbol ID, in lower case
+		"""
+		return cls.names[symbol]
+
+
+	@classmethod
+	def Mark(cls):
+		"""
+		Return the number of names interned so far, to truncate the table back to later
+		"""
+		return len(cls.names)
+
+
+	@classmethod
+	def Truncate(cls, mark):
+		"""
+		Forget the names interned after a mark. Their IDs may be given to other
+		names afterwards, so every token, syntax tree and symbol table holding
+		one of them must be built again
+
+		Arguments:
+			mark {int} -- a value returned by Mark()
+		"""
+		del cls.names[mark:]
+		forgotten = [spelling for spelling, symbol in cls.ids.items() if symbol >= mark]
+		for spelling in forgotten:
+			del cls.ids[spelling]
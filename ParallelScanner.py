@@ -0,0 +1,189 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from Const import Const
+from Chario import Chario
+from NameTable import NameTable
+from RegexScanner import RegexScanner
+from TokenBuffer import TokenBuffer
+
+
+class ParallelScanner:
+	"""
+	The ParallelScanner class tokenizes a large source on several processes.
+	The source is cut into chunks right after newline characters, where
+	a token always ends, and every chunk is scanned independently by
+	a scanner engine in a process pool. The partial token columns are stitched
+	back in order into a TokenBuffer, which holds the same tokens as
+	a sequential scan. The identifiers interned by a worker are sent back
+	once per chunk with its IDs, which are mapped to the IDs of this process.
+	The only token spanning lines is a string literal: when a chunk ends inside
+	one, the tokens from that literal on are scanned again sequentially
+	until a line break falls on the start of a later chunk.
+	"""
+
+	# sources smaller than this are not worth the start-up of a process pool
+	MIN_CHUNK_SIZE = 1 << 18
+
+	def __init__(self, chario, jobs=None, chunkSize=None, scanner=RegexScanner):
+		"""
+		Arguments:
+			chario {Chario} -- the Chario holding the source
+
+		Keyword Arguments:
+			jobs {int, None} -- the number of worker processes, one per core if omitted (default: {None})
+			chunkSize {int, None} -- approximate number of characters in a chunk,
+				chosen from the source size and jobs if omitted (default: {None})
+			scanner {type} -- the scanner engine, Scanner or RegexScanner (default: {RegexScanner})
+		"""
+		self.chario = chario
+		self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+		self.chunkSize = chunkSize
+		self.scanner = scanner
+
+
+	def Chunks(self):
+		"""
+		Cut the rest of the source into newline-aligned chunks
+
+		Returns:
+			[list] -- (start, end) offsets of each chunk
+		"""
+		buffer = self.chario.buffer
+		start = self.chario.position
+		size = self.chunkSize
+		if size is None:
+			# a few chunks per process keep the processes evenly busy
+			size = max(self.MIN_CHUNK_SIZE, (len(buffer) - start) // (self.jobs * 4) + 1)
+
+		chunks = []
+		while start < len(buffer):
+			end = buffer.find("\n", start + size - 1) + 1
+			if end == 0:
+				end = len(buffer)
+			chunks.append((start, end))
+			start = end
+		return chunks
+
+
+	@staticmethod
+	def ScanChunk(scanner, text, base):
+		"""
+		Scan a chunk of converted source, in a worker process
+
+		Arguments:
+			scanner {type} -- the scanner engine
+			text {str} -- the chunk
+			base {int} -- the source offset of the chunk
+
+		Returns:
+			[tuple] -- arrays of the codes, start offsets and end offsets of the tokens, without EOF,
+				an array of the NameTable IDs of the identifiers in this process,
+				and a dict of the names of these IDs
+		"""
+		kinds, starts, ends, symbols = array('B'), array('q'), array('q'), array('i')
+		for token in scanner(Chario.FromBuffer(text)):
+			if token.code == Const.EOF:
+				break
+			kinds.append(token.code)
+			starts.append(base + token.start)
+			ends.append(base + token.end)
+			if token.code == Const.ID:
+				symbols.append(token.symbol)
+		names = {symbol: NameTable.Name(symbol) for symbol in set(symbols)}
+		return kinds, starts, ends, symbols, names
+
+
+	@staticmethod
+	def ImportSymbols(symbols, names):
+		"""
+		Map the NameTable IDs of a worker process to the IDs of this process
+
+		Arguments:
+			symbols {array} -- the IDs of the identifiers of a chunk in the worker
+			names {dict} -- the names of these IDs
+
+		Returns:
+			[array] -- the IDs of the same identifiers in this process
+		"""
+		local = {symbol: NameTable.Intern(name) for symbol, name in names.items()}
+		return array('i', [local[symbol] for symbol in symbols])
+
+
+	def EndsInString(self, chunk, columns):
+		"""
+		Check if the last token of a chunk is a string literal cut by the end of the chunk
+		"""
+		kinds, starts, ends = columns[:3]
+		if not kinds or kinds[-1] != Const.stringLiteral or ends[-1] != chunk[1]:
+			return False
+		return ends[-1] - starts[-1] == 1 or self.chario.buffer[ends[-1] - 1] != "\""
+
+
+	def Resynchronize(self, tokens, start, chunkStarts):
+		"""
+		Scan sequentially from an offset until a newline token ends
+		at the start of a chunk, storing the tokens in the buffer
+
+		Arguments:
+			tokens {TokenBuffer} -- where the tokens are stored
+			start {int} -- the offset to scan from
+			chunkStarts {set} -- start offsets of the chunks
+
+		Returns:
+			[int] -- the offset the scan stopped at, the end of the source if no chunk was reached
+		"""
+		self.chario.position = start
+		scanner = self.scanner(self.chario)
+		while True:
+			token = scanner.ScanToken()
+			if token.code == Const.EOF:
+				return len(self.chario.buffer)
+			tokens.append(token)
+			if token.code == Const.NEWLINE and token.end in chunkStarts:
+				return token.end
+
+
+	def Tokenize(self):
+		"""
+		Tokenize the rest of the source into a TokenBuffer, ending with EOF
+		"""
+		buffer = self.chario.buffer
+		chunks = self.Chunks()
+		texts = [buffer[start:end] for start, end in chunks]
+		bases = [start for start, end in chunks]
+
+		if self.jobs > 1 and len(chunks) > 1:
+			with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+				results = list(executor.map(self.ScanChunk, repeat(self.scanner), texts, bases))
+		else:
+			results = list(map(self.ScanChunk, repeat(self.scanner), texts, bases))
+
+		tokens = TokenBuffer(self.chario)
+		chunkStarts = set(bases)
+		position = chunks[0][0] if chunks else self.chario.position
+		for chunk, columns in zip(chunks, results):
+			# this chunk was already covered by a sequential scan
+			if chunk[0] < position:
+				continue
+
+			kinds, starts, ends, symbols, names = columns
+			symbols = self.ImportSymbols(symbols, names)
+			if not self.EndsInString(chunk, columns) or chunk is chunks[-1]:
+				tokens.extend(kinds, starts, ends, symbols)
+				position = chunk[1]
+			else:
+				# keep the tokens before the cut string literal and scan the rest again
+				tokens.extend(kinds[:-1], starts[:-1], ends[:-1], symbols)
+				position = self.Resynchronize(tokens, starts[-1], chunkStarts)
+
+		# EOF comes after the trailing ignored characters, like a sequential scan
+		self.chario.position = len(buffer)
+		tokens.append(self.scanner(self.chario).ScanToken())
+		return tokens
+
+
+	def __iter__(self):
+		return iter(self.Tokenize())
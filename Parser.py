@@ -1,8 +1,39 @@
 from Token import Token
 from Chario import Chario
 from Scanner import Scanner
-from SymbolTable import SymbolTable
-from SymbolEntry import SymbolEntry
+from TokenStream import TokenStream
+from NameTable import NameTable
+from Grammar import TINYADA
+from AST import Identifier, SubprogramBody, ParameterSpecification, \
+	NumberDeclaration, ObjectDeclaration, TypeDeclaration, \
+	EnumerationType, ArrayType, Range, \
+	NullStatement, ExitStatement, AssignmentStatement, ProcedureCallStatement, \
+	PrintStatement, IfStatement, LoopStatement, \
+	Literal, Name, UnaryOperation, BinaryOperation
+
+
+# precedence of the binary operators, from the loosest to the tightest
+LOGICAL = 1
+RELATIONAL = 2
+ADDING = 3
+MULTIPLYING = 4
+EXPONENTIATION = 5
+
+PRECEDENCE = {}
+PRECEDENCE.update(dict.fromkeys((Token.AND, Token.OR), LOGICAL))
+PRECEDENCE.update(dict.fromkeys(Token.relationalOperator, RELATIONAL))
+PRECEDENCE.update(dict.fromkeys(Token.addingOperator, ADDING))
+PRECEDENCE.update(dict.fromkeys(Token.multiplyingOperator, MULTIPLYING))
+PRECEDENCE[Token.SQUARE] = EXPONENTIATION
+
+# a relation and "**" take a single operator
+LEFT_ASSOCIATIVE = frozenset((LOGICAL, ADDING, MULTIPLYING))
+
+# synchronization sets of the panic mode, computed from the grammar
+DECLARATION_HANDLES = TINYADA.FIRST["basicDeclaration"]
+COMPOUND_STATEMENT_HANDLES = TINYADA.FIRST["compoundStatement"]
+# the end of the file ends every phrase
+SEQUENCE_TERMINATORS = TINYADA.FOLLOW["sequenceOfStatements"] | frozenset((Token.EOF,))
 
 
 class Parser:
@@ -12,232 +43,212 @@ class Parser:
 	which continues to generate tokens after lexical errors,
 	the parser halts execution upon encountering
 	the first syntax error in a source program.
+	The phrases recognized are built into an abstract syntax tree (see AST.py),
+	which the Analyzer checks and the Evaluator runs in passes of their own.
+
+	A syntax error is recovered in panic mode without raising an exception:
+	the rest of the line is discarded and self.panic is set, which makes accept()
+	do nothing and the methods return without looking at the tokens,
+	until a recovery point (a phrase whose FIRST or FOLLOW set synchronizes
+	with the next line) reports where parsing continues and clears it.
+	A node returned while self.panic is set is incomplete, and is not kept.
 	"""
+
+	# symbol ID of the predefined print procedure, which is parsed specially
+	PRINT = NameTable.Intern("print")
+
 	def __init__(self, chario, scanner):
 		"""
 		construct a Parser instance
 		
 		Arguments:
 			chario -- the instance of Chario
-			scanner -- the instance of Scanner
+			scanner -- the instance of Scanner, or any other iterable of tokens
 		"""
-		self.chario = chario
-		self.scanner = scanner
 		# should implement handles
 		#self.initHandles()
-		self.token = scanner.GetNextToken()
-		self.table = SymbolTable(self.chario)
+		self.tokens = TokenStream((), chario)
+		self.reset(scanner, chario)
 
-		# init SymbolTable
-		self.table.enterScope()
-		self.table.enterSymbol("BOOLEAN", SymbolEntry.TYPE)
-		self.table.enterSymbol("CHAR", SymbolEntry.TYPE)
-		self.table.enterSymbol("INTEGER", SymbolEntry.TYPE)
-		self.table.enterSymbol("MATRIX", SymbolEntry.TYPE)
-		self.table.enterSymbol("PRINT", SymbolEntry.PROC)
-		self.table.enterSymbol("TRUE", SymbolEntry.CONST, True)
-		self.table.enterSymbol("FALSE", SymbolEntry.CONST, False)
 
-
-	def parse(self):
+	def reset(self, scanner, chario=None):
 		"""
-		do parse the entire source code
-		"""
-		self.subprogramBody()
-		# accept EOF: check if extra symbols after logical end of program exist
-		#self.accept(Token.EOF)
-
-
-	def pushSymbols(self, identifierList, role=None, value=None):
-		"""
-		push identifiers in iterable into the table stack
+		prepare the Parser for another program, reusing its token stream
 		
 		Arguments:
-			identifierList {[iterable]} -- container of identifier name strings
-		
+			scanner -- the instance of Scanner, or any other iterable of tokens
+
 		Keyword Arguments:
-			role {[str, None]} -- SymbolEntry role constants, optional (default: {None})
+			chario -- the instance of Chario, scanner.chario if omitted (default: {None})
 		"""
-		for identifier in identifierList:
-			self.table.enterSymbol(identifier, role, value)
+		self.chario = chario if chario is not None else scanner.chario
+		self.diagnostics = self.chario.diagnostics
+		self.scanner = scanner
+		self.tokens.reset(scanner, self.chario)
+		# the sequence of statements being parsed, which statements are added to
+		self.statements = []
+		# whether a syntax error is being recovered from
+		self.panic = False
+		self.token = self.tokens.advance()
 
 
-	# def setRole(self, identifierList, role):
-	# 	for identifier in identifierList:
-	# 		entry = self.table.findSymbol(identifier)
-	# 		if entry is None:
-	# 			////
-	# 		entry.role = role
+	def parse(self):
+		"""
+		do parse the entire source code
+
+		Returns:
+			[SubprogramBody] -- the syntax tree of the program
+		"""
+		return self.subprogramBody()
+		# accept EOF: check if extra symbols after logical end of program exist
+		#self.accept(Token.EOF)
 
 
 	def ignore_newlines(self):
 		"""
 		ignore preceding newlines("\n") and unexpected tokens.
-		error message for unexpected token is handled in scanner class.
+		error message for unexpected token is reported by the token stream.
 		"""
-		while self.token.code in (Token.NEWLINE, Token.UET):
-			self.token = self.scanner.GetNextToken()
+		while self.token.code in Token.ignoredTokens:
+			self.token = self.tokens.advance()
 
 
 	def discard_tokens(self):
 			# give up parsing the line with an error by discarding all trailling tokens until a newline character
-			message = "trailing tokens: " + str(self.token) + " "
+			discarded = [str(self.token)]
 			
-			if self.token.code not in (Token.NEWLINE, Token.EOF):
-				self.token = self.scanner.GetNextToken()
-				while self.token.code not in (Token.NEWLINE, Token.EOF):
-					message += str(self.token) + " "
-					self.token = self.scanner.GetNextToken()
+			if self.token.code not in Token.lineEnds:
+				self.token = self.tokens.advance()
+				while self.token.code not in Token.lineEnds:
+					discarded.append(str(self.token))
+					self.token = self.tokens.advance()
 					
-			message += "were discarded"
-			
 			# prepare next token other than newline for next parsing attempt
 			self.ignore_newlines()
 
-			print(message)
+			self.diagnostics.Note("trailing tokens: " + " ".join(discarded) + " were discarded")
 
 	
-	def calculate(self, lhs, rhs, operation):
-		"""
-		try to return operation(lhs, rhs), then return None if any exception happens
-
-		Arguments:
-			lhs - left hand operand
-			rhs - right hand operand
-			operation - a lambda with two parameter which does return a value
-		"""
-		try:
-			return operation(lhs, rhs)
-		except:
-			return None
-
-
 	def accept(self, expected):
 		"""
 		accept the current token only with the expected code
 
 		Arguments:
 			expected {Token.{code}} -- expected token code
-			error_message {str} -- error message if unacceptable
+
+		Returns:
+			[Token, None] -- the accepted token, None on a syntax error
 		"""
-		# prepare error message first
-		error_message = "expected [" + expected + "] but " + str(self.token) + " was detected"
+		# nothing is accepted until the syntax error is recovered
+		if self.panic:
+			return None
+
+		# the error is reported at the current token, even if newlines are ignored
+		token = self.token
 
 		# these tokens always appear that the end of a line
-		line_terminating_tokens = (Token.IS, Token.LOOP, Token.SEMICOLON, Token.BEGIN, Token.THEN, Token.ELSE)
+		line_terminating_tokens = Token.lineTerminatingTokens
 
 		# if the last token of this line was an unexpected one,
 		# do not remove that newline to preserve the next line's tokens
 		# (if we do ignore it, all the tokens in the next line will be discarded!)
-		if self.token.code == Token.NEWLINE and expected in line_terminating_tokens:
-			self.fatalError(error_message)
-		
-		self.ignore_newlines()
+		if token.code != Token.NEWLINE or expected not in line_terminating_tokens:
+			self.ignore_newlines()
 
 		if self.token.code != expected:
+			# the error message is only built for an error
+			self.fatalError("expected [" + Token.names[expected] + "] but " + str(token) + " was detected", token.start)
+			return None
 
-			# raise error!
-			self.fatalError(error_message)
-		# print("hahahoho")
-
-		self.token = self.scanner.GetNextToken()
+		token = self.token
+		self.token = self.tokens.advance()
 		if expected in line_terminating_tokens:
 			self.ignore_newlines()
+		return token
 
 
-	def acceptRole(self, identifier, expected):
+	def fatalError(self, error_message, offset=None):
 		"""
-		accept the identifier is expected
-		
+		send error message to the Chario instance, discard the rest of the line,
+		and enter the panic mode
+
 		Arguments:
-			identifier {str} -- name of the identifier
-			expected {str} -- SymbolEntry role constants
+			error_message {str} -- error message to send to the Chario
+
+		Keyword Arguments:
+			offset {int, None} -- source offset of the error, the current token if omitted (default: {None})
 		"""
-		entry = self.table.findSymbol(identifier)
-		if (not entry is None and entry.role != expected):
-			if expected == SymbolEntry.VAR and entry.role == SymbolEntry.PARAM:
-				return
-			self.chario.PrintErrorMessage(entry.name + ": expected " + expected + " identifier, not " + entry.role)
+		if offset is None:
+			offset = self.token.start
+		self.chario.PrintErrorMessage(error_message, offset)
+		self.discard_tokens()
+		self.panic = True
 
 
-	def fatalError(self, error_message):
+	def recover(self, message):
 		"""
-		send error message to the Chario instance and throw RuntimeError
+		leave the panic mode at a recovery point, reporting where parsing continues
 
 		Arguments:
-			error_message {str} -- error message to send to the Chario
+			message {str} -- where parsing continues
+
+		Returns:
+			[bool] -- whether a syntax error was recovered
 		"""
-		self.chario.PrintErrorMessage(error_message)
-		self.discard_tokens()
-		raise RuntimeError("Fatal error: " + error_message)
+		if not self.panic:
+			return False
+		self.panic = False
+		self.diagnostics.Recovery(message)
+		return True
 
 
 	def subprogramBody(self):
 		"""
 		Check whole subprogram matches to EBNF grammar for TinyAda
-		"""
 
-		procedure_name = None
-		try:
-			procedure_name = self.subprogramSpecification()
+		Returns:
+			[SubprogramBody] -- the parts of the subprogram which were recognized
+		"""
+		node = SubprogramBody(self.token.start)
+		self.subprogramSpecification(node)
+		if not self.panic:
+			node.specified = True
 			self.accept(Token.IS)
-		except RuntimeError as e:
-			print("continue parsing from declarative part of subprogram body\n")
-
-		try:
-			self.declarativePart()
-		except RuntimeError as e:
-			print("continue parsing from [begin] of subprogram body\n")
-
-		try:
-			self.accept(Token.BEGIN)
-			# print("hahahoho")
-		except RuntimeError as e:
-			print("continue parsing from sequence of statement of subprogram body\n")
-
-		try:
-			self.sequenceOfStatements()
-		except RuntimeError as e:
-			print("continue parsing from [end] of subprogram body\n")
-
-		try:
-			# print("hahahoho")
-			self.accept(Token.END)
-			self.table.exitScope()
-
-			# force <procedure>identifier
+		self.recover("continue parsing from declarative part of subprogram body")
+
+		self.declarativePart(node)
+		self.recover("continue parsing from [begin] of subprogram body")
+
+		self.accept(Token.BEGIN)
+		self.recover("continue parsing from sequence of statement of subprogram body")
+
+		node.statements = self.sequenceOfStatements()
+		self.recover("continue parsing from [end] of subprogram body")
+
+		self.accept(Token.END)
+		if not self.panic:
+			node.closed = True
+
+			# <procedure>identifier, checked by the Analyzer
 			if self.token.code == Token.ID:
-				identifier = self.token.value
-				self.acceptRole(identifier, SymbolEntry.PROC)
-				if procedure_name == None:
-					self.chario.PrintErrorMessage(
-						"failed to check if [" + identifier + "] is valid "+\
-						"after procedure's END keyword, because the procedure's "+\
-						"name was not recognized properly due to an error in "+\
-						"subprogram specification")
-				elif identifier != procedure_name:
-					self.chario.PrintErrorMessage(
-						"unexpected name [" + identifier + "] was used after "+\
-						"END keyword in procedure [" + procedure_name + "]. "+\
-						"it should be equal to the procedure's name ")
-				self.token = self.scanner.GetNextToken()
+				node.endName = Identifier(self.token.start, self.token.symbol)
+				self.token = self.tokens.advance()
 
 			self.accept(Token.SEMICOLON)
-		except RuntimeError as e:
-			# print("hahahoho")
+		self.recover("stop parsing subprogram body")
 
-			print("stop parsing subprogram body\n")
+		return node
 
 
-	def declarativePart(self):
+	def declarativePart(self, body):
 		"""
-		call basicDeclaration function while token is in basicDeclarationHandles
+		call basicDeclaration function while token is in FIRST(basicDeclaration),
+		adding the declarations to the subprogram body
 		"""
-		while self.token.code in Token.basicDeclarationHandles:
-			try:
-				self.basicDeclaration()
-			except RuntimeError as e:
-				print("continue parsing basic declaration of declarative part\n")
+		while self.token.code in DECLARATION_HANDLES:
+			declaration = self.basicDeclaration()
+			if not self.recover("continue parsing basic declaration of declarative part"):
+				body.declarations.append(declaration)
 
 
 	def basicDeclaration(self):
@@ -245,11 +256,11 @@ class Parser:
 		check which declaration the token is and call declaration function
 		"""
 		if self.token.code == Token.ID:
-			self.numberOrObjectDeclaration()
+			return self.numberOrObjectDeclaration()
 		elif self.token.code == Token.TYPE:
-			self.typeDeclaration()
+			return self.typeDeclaration()
 		elif self.token.code == Token.PROC:
-			self.subprogramBody()
+			return self.subprogramBody()
 
 
 	def numberOrObjectDeclaration(self):
@@ -259,23 +270,26 @@ class Parser:
 		Then check the token is number declaration Or Object declaration 
 		and call declaration function
 		"""
+		start = self.token.start
 		identifiers = self.identifierList()
 		self.accept(Token.COLON)
+		if self.panic:
+			return None
 		if self.token.code == Token.CONSTANT:
-			value = self.numberDeclaration()
-			self.pushSymbols(identifiers, SymbolEntry.CONST, value)
+			return NumberDeclaration(start, identifiers, self.numberDeclaration())
 		else:
-			self.objectDeclaration()
-			self.pushSymbols(identifiers, SymbolEntry.VAR)
+			return ObjectDeclaration(start, identifiers, self.objectDeclaration())
 
 
 	def objectDeclaration(self):
 		"""
 		check the statement has typeDefinition and ";"
 		"""
-		self.typeDefinition()
+		definition = self.typeDefinition()
 		self.accept(Token.SEMICOLON)
 
+		return definition
+
 
 	def numberDeclaration(self):
 		"""
@@ -283,10 +297,12 @@ class Parser:
 		"""
 		self.accept(Token.CONSTANT)
 		self.accept(Token.COLON_EQ)
-		value = self.expression()	# TODO: force <static>expression
+		if self.panic:
+			return None
+		expression = self.expression()	# TODO: force <static>expression
 		self.accept(Token.SEMICOLON)
 
-		return value
+		return expression
 
 
 	def identifierList(self):
@@ -295,31 +311,43 @@ class Parser:
 		
 		identifierList = identifier { "," identifier }
 		"""
-		identifiers = []
-
-		identifiers.append(self.token.value)
-		self.accept(Token.ID)
-		while self.token.code == Token.COMMA:
-			self.token = self.scanner.GetNextToken()
-			identifiers.append(self.token.value)
-			self.accept(Token.ID)
+		identifiers = [self.identifier()]
+		while not self.panic and self.token.code == Token.COMMA:
+			self.token = self.tokens.advance()
+			identifiers.append(self.identifier())
 
 		return identifiers
 
 
+	def identifier(self):
+		"""
+		accept an identifier being declared
+
+		Returns:
+			[Identifier, None] -- None on a syntax error
+		"""
+		# the accepted token, as newlines may be ignored before it
+		token = self.accept(Token.ID)
+		if token is None:
+			return None
+		return Identifier(token.start, token.symbol)
+
+
 	def typeDeclaration(self):
 		"""
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		typeDeclaration = "type" identifier "is" typeDefinition ";"
 		"""
+		start = self.token.start
 		self.accept(Token.TYPE)
-		identifier = self.token.value
-		self.accept(Token.ID)
+		identifier = self.identifier()
 		self.accept(Token.IS)
-		self.typeDefinition()
+		if self.panic:
+			return None
+		definition = self.typeDefinition()
 		self.accept(Token.SEMICOLON)
-		self.table.enterSymbol(identifier, SymbolEntry.TYPE)
+		return TypeDeclaration(start, identifier, definition)
 
 
 	def typeDefinition(self):
@@ -330,17 +358,14 @@ class Parser:
  		| range | <type>name
 		"""
 		if self.token.code == Token.PARENTHESIS_OPEN:
-			self.enumerationTypeDefinition()
+			return self.enumerationTypeDefinition()
 		elif self.token.code == Token.ARRAY:
-			self.arrayTypeDefinition()
+			return self.arrayTypeDefinition()
 		elif self.token.code == Token.RANGE:
-			self.range()
+			return self.range()
 		elif self.token.code == Token.ID:
-			# force <type>name
-			# self.acceptRole(self.token.value, SymbolEntry.TYPE)
-			entry = self.name()
-			if entry != None and entry.role != SymbolEntry.TYPE:
-				self.chario.PrintErrorMessage(entry.name + ": expected " + SymbolEntry.TYPE + " identifier, not " + entry.role)
+			# <type>name, whose role is checked by the Analyzer
+			return self.name()
 		else:
 			self.fatalError("expected either an opening parenthesis, an array,"+\
 			" a range, or an identifier but " + str(self.token) + " was detected")
@@ -352,14 +377,14 @@ class Parser:
 		
 		range = "range " simpleExpression ".." simpleExpression
 		"""
+		start = self.token.start
 		self.accept(Token.RANGE)
-		# print(" T: entering")
-		self.simpleExpression()
-		# print(" T: breaking")
+		low = self.expression(ADDING)
 		self.accept(Token.DOT_DOT)
-		self.simpleExpression()
-		# print(" T: escaping")
-
+		if self.panic:
+			return None
+		high = self.expression(ADDING)
+		return Range(start, low, high)
 
 
 	def index(self):
@@ -369,13 +394,10 @@ class Parser:
 		index = range | <type>name
 		"""
 		if self.token.code == Token.RANGE:
-			self.range()
+			return self.range()
 		elif self.token.code == Token.ID:
-			# force <type>name
-			# self.acceptRole(self.token.value, SymbolEntry.TYPE)
-			entry = self.name()
-			if entry != None and entry.role != SymbolEntry.TYPE:
-				self.chario.PrintErrorMessage(entry.name + ": expected " + SymbolEntry.TYPE + " identifier, not " + entry.role)
+			# <type>name, whose role is checked by the Analyzer
+			return self.name()
 		else:
 			self.fatalError("error in indexing")
 
@@ -386,10 +408,11 @@ class Parser:
 		
 		enumerationTypeDefinition = "(" identifierList ")"
 		"""
+		start = self.token.start
 		self.accept(Token.PARENTHESIS_OPEN)
 		identifiers = self.identifierList()
 		self.accept(Token.PARENTHESIS_CLOSE)
-		self.table.pushSymbols(identifiers, SymbolEntry.CONST)
+		return EnumerationType(start, identifiers)
 
 
 	def arrayTypeDefinition(self):
@@ -398,80 +421,78 @@ class Parser:
 		
 		arrayTypeDefinition = "array" "(" index { "," index } ")" "of" <type>name
 		"""
+		start = self.token.start
 		self.accept(Token.ARRAY)
 		self.accept(Token.PARENTHESIS_OPEN)
-		self.index()
-		while self.token.code == Token.COMMA:
-			self.token = self.scanner.GetNextToken()
-			self.index()
+		if self.panic:
+			return None
+		indexes = [self.index()]
+		while not self.panic and self.token.code == Token.COMMA:
+			self.token = self.tokens.advance()
+			indexes.append(self.index())
 		self.accept(Token.PARENTHESIS_CLOSE)
 		self.accept(Token.OF)
-		# force <type>name
-		# self.acceptRole(self.token.value, SymbolEntry.TYPE)
-		entry = self.name()
-		if entry != None and entry.role != SymbolEntry.TYPE:
-			self.chario.PrintErrorMessage(entry.name + ": expected " + SymbolEntry.TYPE + " identifier, not " + entry.role)
+		if self.panic:
+			return None
+		# <type>name, whose role is checked by the Analyzer
+		return ArrayType(start, indexes, self.name())
 
 
-	def subprogramSpecification(self):
+	def subprogramSpecification(self, body):
 
 		"""
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		subprogramSpecification = "procedure" identifier [ formalPart ]
 		"""
-		identifier = None
-		try:
-			self.accept(Token.PROC)
-			identifier = self.token.value
-			self.accept(Token.ID)	# TODO: enter symbol of procedure identifier
-			self.table.enterSymbol(identifier, SymbolEntry.PROC)
-		except RuntimeError as e:
-			# enterScope() must be called even if errors occur
-			# in order to keep the procedure's local
-			# identifiers inside its own scope
-			self.table.enterScope()
-
-			raise e
-
-		self.table.enterScope()	# TODO
-
-		if self.token.code == "(":	# TODO: note
-			self.formalPart()
+		# the Analyzer opens the procedure's scope even if errors occur,
+		# in order to keep the procedure's local identifiers inside its own scope
+		self.accept(Token.PROC)
+		identifier = self.identifier()
+		if self.panic:
+			return
+		body.name = identifier
 
-		return identifier
+		if self.token.code == Token.PARENTHESIS_OPEN:	# TODO: note
+			self.formalPart(body)
 
 
-	def formalPart(self):
+	def formalPart(self, body):
 		"""
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		formalPart = "(" parameterSpecification { ";" parameterSpecification } ")"
 		"""
 		self.accept(Token.PARENTHESIS_OPEN)
-		self.parameterSpecification()
-		while self.token.code == Token.SEMICOLON:
-			self.token = self.scanner.GetNextToken()
-			self.parameterSpecification()
+		self.parameterSpecification(body)
+		while not self.panic and self.token.code == Token.SEMICOLON:
+			self.token = self.tokens.advance()
+			self.parameterSpecification(body)
 		self.accept(Token.PARENTHESIS_CLOSE)
 
 
-	def parameterSpecification(self):
+	def parameterSpecification(self, body):
 		"""
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		parameterSpecification = identifierList ":" mode <type>name
 		"""
+		# the parameters are declared as soon as they are listed
+		start = self.token.start
 		identifiers = self.identifierList()
-		self.pushSymbols(identifiers, SymbolEntry.PARAM)
+		if self.panic:
+			return
+		specification = ParameterSpecification(start, identifiers)
+		body.parameters.append(specification)
 
 		self.accept(Token.COLON)
-		self.mode()
-		# force <type>name
-		# self.acceptRole(self.token.value, SymbolEntry.TYPE)
-		entry = self.name()
-		if entry != None and entry.role != SymbolEntry.TYPE:
-			self.chario.PrintErrorMessage(entry.name + ": expected " + SymbolEntry.TYPE + " identifier, not " + entry.role)
+		if self.panic:
+			return
+		specification.mode = self.mode()
+		# <type>name, whose role is checked by the Analyzer
+		type = self.name()
+		if not self.panic:
+			specification.type = type
 
 
 	def mode(self):
@@ -480,10 +501,14 @@ class Parser:
 		
 		mode = [ "in" ] | "in" "out" | "out"
 		"""
+		mode = ()
 		if self.token.code == Token.IN:
-			self.token = self.scanner.GetNextToken()
+			mode += (Token.IN,)
+			self.token = self.tokens.advance()
 		if self.token.code == Token.OUT:
-			self.token = self.scanner.GetNextToken()
+			mode += (Token.OUT,)
+			self.token = self.tokens.advance()
+		return mode
 
 
 	def sequenceOfStatements(self):
@@ -491,25 +516,33 @@ class Parser:
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		sequenceOfStatements = statement { statement }
+
+		Returns:
+			[list] -- the statements, including those cut short by a syntax error
 		"""
+		outer, self.statements = self.statements, []
 		self.statement()
-		while self.token.code not in (Token.END, Token.ELSIF, Token.ELSE, Token.EOF):	# TODO: should be implemented -> done
+		while self.token.code not in SEQUENCE_TERMINATORS:	# TODO: should be implemented -> done
 			self.statement()
 
+		statements, self.statements = self.statements, outer
+		return statements
+
 
 	def statement(self):	# TODO: should be implemented
 		"""
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		statement = simpleStatement | compoundStatement
+
+		each statement adds its node to self.statements as soon as it is recognized,
+		so that a statement with a syntax error keeps the parts parsed before the error
 		"""
-		try:
-			if self.token.code in (Token.IF, Token.WHILE, Token.LOOP):
-				self.compoundStatement()
-			else:
-				self.simpleStatement()
-		except:
-			print("continue parsing next statement\n")
+		if self.token.code in COMPOUND_STATEMENT_HANDLES:
+			self.compoundStatement()
+		else:
+			self.simpleStatement()
+		self.recover("continue parsing next statement")
 
 
 	def simpleStatement(self):
@@ -533,27 +566,19 @@ class Parser:
 		this function first parsing name. Then check the token is assignmentStatement
 		or procedureCallStatement and call declaration function
 		"""
-		identifier = self.token.value
-		entry = self.name()
+		start = self.token.start
+		name = self.name()
+		if self.panic:
+			return
 		if self.token.code == Token.COLON_EQ:
-			# to invoke assignmentStatement(), force <variable>name
-			# self.acceptRole(identifier, SymbolEntry.VAR)
-			value = self.assignmentStatement()
-			if entry != None:
-				if entry.role not in (SymbolEntry.VAR, SymbolEntry.PARAM):
-					self.chario.PrintErrorMessage(\
-						entry.name + ": expected " + SymbolEntry.VAR + " or " +\
-						SymbolEntry.PARAM + " identifier, not " + entry.role)
-				else:
-					entry.value = value
-		elif identifier == "print":
-			# self.token = self.scanner.GetNextToken()
+			node = AssignmentStatement(start, name)
+			self.statements.append(node)
+			self.assignmentStatement(node)
+		elif name.symbol == self.PRINT:
+			self.statements.append(PrintStatement(start, name))
 			self.printProcedureCallStatement()
 		else:
-			# to invoke procedureStatement(), force <procedure>name
-			# self.acceptRole(identifier, SymbolEntry.PROC)
-			if entry != None and entry.role != SymbolEntry.PROC:
-				self.chario.PrintErrorMessage(entry.name + ": expected " + SymbolEntry.PROC + " identifier, not " + entry.role)
+			self.statements.append(ProcedureCallStatement(start, name))
 			self.procedureCallStatement()
 
 
@@ -575,20 +600,23 @@ class Parser:
 		
 		nullStatement = "null" ";"
 		"""
+		self.statements.append(NullStatement(self.token.start))
 		self.accept(Token.NULL)
 		self.accept(Token.SEMICOLON)
 
 
-	def assignmentStatement(self):
+	def assignmentStatement(self, node):
 		"""
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		assignmentStatement = <variable>name ":=" expression ";"
 		"""
 		self.accept(Token.COLON_EQ)
-		ret = self.expression()
+		expression = self.expression()
+		if self.panic:
+			return
+		node.expression = expression
 		self.accept(Token.SEMICOLON)
-		return ret
 
 
 	def ifStatement(self):
@@ -601,18 +629,24 @@ class Parser:
  				[ "else" sequenceOfStatements ]
 				 "end" "if" ";"
 		"""
+		node = IfStatement(self.token.start)
+		self.statements.append(node)
 		self.accept(Token.IF)
-		self.condition()
+		condition = self.condition()
 		self.accept(Token.THEN)
-		self.sequenceOfStatements()
+		if self.panic:
+			return
+		node.branches.append((condition, self.sequenceOfStatements()))
 		while self.token.code == Token.ELSIF:
 			self.accept(Token.ELSIF)
-			self.condition()
+			condition = self.condition()
 			self.accept(Token.THEN)
-			self.sequenceOfStatements()
+			if self.panic:
+				return
+			node.branches.append((condition, self.sequenceOfStatements()))
 		if self.token.code == Token.ELSE:
 			self.accept(Token.ELSE)
-			self.sequenceOfStatements()
+			node.elseStatements = self.sequenceOfStatements()
 		self.accept(Token.END)
 		self.accept(Token.IF)
 		self.accept(Token.SEMICOLON)
@@ -625,21 +659,21 @@ class Parser:
 		loopStatement =
  				[ iterationScheme ] "loop" sequenceOfStatements "end" "loop" ";"
 		"""
-		try:
-			if self.token.code == Token.WHILE:
-				self.iterationScheme()
-			self.accept(Token.LOOP)
-		except RuntimeError as e:
-			print("continue parsing from sequence of statements of loop statement\n")
+		node = LoopStatement(self.token.start)
+		self.statements.append(node)
+		if self.token.code == Token.WHILE:
+			condition = self.iterationScheme()
+			if not self.panic:
+				node.condition = condition
+		self.accept(Token.LOOP)
+		self.recover("continue parsing from sequence of statements of loop statement")
 
-		self.sequenceOfStatements()
+		node.statements = self.sequenceOfStatements()
 
-		try:
-			self.accept(Token.END)
-			self.accept(Token.LOOP)
-			self.accept(Token.SEMICOLON)
-		except RuntimeError as e:
-			print("stop parsing loop statement\n")
+		self.accept(Token.END)
+		self.accept(Token.LOOP)
+		self.accept(Token.SEMICOLON)
+		self.recover("stop parsing loop statement")
 
 
 	def iterationScheme(self):
@@ -649,7 +683,7 @@ class Parser:
 		iterationScheme = "while" condition
 		"""
 		self.accept(Token.WHILE)
-		self.condition()
+		return self.condition()
 
 
 	def exitStatement(self):
@@ -658,10 +692,15 @@ class Parser:
 		
 		exitStatement = "exit" [ "when" condition ] ";"
 		"""
+		node = ExitStatement(self.token.start)
+		self.statements.append(node)
 		self.accept(Token.EXIT)
 		if self.token.code == Token.WHEN:
-			self.token = self.scanner.GetNextToken()
-			self.condition()
+			self.token = self.tokens.advance()
+			condition = self.condition()
+			if self.panic:
+				return
+			node.condition = condition
 		self.accept(Token.SEMICOLON)
 
 
@@ -670,47 +709,18 @@ class Parser:
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		procedureCallStatement = <procedure>name [ actualParameterPart ] ";"
+
+		the actualParameterPart has the syntax of an indexedComponent,
+		and was parsed with the name
 		"""
-		if self.token.code == Token.PARENTHESIS_OPEN:
-			self.actualParameterPart()
 		self.accept(Token.SEMICOLON)
 
 
 	def printProcedureCallStatement(self):
-		# print("call print")
-		if self.token.code == Token.PARENTHESIS_OPEN:
-			# print("ongoing")
-			params = self.actualParameterPart()
-			first = True
-			for param in params:
-				if first:
-					first = False
-				else:
-					print(end=' ')
-				# if param.__class__ == SymbolEntry.__class__:
-				# 	print(SymbolEntry.value, end=' ')
-				# else:
-				print(param, end='')
-		print()
-		self.accept(Token.SEMICOLON)
-
-
-	def actualParameterPart(self):
 		"""
-		check the statement is in the same format as the EBNF of Tinyada,
-		
-		actualParameterPart = "(" expression { "," expression } ")"
+		a procedureCallStatement of print, whose parameters are printed by the Evaluator
 		"""
-		self.accept(Token.PARENTHESIS_OPEN)
-		ret = []
-		# input("t")
-		ret.append(self.expression())
-		# input("t")
-		while self.token.code == Token.COMMA:
-			self.token = self.scanner.GetNextToken()
-			ret.append(self.expression())
-		self.accept(Token.PARENTHESIS_CLOSE)
-		return ret
+		self.accept(Token.SEMICOLON)
 
 
 	def condition(self):
@@ -719,128 +729,60 @@ class Parser:
 		
 		condition = <boolean>expression
 		"""
-		self.expression() # TODO: force <boolean>expression
+		return self.expression() # TODO: force <boolean>expression
 
 
-	def expression(self):
-		"""
-		check the statement is in the same format as the EBNF of Tinyada,
-		
-		expression = relation { "and" relation } | { "or" relation }
-		"""
-		value = self.relation()
-		if self.token.code == Token.AND:
-			while self.token.code == Token.AND:
-				self.token = self.scanner.GetNextToken()
-				operand = self.relation()
-				value = self.calculate(value, operand, (lambda lhs, rhs : lhs and rhs))
-		elif self.token.code == Token.OR:
-			while self.token.code == Token.OR:
-				self.token = self.scanner.GetNextToken()
-				operand = self.relation()
-				value = self.calculate(value, operand, (lambda lhs, rhs : lhs or rhs))
-
-		# print(" T: expr result", value)
-		return value
-
-
-	def relation(self):
+	def expression(self, precedence=LOGICAL):
 		"""
 		check the statement is in the same format as the EBNF of Tinyada,
 		
+		expression = relation { "and" relation } | relation { "or" relation }
 		relation = simpleExpression [ relationalOperator simpleExpression ]
-		"""
-		value = self.simpleExpression()
-		if self.token.code in Token.relationalOperator:
-			operation = {
-				Token.EQ : (lambda lhs, rhs : lhs == rhs),
-				Token.NE : (lambda lhs, rhs : lhs != rhs),
-				Token.LT : (lambda lhs, rhs : lhs < rhs),
-				Token.LE : (lambda lhs, rhs : lhs <= rhs),
-				Token.GT : (lambda lhs, rhs : lhs > rhs),
-				Token.GE : (lambda lhs, rhs : lhs >= rhs)
-			}[self.token.code]
-
-			self.token = self.scanner.GetNextToken()
-			operand = self.simpleExpression()
-			value = self.calculate(value, operand, operation)
-
-		return value
-
-
-	def simpleExpression(self):
-		"""
-		check the statement is in the same format as the EBNF of Tinyada,
-		
 		simpleExpression =
 				[ unaryAddingOperator ] term { binaryAddingOperator term }
-		"""
-		sign = None
-		if self.token.code in Token.addingOperator:
-			sign = {
-				Token.PLUS : 1,
-				Token.MINUS : -1
-			}[self.token.code]
-			self.token = self.scanner.GetNextToken()
-
-		value = self.term()
-		if sign != None:
-			value = self.calculate(value, sign, lambda lhs, rhs : lhs * rhs)
-
-		while self.token.code in Token.addingOperator:
-			operation = {
-				Token.PLUS : (lambda lhs, rhs : lhs + rhs),
-				Token.MINUS : (lambda lhs, rhs : lhs - rhs)
-			}[self.token.code]
-
-			self.token = self.scanner.GetNextToken()
-			operand = self.term()
-			value = self.calculate(value, operand, operation)
-
-		return value
-
-
-	def term(self):
-		"""
-		check the statement is in the same format as the EBNF of Tinyada,
-		
 		term = factor { multiplyingOperator factor }
-		"""
-		value = self.factor()
-		while self.token.code in Token.multiplyingOperator:
-			operation = {
-				Token.MUL : (lambda lhs, rhs : lhs * rhs),
-				Token.DIV : (lambda lhs, rhs : lhs // rhs),
-				Token.MOD : (lambda lhs, rhs : lhs % rhs)
-			}[self.token.code]
-
-			self.token = self.scanner.GetNextToken()
-			operand = self.factor()
-			value = self.calculate(value, operand, operation)
-		
-		return value
+		factor = primary [ "**" primary ] | "not" primary
 
+		the rules are parsed by precedence climbing over the operator tables
+		of this module, instead of one call per rule
 
-	def factor(self):
-		"""
-		check the statement is in the same format as the EBNF of Tinyada,
-		
-		factor = primary [ "**" primary ] | "not" primary
-		"""
-		# not
-		value = None
-		if self.token.code == Token.NOT:
-			self.token = self.scanner.GetNextToken()
-			value = self.primary()
-			value = self.calculate(value, None, (lambda lhs, rhs : not lhs))
+		Keyword Arguments:
+			precedence {int} -- the lowest precedence of the operators to take,
+				e.g. ADDING for a simpleExpression (default: {LOGICAL})
+		"""
+		start = self.token.start
+		if self.token.code in Token.addingOperator and precedence <= ADDING:
+			# the sign applies to the whole first term
+			sign = self.token.code
+			self.token = self.tokens.advance()
+			node = UnaryOperation(start, sign, self.expression(MULTIPLYING))
+			ceiling = ADDING
+		elif self.token.code == Token.NOT and precedence <= EXPONENTIATION:
+			self.token = self.tokens.advance()
+			node = UnaryOperation(start, Token.NOT, self.primary())
+			ceiling = MULTIPLYING
 		else:
-			value = self.primary()
-			if self.token.code == Token.SQUARE:
-				self.token = self.scanner.GetNextToken()
-				operand = self.primary()
-				value = self.calculate(value, operand, (lambda lhs, rhs : lhs ** rhs))
+			node = self.primary()
+			ceiling = EXPONENTIATION
 
-		return value
+		# operators of precedence between the given one and the ceiling can follow;
+		# the ceiling comes down as operators are taken, so that a non-associative
+		# operator is not repeated and a tighter operator does not follow a looser one
+		logical = None
+		while not self.panic and precedence <= PRECEDENCE.get(self.token.code, 0) <= ceiling:
+			operator = self.token.code
+			level = PRECEDENCE[operator]
+			if level == LOGICAL:
+				# "and" and "or" cannot be mixed without parentheses
+				if logical is not None and operator != logical:
+					break
+				logical = operator
+
+			self.token = self.tokens.advance()
+			node = BinaryOperation(node.start, operator, node, self.expression(level + 1))
+			ceiling = level if level in LEFT_ASSOCIATIVE else level - 1
+
+		return node
 
 
 	def primary(self):
@@ -849,31 +791,24 @@ class Parser:
 		
 		primary = numericLiteral | stringLiteral | name | "(" expression ")"
 		"""
-		value = None
-		if self.token.code in (Token.numericalLiteral, Token.stringLiteral):
+		node = None
+		if self.token.code in Token.literals:
 			value = self.token.value
-			if self.token.code is Token.numericalLiteral:
+			if self.token.code == Token.numericalLiteral:
 				value = int(value)
-			self.token = self.scanner.GetNextToken()
-			# print(" T: literal", value)
+			node = Literal(self.token.start, value)
+			self.token = self.tokens.advance()
 		elif self.token.code == Token.ID:
-			# print(self.token.value, "open")
-			entry = self.name()
-			# print(self.token.value, "close")
-
-			if entry != None:
-				value = entry.value
-				# print(" T: identifier", value)
-			
+			node = self.name()
 		elif self.token.code == Token.PARENTHESIS_OPEN:
-			self.token = self.scanner.GetNextToken()
-			value = self.expression()
+			self.token = self.tokens.advance()
+			node = self.expression()
 			self.accept(Token.PARENTHESIS_CLOSE)
 		else:
 			self.fatalError("expected either a numeric literal, an identifier, or an opening parenthesis but " + 
 				str(self.token) + " was detected")
 
-		return value
+		return node
 
 
 	def name(self):
@@ -881,14 +816,20 @@ class Parser:
 		check the statement is in the same format as the EBNF of Tinyada,
 		
 		name = identifier [ indexedComponent ]
+
+		the actualParameterPart of a procedure call has the same syntax
+		as an indexedComponent, so both are parsed here. Unlike the parser
+		which checked roles, a procedure name in an expression takes its
+		parameters too: the call is a semantic error of the Analyzer instead
+		of a syntax error at its "("
 		"""
-		entry = self.table.findSymbol(self.token.value)
-		# print("running name")
-		self.accept(Token.ID)
-		if (entry == None or entry.role != SymbolEntry.PROC) and self.token.code == Token.PARENTHESIS_OPEN:	# TODO: resolve comment: indexedComponent
-			# print("running indexedComponent")
-			self.indexedComponent()
-		return entry
+		token = self.accept(Token.ID)
+		if token is None:
+			return None
+		node = Name(token.start, token.symbol)
+		if self.token.code == Token.PARENTHESIS_OPEN:
+			node.indexes = self.indexedComponent()
+		return node
 
 
 	def indexedComponent(self):
@@ -898,14 +839,14 @@ class Parser:
 		indexedComponent = "(" expression { "," expression } ")"
 		"""
 		self.accept(Token.PARENTHESIS_OPEN)
-		self.expression()
-		while self.token.code == Token.COMMA:
-			self.token = self.scanner.GetNextToken()
-			self.expression()
+		expressions = [self.expression()]
+		while not self.panic and self.token.code == Token.COMMA:
+			self.token = self.tokens.advance()
+			expressions.append(self.expression())
 		self.accept(Token.PARENTHESIS_CLOSE)
+		return expressions
 
 		# TODO: resolve the following comment
 		#모든 메소드를 호출하면 GetNextToken 이 자동으로 됨
 		#따라서 메소드를 호출한 후에는 GetNextToken 사용 금지
 		#함수를 호출하지 않고 종료되거나 다음 토큰을 봐야 할 경우 사용
-
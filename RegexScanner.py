@@ -0,0 +1,106 @@
+import re
+
+from Const import Const
+from NameTable import NameTable
+from Token import Token
+from Chario import Chario
+from Scanner import Scanner
+
+
+class RegexScanner:
+	"""
+	The RegexScanner class is an alternative engine of the Scanner class.
+	Instead of dispatching on each character, it matches one precompiled
+	master regular expression of named alternatives against the whole
+	source buffer of chario, and returns the same tokens as the Scanner class.
+	"""
+
+	# every alternative mirrors a branch of Scanner.GetNextToken:
+	# identifiers and reserved words start with an alphabet and run until a delimiter,
+	# integers are series of ASCII digits, and operators are at most two characters long.
+	# ignored characters in front of a token are consumed by the same match.
+	PATTERN = re.compile(r"""
+		[ \r\t]*
+		(?:
+			(?P<newline>\n)
+			|(?P<string>"[^"]*"?)
+			|(?P<word>[^\W\d_][^ \n\r\t\\,:<>=;+\-*/()]*)
+			|(?P<integer>[0-9]+)
+			|(?P<operator>\.\.|/=|:=|<=|>=|\*\*|[-+;(),=/:<>*])
+			|(?P<unexpected>[^ \r\t])
+		)
+	""", re.VERBOSE)
+
+	def __init__(self, chario):
+		self.chario = chario
+
+
+	def GetNextToken(self):
+		"""
+		Return the next token, reporting it if it is an unexpected one
+		"""
+		token = self.ScanToken()
+		if token.code == Const.UET:
+			Scanner.ReportUnexpectedToken(self.chario, token)
+		return token
+
+
+	def __iter__(self):
+		"""
+		Generate the tokens of the rest of the source, up to and including EOF.
+		as with Scanner, unexpected tokens are reported by their consumer
+		"""
+		while True:
+			token = self.ScanToken()
+			yield token
+			if token.code == Const.EOF:
+				return
+
+
+	def ScanToken(self):
+		"""
+		Match the master pattern at the cursor of chario and return the token found,
+		marked with the source offsets where it starts and ends
+		"""
+		buffer = self.chario.buffer
+		match = self.PATTERN.match(buffer, self.chario.position)
+		if match is None:
+			# only ignored characters are left
+			self.chario.position = len(buffer)
+			return Token(Const.EOF, None, self.chario.position, self.chario.position)
+
+		kind = match.lastgroup
+		start, end = match.span(kind)
+		self.chario.position = end
+
+		if kind == "newline":
+			return Token(Const.NEWLINE, None, start, end)
+		elif kind == "string":
+			return Token(Const.stringLiteral, None, start, end, buffer)
+		elif kind == "word":
+			word = match.group(kind)
+			if not word[0].isalpha():
+				# numeric characters such as superscripts are word characters
+				# for the pattern but not alphabets for str.isalpha()
+				return self.NonAlphabeticToken(start)
+			code = Const.reservedWords.get(word)
+			if code is not None:
+				return Token(code, None, start, end)
+			return Token(Const.ID, None, start, end, symbol=NameTable.Intern(word))
+		elif kind == "integer":
+			return Token(Const.numericalLiteral, None, start, end, buffer)
+		elif kind == "operator":
+			return Token(Const.operators[match.group(kind)], None, start, end)
+		else:
+			return Token(Const.UET, match.group(kind), start, end)
+
+
+	def NonAlphabeticToken(self, start):
+		"""
+		Scan a word character of the pattern which is not an alphabet
+		(e.g. a superscript digit) in the same way as the Scanner class does:
+		as an unexpected symbol, since only ASCII digits make an integer
+		"""
+		symbol = self.chario.buffer[start]
+		self.chario.position = start + 1
+		return Token(Const.UET, symbol, start, start + 1)
@@ -1,4 +1,5 @@
 from Const import Const
+from NameTable import NameTable
 from Token import Token
 from Chario import Chario
 
@@ -9,65 +10,71 @@ class Scanner:
 	in a stream of characters and returns these tokens to the parser.
 	The Scanner class also detects any lexical errors.
 	"""
+	# list of characters that cannot exist right after an identifier or a reserved word
+	DELIMITERS = Const.DELIMITERS
+	IGNORED_CHARACTERS = frozenset((" ", "\r", "\t"))
+	SINGLE_CHAR_OPERATORS = frozenset(("+", "-", ";", "(", ")", ",", "="))
+	POSSIBLY_DOUBLE_CHAR_OPERATORS = frozenset(("/", ":", ">", "<", "*"))
+	DOUBLE_CHAR_OPERATORS = frozenset(("/=", ":=", "<=", ">=", "**"))
+
 	def __init__(self, chario):
 		self.chario = chario
 
 
 	def StringToken(self):
 		"""
-		Scans a string literal surrounded by \", e.g. "hahahoho"
+		Scans a string literal surrounded by \", e.g. "hahahoho".
+		only its position is recorded; the token slices its value lazily
 		"""
+		start = self.chario.position
 		# remove first \"
 		self.chario.GetNextChar()
 
-		result = ""
-		while self.chario.PeekNextChar() != "\"":
-			result += self.chario.GetNextChar()
+		# an unterminated string literal ends at the end of the source
+		while self.chario.PeekNextChar() not in ("\"", "EOF"):
+			self.chario.GetNextChar()
 
 		# remove last \"
 		self.chario.GetNextChar()
-		return Token(Const.stringLiteral, result)
+		return Token(Const.stringLiteral, None, start, self.chario.position, self.chario.buffer)
 
 
 	def IntegerToken(self):
 		"""
-		Scans an integer value, which is a series of digits
+		Scans an integer value, which is a series of digits.
+		only its position is recorded; the token slices its value lazily
 		"""
-		result = ""
-		while self.chario.PeekNextChar().isdigit():
-			result += self.chario.GetNextChar()
+		start = self.chario.position
+		while self.IsDigit(self.chario.PeekNextChar()):
+			self.chario.GetNextChar()
 
-		return Token(Const.numericalLiteral, result)
+		return Token(Const.numericalLiteral, None, start, self.chario.position, self.chario.buffer)
 
 
 	def AlphabeticToken(self):
 		"""
 		Scans either an identifier(e.g. variable name) or a reserved word(e.g. is, null).
 		"""
-		# list of characters that cannot exist right after an identifier or a reserved word
-		delimiters = (" ", "\n", "\r", "\t", "\\", ",", ":", "<", ">", "=", ";", "+", "-", "*", "/", "(", ")", "EOF")
-
 		# scan the token
-		result = ""
-		while self.chario.PeekNextChar() not in delimiters:
-			result += self.chario.GetNextChar()
+		start = self.chario.position
+		while self.chario.PeekNextChar() not in self.DELIMITERS:
+			self.chario.GetNextChar()
 
 		# return the result as either reserved word itself or an identifier
-		if result in Const.reservedWords:
-			return Token(result, None)
+		result = self.chario.buffer[start:self.chario.position]
+		code = Const.reservedWords.get(result)
+		if code is not None:
+			return Token(code, None)
 		else:
-			return Token(Const.ID, result)
+			return Token(Const.ID, None, symbol=NameTable.Intern(result))
 
 
 	def OperatorToken(self):
 		"""
 		Scans an operator symbol from chario(e.g. +, :=).
-		If an unexpected character is detected, RuntimeError will be raised.
+		If an unexpected character is detected, an unexpected token is returned;
+		it is reported when the token is handed over to the parser.
 		"""
-		singleCharOperators = ("+", "-", ";", "(", ")", ",", "=")
-		possiblyDoubleCharOperators = ("/", ":", ">", "<", "*")
-		doubleCharOperators = ("/=", ":=", "<=", ">=", "**")
-
 		# look for ".." first
 		firstChar = self.chario.GetNextChar()
 		if firstChar == "." and self.chario.PeekNextChar() == ".":
@@ -75,51 +82,101 @@ class Scanner:
 			return Token(Const.DOT_DOT, None)
 
 		# then look for definitely single character operators(e.g. +)
-		if firstChar in singleCharOperators:
-			return Token(firstChar, None)
+		if firstChar in self.SINGLE_CHAR_OPERATORS:
+			return Token(Const.operators[firstChar], None)
 		else:
 			# if not, check if the character is possibly a double character operator
 			# (which is also a valid one by itself, e.g. *)
-			if firstChar in possiblyDoubleCharOperators:
+			if firstChar in self.POSSIBLY_DOUBLE_CHAR_OPERATORS:
 				candidate = firstChar + self.chario.PeekNextChar()
 				# check if the next character also contributes on making a double character operator(e.g. **)
-				if candidate in doubleCharOperators:
-					return Token(firstChar + self.chario.GetNextChar(), None)
+				if candidate in self.DOUBLE_CHAR_OPERATORS:
+					self.chario.GetNextChar()
+					return Token(Const.operators[candidate], None)
 				else:
-					return Token(firstChar, None)
+					return Token(Const.operators[firstChar], None)
 			# if none of the above were the case, then its a unexpected symbol
 			else:
-				self.chario.PrintErrorMessage("Unexpected symbol '" + firstChar + "' was scanned")
 				return Token(Const.UET, firstChar)
 
 
+	@staticmethod
+	def IsDigit(char):
+		"""
+		Check if a character is an ASCII digit; str.isdigit() also accepts
+		other digits of the decoded source (e.g. superscripts), which int() rejects
+		"""
+		return "0" <= char <= "9"
+
+
+	@staticmethod
+	def ReportUnexpectedToken(chario, token):
+		"""
+		Print the error message of an unexpected token
+
+		Arguments:
+			chario {Chario} -- where the message is reported
+			token {Token} -- the unexpected token
+		"""
+		chario.PrintErrorMessage("Unexpected symbol '" + token.value + "' was scanned", token.start)
+
+
 	def GetNextToken(self):
 		"""
-		Read characters from chario and return the first token found
+		Read characters from chario and return the first token found,
+		reporting it if it is an unexpected one
+		"""
+		token = self.ScanToken()
+		if token.code == Const.UET:
+			self.ReportUnexpectedToken(self.chario, token)
+		return token
+
+
+	def __iter__(self):
+		"""
+		Generate the tokens of the rest of the source, up to and including EOF.
+		unexpected tokens are not reported here but by their consumer (e.g. TokenStream),
+		so that the message appears when the parser reaches the token
+		"""
+		while True:
+			token = self.ScanToken()
+			yield token
+			if token.code == Const.EOF:
+				return
+
+
+	def ScanToken(self):
+		"""
+		Read characters from chario and return the first token found,
+		marked with the source offsets where it starts and ends
 		"""
 		# remove ignored characters
-		ignoredCharacters = (" ", "\r", "\t")
 		while True:
 			nextChar = self.chario.PeekNextChar()
 			if nextChar == "EOF":
-				return Token(Const.EOF, None)
+				return Token(Const.EOF, None, self.chario.position, self.chario.position)
 
-			if nextChar in ignoredCharacters:
+			if nextChar in self.IGNORED_CHARACTERS:
 				self.chario.GetNextChar()
 			else:
 				break
 
 		# check the type of this token.
 		# this scanner assumes that all identifiers start with an alphabet.
+		start = self.chario.position
 		nextChar = self.chario.PeekNextChar()
-		if nextChar == Const.NEWLINE:
+		if nextChar == "\n":
 			self.chario.GetNextChar()
-			return Token(Const.NEWLINE, None)
+			token = Token(Const.NEWLINE, None)
 		elif nextChar == "\"":
-			return self.StringToken()
+			token = self.StringToken()
 		elif nextChar.isalpha():
-			return self.AlphabeticToken()
-		elif nextChar.isdigit():
-			return self.IntegerToken()
+			token = self.AlphabeticToken()
+		elif self.IsDigit(nextChar):
+			token = self.IntegerToken()
 		else:
-			return self.OperatorToken()
+			token = self.OperatorToken()
+
+		token.start = start
+		token.end = self.chario.position
+		return token
@@ -1,3 +1,6 @@
+from NameTable import NameTable
+
+
 class SymbolEntry(object):
 	"""docstring for SymbolEntry"""
 
@@ -7,13 +10,28 @@ class SymbolEntry(object):
 	PROC = "procedure"
 	PARAM = "parameter"
 
-	def __init__(self, name, role=None, value=None):
+	# one entry per declaration; without a __dict__ an entry is three pointers
+	__slots__ = ("symbol", "role", "value")
+
+	def __init__(self, symbol, role=None, value=None):
+		"""
+		Arguments:
+			symbol {int} -- the NameTable ID of the name
+		"""
 		super(SymbolEntry, self).__init__()
-		self.name = name.lower() if name.__class__ == "str" else name
+		self.symbol = symbol
 		self.role = role
 		self.value = value
 
 
+	@property
+	def name(self):
+		"""
+		the name of the entry, for diagnostics
+		"""
+		return NameTable.Name(self.symbol)
+
+
 
 
 		
\ No newline at end of file
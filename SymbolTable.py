@@ -1,74 +1,170 @@
+import itertools
+from types import MappingProxyType
+
 from SymbolEntry import SymbolEntry
+from NameTable import NameTable
 
 class SymbolTable(object):
 	"""docstring for SymbolTable"""
 
-	def __init__(self, chario):
+	def __init__(self, chario, prelude=None):
 		"""
 		Creates an empty stack of tables, with a reference to a Chario object for the output of error messages.
+		Each table maps the symbol IDs declared in its scope to their entries, and
+		the bindings map each symbol ID to the chain of its entries from the outermost
+		to the innermost scope, so that the visible entry is always the last one.
 		
 		Arguments:
 			chario {Chario} -- the main Chario instance
+
+		Keyword Arguments:
+			prelude {MappingProxyType, None} -- a frozen scope made by SymbolTable.freezeScope(),
+				which becomes the outermost table (default: {None})
+		"""
+		self.prelude = prelude
+		self.reset(chario)
+
+
+	@staticmethod
+	def freezeScope(declarations):
+		"""
+		Creates a read-only table, to be shared by many SymbolTable instances as their prelude.
+		its entries are never assigned a value, since they are types, procedures and constants
+		
+		Arguments:
+			declarations {iterable} -- (name, role, value) of each predefined identifier
+		
+		Returns:
+			[MappingProxyType] -- the frozen table
+		"""
+		scope = {}
+		for name, role, value in declarations:
+			symbol = NameTable.Intern(name)
+			scope[symbol] = SymbolEntry(symbol, role, value)
+		return MappingProxyType(scope)
+
+
+	def reset(self, chario):
+		"""
+		Drops every scope but the prelude, for a new program.
+		
+		Arguments:
+			chario {Chario} -- the Chario of the new program
 		"""
 		self.chario = chario
-		self.stack = []
+		# the prelude is the outermost table until a symbol is entered into it
+		self.stack = [] if self.prelude is None else [self.prelude]
+		self.bindings = {}
+		
+
+	def snapshot(self):
+		"""
+		Returns the state of the stack, which restore() brings back.
+		a table only grows while it is on the stack, so the state is
+		each table with its number of entries, and costs nothing to take.
+		
+		Returns:
+			[list] -- (table, number of entries) of each scope, the outermost first
+		"""
+		return [(scope, len(scope)) for scope in self.stack]
+
+
+	def restore(self, snapshot):
+		"""
+		Replaces the stack with copies of the tables of a snapshot, as they were
+		when it was taken, and binds their entries again. the tables of the snapshot
+		are not changed, so that it can be restored again.
 		
+		Arguments:
+			snapshot {list} -- the value of snapshot()
+		"""
+		self.stack = []
+		self.bindings = {}
+		for scope, size in snapshot:
+			if scope is self.prelude:
+				self.stack.append(scope)
+				continue
+			scope = dict(itertools.islice(scope.items(), size))
+			self.stack.append(scope)
+			for symbol, entry in scope.items():
+				# the entries copied from the prelude are found without bindings
+				if self.prelude is not None and self.prelude.get(symbol) is entry:
+					continue
+				self.bindings.setdefault(symbol, []).append(entry)
+
 
 	def enterScope(self):
 		"""
 		Pushes a new table onto the stack.
 		"""
-		self.stack.append([])
+		self.stack.append({})
 
 
 	def exitScope(self):
 		"""
-		Pops a table from the stack and prints its contents.
+		Pops a table from the stack and unbinds its entries.
 		"""
-		self.stack.pop()
+		for symbol in self.stack.pop():
+			chain = self.bindings.get(symbol)
+			if chain is None:
+				# an entry of the prelude, found without bindings
+				continue
+			chain.pop()
+			if not chain:
+				del self.bindings[symbol]
 
 
-	def enterSymbol(self, name, role=None, value=None):
+	def enterSymbol(self, symbol, role=None, value=None, offset=None):
 		"""
 		If name is not already present, inserts an entry for it into the
 		table and returns that entry; otherwise, prints an error message
 		and returns an empty entry.
 		
 		Arguments:
-			name {str} -- the name of the new symbol(identifier)
+			symbol {int} -- the NameTable ID of the new symbol(identifier)
+
+		Keyword Arguments:
+			offset {int, None} -- source offset of the identifier, for error messages (default: {None})
 		
 		Returns:
 			[SymbolEntry, None] -- the new entry instance
 		"""
-		name = name.lower()
-		if name in [entry.name for entry in self.stack[-1]]:
-			self.chario.PrintErrorMessage("redefinition of already defined identifier [" + name + "]")
+		scope = self.stack[-1]
+		if symbol in scope:
+			self.chario.PrintErrorMessage("redefinition of already defined identifier [" + NameTable.Name(symbol) + "]", offset)
 			return None
-		newEntry = SymbolEntry(name, role, value)
-		self.stack[-1].append(newEntry)
+		newEntry = SymbolEntry(symbol, role, value)
+		if scope is self.prelude:
+			# copy on write: the shared prelude itself is never changed
+			scope = self.stack[-1] = dict(scope)
+		scope[symbol] = newEntry
+		self.bindings.setdefault(symbol, []).append(newEntry)
 		return newEntry
 
 
-	def findSymbol(self, name):
+	def findSymbol(self, symbol, offset=None):
 		"""
 		If name is already present, returns its entry; otherwise, prints
 		an error message and returns an empty entry.
 		
 		Arguments:
-			name {str} -- the name of the entry to find
+			symbol {int, None} -- the NameTable ID of the entry to find
+
+		Keyword Arguments:
+			offset {int, None} -- source offset of the identifier, for error messages (default: {None})
 		
 		Returns:
 			[SymbolEntry, None] -- the entry found
 		"""
-		if name == None:
+		if symbol == None:
 			return None
 			
-		name = name.lower()
-		for scope in self.stack[::-1]:
-			for entry in scope:
-				if name == entry.name:
-					return entry
-		self.chario.PrintErrorMessage("undefined identifier [" + name + "] was used")
+		chain = self.bindings.get(symbol)
+		if chain:
+			return chain[-1]
+		if self.prelude is not None and symbol in self.prelude:
+			return self.prelude[symbol]
+		self.chario.PrintErrorMessage("undefined identifier [" + NameTable.Name(symbol) + "] was used", offset)
 		return None
 
 
@@ -1,4 +1,5 @@
 from Const import Const
+from NameTable import NameTable
 
 
 class Token(Const):
@@ -12,9 +13,49 @@ class Token(Const):
 	and a data type, as we will see in later chapters.
 	"""
 
-	def __init__(self, code, value):
+	# a source holds a token per few characters: keep them free of a __dict__
+	__slots__ = ("code", "lexeme", "start", "end", "source", "symbol")
+
+	def __init__(self, code, value, start=None, end=None, source=None, symbol=None):
+		"""
+		Arguments:
+			code {int} -- the type of the token, one of the Const codes
+			value {str, None} -- the name or the literal value of the token,
+				None if it is taken lazily from source
+
+		Keyword Arguments:
+			start {int, None} -- the source offset of the first character (default: {None})
+			end {int, None} -- the source offset right after the last character (default: {None})
+			source {str, None} -- the source buffer the value is sliced from (default: {None})
+			symbol {int, None} -- the NameTable ID of an identifier (default: {None})
+		"""
 		self.code = code
-		self.value = value
+		self.lexeme = value
+		self.start = start
+		self.end = end
+		self.source = source
+		self.symbol = symbol
+
+
+	@property
+	def value(self):
+		"""
+		the name or the literal value of the token.
+		a token scanned with its source only records where its text is,
+		and the text is sliced out of the source when it is first needed.
+		the name of an identifier is looked up in the NameTable by its symbol ID
+		"""
+		if self.lexeme is None and self.symbol is not None:
+			self.lexeme = NameTable.Name(self.symbol)
+		elif self.lexeme is None and self.source is not None:
+			start, end = self.start, self.end
+			if self.code == Const.stringLiteral:
+				# strip the surrounding quotes (an unterminated literal has no closing one)
+				start += 1
+				if end > start and self.source[end - 1] == "\"":
+					end -= 1
+			self.lexeme = self.source[start:end]
+		return self.lexeme
 
 	
 	def __str__(self):
@@ -28,8 +69,8 @@ class Token(Const):
 		if self.code == Const.NEWLINE:
 			return "[newline]"
 		
-		name = "[" + self.code
-		if self.code in (Const.numericalLiteral, Const.ID, Const.UET):
+		name = "[" + Const.names[self.code]
+		if self.code in Const.printedValues:
 			name += "(" + self.value + ")"
 		name += "]"
 		return name
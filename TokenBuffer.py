@@ -0,0 +1,135 @@
+from array import array
+
+from Const import Const
+from Token import Token
+from NameTable import NameTable
+
+
+class TokenBuffer:
+	"""
+	The TokenBuffer class keeps the tokens of a whole source file
+	in compact parallel columns instead of one Token object per token:
+	the kind, the start and end offsets, and the value: the NameTable ID
+	of an identifier, or the index of an unexpected symbol in a pool of interned strings.
+	Token objects are created one at a time only when the parser reads them.
+	"""
+
+	# literals are not interned; their values are sliced from the source when needed
+	LAZY_VALUE = -1
+
+	def __init__(self, chario):
+		"""
+		Arguments:
+			chario {Chario} -- the Chario whose buffer the offsets refer to
+		"""
+		self.chario = chario
+		self.source = chario.buffer
+		# token codes fit in a byte
+		self.kinds = array('B')
+		self.starts = array('q')
+		self.ends = array('q')
+		self.values = array('i')
+
+		# interned unexpected symbols
+		self.pool = []
+		self.poolIndex = {}
+
+
+	@classmethod
+	def FromScanner(cls, scanner):
+		"""
+		tokenize the whole source of a scanner into a new TokenBuffer
+
+		Arguments:
+			scanner {Scanner, RegexScanner} -- the scanner to drain
+		"""
+		tokens = cls(scanner.chario)
+		for token in scanner:
+			tokens.append(token)
+		return tokens
+
+
+	def append(self, token):
+		"""
+		store a token in the columns
+
+		Arguments:
+			token {Token} -- the token to store
+		"""
+		if token.code == Const.ID:
+			value = token.symbol
+		elif token.code in Const.literals or token.value is None:
+			value = self.LAZY_VALUE
+		else:
+			value = self.intern(token.value)
+
+		self.kinds.append(token.code)
+		self.starts.append(token.start)
+		self.ends.append(token.end)
+		self.values.append(value)
+
+
+	def extend(self, kinds, starts, ends, symbols):
+		"""
+		store tokens given as columns of codes and offsets, e.g. scanned by another process.
+		unexpected symbols are sliced out of the source and interned
+
+		Arguments:
+			kinds {array} -- token codes
+			starts {array} -- source offsets of the first characters
+			ends {array} -- source offsets right after the last characters
+			symbols {array} -- NameTable IDs of the identifiers among the tokens, in order
+		"""
+		values = array('i', [self.LAZY_VALUE]) * len(kinds)
+		symbols = iter(symbols)
+		for index, code in enumerate(kinds):
+			if code == Const.ID:
+				values[index] = next(symbols)
+			elif code == Const.UET:
+				values[index] = self.intern(self.source[starts[index]:ends[index]])
+
+		self.kinds.extend(kinds)
+		self.starts.extend(starts)
+		self.ends.extend(ends)
+		self.values.extend(values)
+
+
+	def intern(self, value):
+		"""
+		return the index of a value in the pool, adding it if it is new
+		"""
+		index = self.poolIndex.get(value)
+		if index is None:
+			index = self.poolIndex[value] = len(self.pool)
+			self.pool.append(value)
+		return index
+
+
+	def __len__(self):
+		return len(self.kinds)
+
+
+	def token(self, index):
+		"""
+		create the Token object stored at an index
+
+		Arguments:
+			index {int} -- the position of the token in the buffer
+		"""
+		code = self.kinds[index]
+		value = self.values[index]
+		if code == Const.ID:
+			return Token(code, None, self.starts[index], self.ends[index], symbol=value)
+		if value != self.LAZY_VALUE:
+			return Token(code, self.pool[value], self.starts[index], self.ends[index])
+		if code in Const.literals:
+			return Token(code, None, self.starts[index], self.ends[index], self.source)
+		return Token(code, None, self.starts[index], self.ends[index])
+
+
+	def __iter__(self):
+		"""
+		a cursor over the buffer, creating each Token only when it is reached
+		"""
+		for index in range(len(self.kinds)):
+			yield self.token(index)
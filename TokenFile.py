@@ -0,0 +1,181 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from Const import Const
+from Token import Token
+from Chario import Chario
+from NameTable import NameTable
+
+
+class TokenFileError(ValueError):
+	"""
+	Raised when a file cannot be loaded as a token file
+	"""
+
+
+class TokenFile:
+	"""
+	The TokenFile class saves the tokens of a source into a binary token file
+	and reads them back, so that a program is scanned once and checked many times.
+	The file is made of a fixed header, one fixed-width record per token,
+	the offsets where the source lines start, and a pool of the strings
+	the tokens refer to (identifier names, literal values and unexpected symbols).
+	A loaded file is memory-mapped: records are unpacked only when their
+	tokens are read, and a TokenFile is a token source the Parser consumes
+	instead of a Scanner.
+	"""
+
+	MAGIC = b"TADA"
+	VERSION = 1
+
+	# magic, version, record size, number of tokens, lines and strings in the pool
+	HEADER = struct.Struct("<4sHHqqq")
+	# code, start offset, end offset, index of the value in the pool
+	RECORD = struct.Struct("<iqqi")
+	LINE_START = struct.Struct("<q")
+	STRING_LENGTH = struct.Struct("<I")
+
+	# the token has no value
+	NO_VALUE = -1
+
+	def __init__(self, fileName, diagnostics=None):
+		"""
+		map a token file into memory
+
+		Arguments:
+			fileName {str} -- the token file to load
+
+		Keyword Arguments:
+			diagnostics {Diagnostics, None} -- where the messages of the Parser are reported (default: {None})
+		"""
+		with open(fileName, "rb") as file:
+			# an empty file cannot be mapped, so the header is checked first
+			header = file.read(self.HEADER.size)
+			if len(header) < self.HEADER.size:
+				raise TokenFileError(fileName + " is not a token file")
+			magic, version, recordSize, self.count, lines, strings = self.HEADER.unpack(header)
+			if magic != self.MAGIC:
+				raise TokenFileError(fileName + " is not a token file")
+			if version != self.VERSION or recordSize != self.RECORD.size:
+				raise TokenFileError(fileName + " has unsupported token file version " + str(version))
+
+			self.records = self.HEADER.size
+			lineStarts = self.records + self.count * self.RECORD.size
+			pool = lineStarts + lines * self.LINE_START.size
+			if min(self.count, lines, strings) < 0 or os.fstat(file.fileno()).st_size < pool:
+				raise TokenFileError(fileName + " is truncated")
+			self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		self.chario = Chario.FromLineStarts(self.LineStarts(lineStarts, lines), diagnostics)
+		self.pool = self.ReadPool(pool, strings)
+		if self.pool is None:
+			raise TokenFileError(fileName + " is truncated")
+		# identifier names are interned once per file, not once per token
+		self.symbols = {}
+
+
+	def LineStarts(self, offset, count):
+		"""
+		Return the line start offsets stored in the file, without copying them
+		when the byte order of the machine is the one of the file
+		"""
+		view = memoryview(self.data)[offset:offset + count * self.LINE_START.size]
+		if sys.byteorder == "little":
+			return view.cast("q")
+		starts = array("q", view)
+		starts.byteswap()
+		return starts
+
+
+	def ReadPool(self, offset, count):
+		"""
+		Decode the strings of the pool, or return None if the file ends before them
+		"""
+		pool = []
+		size = len(self.data)
+		for _ in range(count):
+			if offset + self.STRING_LENGTH.size > size:
+				return None
+			(length,) = self.STRING_LENGTH.unpack_from(self.data, offset)
+			offset += self.STRING_LENGTH.size
+			if offset + length > size:
+				return None
+			pool.append(self.data[offset:offset + length].decode("utf-8"))
+			offset += length
+		return pool
+
+
+	@classmethod
+	def Write(cls, fileName, tokens, chario):
+		"""
+		scan tokens up to and including EOF and save them into a token file
+
+		Arguments:
+			fileName {str} -- the token file to create
+			tokens {iterable} -- the tokens to save, e.g. a Scanner
+			chario {Chario} -- the Chario holding the source of the tokens
+
+		Returns:
+			[int] -- the number of tokens saved
+		"""
+		records = bytearray()
+		pool = []
+		poolIndex = {}
+		for token in tokens:
+			value = cls.NO_VALUE
+			if token.code in Const.valuedTokens and token.value is not None:
+				value = poolIndex.get(token.value)
+				if value is None:
+					value = poolIndex[token.value] = len(pool)
+					pool.append(token.value)
+			records += cls.RECORD.pack(token.code, token.start, token.end, value)
+			if token.code == Const.EOF:
+				break
+
+		count = len(records) // cls.RECORD.size
+		with open(fileName, "wb") as file:
+			file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, cls.RECORD.size,
+				count, len(chario.lineStarts), len(pool)))
+			file.write(records)
+			lineStarts = array("q", chario.lineStarts)
+			if sys.byteorder != "little":
+				lineStarts.byteswap()
+			file.write(lineStarts.tobytes())
+			for string in pool:
+				encoded = string.encode("utf-8")
+				file.write(cls.STRING_LENGTH.pack(len(encoded)))
+				file.write(encoded)
+		return count
+
+
+	def __len__(self):
+		return self.count
+
+
+	def token(self, index):
+		"""
+		create the Token object of a record
+
+		Arguments:
+			index {int} -- the position of the token in the file
+		"""
+		code, start, end, value = self.RECORD.unpack_from(self.data, self.records + index * self.RECORD.size)
+		if value == self.NO_VALUE:
+			return Token(code, None, start, end)
+		if code == Const.ID:
+			symbol = self.symbols.get(value)
+			if symbol is None:
+				symbol = self.symbols[value] = NameTable.Intern(self.pool[value])
+			return Token(code, None, start, end, symbol=symbol)
+		return Token(code, self.pool[value], start, end)
+
+
+	def __iter__(self):
+		"""
+		a cursor over the records, creating each Token only when it is reached
+		"""
+		for index in range(self.count):
+			yield self.token(index)
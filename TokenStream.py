@@ -0,0 +1,106 @@
+import itertools
+
+from Const import Const
+from Token import Token
+from Scanner import Scanner
+
+
+class TokenStream:
+	"""
+	The TokenStream class hands the tokens of a scanner over to the parser.
+	Tokens are pulled from the scanner's generator in batches into
+	a fixed-size ring buffer, which also lets the parser look
+	a few tokens ahead without consuming them.
+	Once the source is exhausted, the EOF token is repeated forever.
+	"""
+
+	def __init__(self, tokens, chario, capacity=64):
+		"""
+		Arguments:
+			tokens {iterable} -- the tokens to hand over, e.g. a Scanner
+			chario {Chario} -- where unexpected tokens are reported
+
+		Keyword Arguments:
+			capacity {int} -- size of the ring buffer, rounded up to a power of two (default: {64})
+		"""
+		size = 1
+		while size < capacity:
+			size *= 2
+
+		self.ring = [None] * size
+		self.mask = size - 1
+		self.reset(tokens, chario)
+
+
+	def reset(self, tokens, chario):
+		"""
+		hand over the tokens of another source, reusing the ring buffer
+
+		Arguments:
+			tokens {iterable} -- the tokens to hand over
+			chario {Chario} -- where unexpected tokens are reported
+		"""
+		self.tokens = iter(tokens)
+		self.chario = chario
+		for index in range(len(self.ring)):
+			self.ring[index] = None
+		self.head = 0
+		self.count = 0
+		self.eof = None
+
+
+	def fill(self, needed):
+		"""
+		pull a batch of tokens into every free slot of the ring buffer,
+		so that at least the needed number of tokens are buffered
+		"""
+		ring, mask = self.ring, self.mask
+		tail = self.head + self.count
+		for token in itertools.islice(self.tokens, len(ring) - self.count):
+			ring[tail & mask] = token
+			tail += 1
+			if token.code == Const.EOF:
+				self.eof = token
+				break
+		self.count = tail - self.head
+
+		# the source is exhausted: repeat its EOF token
+		if self.count < needed:
+			if self.eof is None:
+				end = self.chario.position
+				self.eof = Token(Const.EOF, None, end, end)
+			while self.count < needed:
+				ring[(self.head + self.count) & mask] = self.eof
+				self.count += 1
+
+
+	def advance(self):
+		"""
+		consume and return the next token, reporting it if it is an unexpected one
+		"""
+		if self.count == 0:
+			self.fill(1)
+
+		token = self.ring[self.head]
+		self.ring[self.head] = None
+		self.head = (self.head + 1) & self.mask
+		self.count -= 1
+
+		if token.code == Const.UET:
+			Scanner.ReportUnexpectedToken(self.chario, token)
+		return token
+
+
+	def peek(self, k=1):
+		"""
+		return the k-th token that advance() would return, without consuming anything
+
+		Arguments:
+			k {int} -- how far to look ahead, between 1 and the capacity (default: {1})
+		"""
+		if not 0 < k <= len(self.ring):
+			raise ValueError("cannot look " + str(k) + " tokens ahead")
+
+		if self.count < k:
+			self.fill(k)
+		return self.ring[(self.head + k - 1) & self.mask]
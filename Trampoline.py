@@ -0,0 +1,31 @@
+"""
+Runs nested routines on an explicit stack instead of the Python call stack.
+A routine is a generator which yields the routine of each nested phrase it needs,
+receives the value that routine returned, and returns a value of its own,
+e.g. node.statements = yield self.sequenceOfStatementsSteps()
+The nesting depth is then only limited by memory, not by the recursion limit.
+"""
+
+
+def trampoline(routine):
+	"""
+	run a routine and the routines it yields to completion
+
+	Arguments:
+		routine {generator} -- the outermost routine
+
+	Returns:
+		the value returned by the routine
+	"""
+	stack = [routine]
+	value = None
+	while stack:
+		try:
+			nested = stack[-1].send(value)
+		except StopIteration as stop:
+			stack.pop()
+			value = stop.value
+		else:
+			stack.append(nested)
+			value = None
+	return value
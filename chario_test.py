@@ -0,0 +1,31 @@
+import unittest
+
+from Const import Const
+from Chario import Chario
+from Scanner import Scanner
+
+
+class CharioTest(unittest.TestCase):
+
+	def testFoldText(self):
+		self.assertEqual(Chario.FoldText('X := "Hello";'), ('x := "Hello";', Chario.CODE))
+		self.assertEqual(Chario.FoldText('Print("A'), ('print("A', Chario.STRING))
+		self.assertEqual(Chario.FoldText('B") + Y;', Chario.STRING), ('B") + y;', Chario.CODE))
+
+	def testQuoteInIdentifier(self):
+		# the quote does not open a string: it is a character of the identifier
+		self.assertEqual(Chario.FoldText('AB"CD := "Ef";'), ('ab"cd := "Ef";', Chario.CODE))
+		self.assertEqual(Chario.FoldText('1"Ab" A"'), ('1"Ab" a"', Chario.WORD))
+		self.assertEqual(Chario.FoldText('"Cd"', Chario.WORD), ('"cd"', Chario.WORD))
+
+	def testChunkBoundary(self):
+		# an identifier, then a string literal, across the boundary of two chunks
+		source = " " * (Chario.CHUNK_SIZE - 2) + 'AB"C := "De";\n'
+		chario = Chario(source.encode("utf-8"))
+		self.assertEqual(chario.buffer, source.replace('AB"C', 'ab"c'))
+		self.assertEqual([token.code for token in Scanner(chario)][:4],
+			[Const.ID, Const.COLON_EQ, Const.stringLiteral, Const.SEMICOLON])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,90 @@
+import io
+import json
+import unittest
+
+from Diagnostics import Diagnostics, ErrorLimitExceeded
+
+
+class DiagnosticsTest(unittest.TestCase):
+
+	def testText(self):
+		stream = io.StringIO()
+		diagnostics = Diagnostics(stream)
+		diagnostics.Error("expected [;]", (3, 5))
+		diagnostics.Note("trailing tokens were discarded")
+		diagnostics.Recovery("continue parsing next statement")
+		diagnostics.Error("undefined")
+		diagnostics.Output("1")
+		diagnostics.Flush()
+		self.assertEqual(stream.getvalue(), "E: 3:5: expected [;]\ntrailing tokens were discarded\n"
+			"continue parsing next statement\n\nE: undefined\n1\n")
+
+	def testJsonLines(self):
+		stream = io.StringIO()
+		diagnostics = Diagnostics(stream, format="jsonl")
+		diagnostics.Error("expected [;]", (3, 5))
+		diagnostics.Output("1")
+		diagnostics.Flush()
+		records = [json.loads(line) for line in stream.getvalue().splitlines()]
+		self.assertEqual(records, [
+			{"kind": "error", "message": "expected [;]", "line": 3, "column": 5, "count": 1},
+			{"kind": "output", "message": "1", "line": None, "column": None, "count": 1},
+		])
+
+	def testUnknownFormat(self):
+		with self.assertRaises(ValueError):
+			Diagnostics(format="xml")
+
+	def testCoalesce(self):
+		stream = io.StringIO()
+		diagnostics = Diagnostics(stream, coalesce=True)
+		for line in range(1, 4):
+			diagnostics.Error("x: undefined identifier", (line, 1))
+			diagnostics.Output(str(line))
+		diagnostics.Flush()
+		self.assertEqual(stream.getvalue().splitlines(),
+			["E: 1:1: x: undefined identifier (3 times)", "1", "2", "3"])
+		self.assertEqual(diagnostics.errorCount, 3)
+
+	def testCoalesceOrder(self):
+		def report(bufferSize):
+			stream = io.StringIO()
+			diagnostics = Diagnostics(stream, coalesce=True, bufferSize=bufferSize)
+			diagnostics.Output("start")
+			for line in range(1, 11):
+				diagnostics.Error("expected [;]", (line, 6))
+				diagnostics.Note("trailing tokens were discarded")
+				diagnostics.Recovery("continue parsing next statement")
+			diagnostics.Error("x: undefined", (11, 1))
+			diagnostics.Flush()
+			return stream.getvalue()
+
+		expected = report(4096)
+		self.assertEqual(expected.splitlines()[:5], ["start", "E: 1:6: expected [;] (10 times)",
+			"trailing tokens were discarded", "continue parsing next statement", ""])
+		self.assertTrue(expected.endswith("E: 11:1: x: undefined\n"))
+		# the records are written in the order they were reported, whatever the size of the buffer
+		for bufferSize in (1, 2, 3, 7):
+			self.assertEqual(report(bufferSize), expected, bufferSize)
+
+	def testFlushBeforeErrors(self):
+		stream = io.StringIO()
+		diagnostics = Diagnostics(stream, coalesce=True, bufferSize=2)
+		for line in range(3):
+			diagnostics.Output(str(line))
+		# the records before the first error are written as the buffer fills
+		self.assertEqual(stream.getvalue(), "0\n1\n")
+
+	def testErrorLimit(self):
+		stream = io.StringIO()
+		diagnostics = Diagnostics(stream, coalesce=True, maxErrors=3)
+		diagnostics.Error("a")
+		diagnostics.Error("a")
+		with self.assertRaises(ErrorLimitExceeded):
+			diagnostics.Error("b")
+		diagnostics.Flush()
+		self.assertEqual(stream.getvalue().splitlines(), ["E: a (2 times)", "E: b"])
+
+
+if __name__ == "__main__":
+	unittest.main()
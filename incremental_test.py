@@ -0,0 +1,147 @@
+import io
+import random
+import unittest
+
+from Chario import Chario
+from Diagnostics import Diagnostics
+from Scanner import Scanner
+from Parser import Parser
+from Analyzer import Analyzer
+from Evaluator import Evaluator
+from IncrementalChecker import IncrementalChecker
+from AST import Node
+
+
+# every construct of the grammar, without syntax errors
+PROGRAM = """procedure MAIN is
+	SIZE : constant := 2 ** 3;
+	type COLOR is (RED, GREEN, BLUE);
+	type INDEX is range 1..SIZE;
+	type TABLE is array(INDEX, INDEX) of INTEGER;
+	T : TABLE;
+	I, J : INTEGER;
+	C : COLOR;
+	procedure FILL(X : in INTEGER; Y : in out TABLE; Z : out BOOLEAN) is
+	begin
+		Y(1, 1) := X;
+		Z := not (X = 0) and X /= 1 and X >= -2;
+	end FILL;
+begin
+	I := -(1 + 2) * 3 mod 4 - SIZE / 2;
+	if I < 0 then
+		null;
+	elsif I <= 1 or I > 10 then
+		J := +I;
+	else
+		J := I;
+	end if;
+	while J < SIZE loop
+		J := J + 1;
+	end loop;
+	loop
+		exit when J > 10;
+		exit;
+	end loop;
+	FILL(I, T, C);
+	print("Done");
+end MAIN;
+"""
+
+# syntax errors the recovery has to resume from
+ERRORS = """procedure P is
+	X : INTEGER
+	Y : ;
+begin
+	X := (1 + ;
+	if X then null; end loop;
+	Y := 1 < 2 < 3;
+	while INIT(X, Y);
+	X := 1 and 2 or 3;
+end Q;
+"""
+
+
+def dump(node):
+	"""
+	a comparable form of a syntax tree
+	"""
+	if isinstance(node, Node):
+		return (type(node).__name__,) + tuple((field, dump(getattr(node, field)))
+			for cls in type(node).__mro__ for field in getattr(cls, "__slots__", ()) if field != "entry")
+	if isinstance(node, (list, tuple)):
+		return tuple(dump(item) for item in node)
+	return node
+
+
+# pieces of programs inserted by the random edits
+PIECES = ["procedure", "is", "begin", "end", "if", "then", "loop", "while", "null", ";", ":", ",",
+	"(", ")", ":=", "\n", " X", "print", "1", "\"", "\"s\"", "+", "not", "@", "A\"B", "end P;\n",
+	"procedure Q is\nbegin\nnull;\nend Q;\n", "X : INTEGER;\n", "  "]
+
+
+def fullCheck(text):
+	"""
+	check a program from scratch, and return its tree and output
+	"""
+	stream = io.StringIO()
+	chario = Chario.FromText(text, Diagnostics(stream))
+	tree = Parser(chario, Scanner(chario)).parse()
+	Analyzer(chario).analyze(tree)
+	Evaluator(chario.diagnostics).evaluate(tree)
+	chario.diagnostics.Flush()
+	return dump(tree), stream.getvalue()
+
+
+def report(checker):
+	stream = io.StringIO()
+	diagnostics = Diagnostics(stream)
+	checker.report(diagnostics)
+	diagnostics.Flush()
+	return dump(checker.tree), stream.getvalue()
+
+
+class IncrementalCheckerTest(unittest.TestCase):
+
+	def assertEdit(self, checker, text, start, end, new):
+		text = text[:start] + new + text[end:]
+		checker.edit(start, end, new)
+		self.assertEqual(checker.text, text)
+		self.assertEqual(report(checker), fullCheck(text), (start, end, new))
+		return text
+
+	def testCheck(self):
+		for text in (PROGRAM, ERRORS, ""):
+			self.assertEqual(report(IncrementalChecker(text)), fullCheck(text))
+
+	def testEdits(self):
+		text = PROGRAM
+		checker = IncrementalChecker(text)
+		# inside the nested body, then changing what it declares to the rest
+		offset = text.index("Y(1, 1) := X;")
+		text = self.assertEdit(checker, text, offset, offset + 1, "T")
+		text = self.assertEdit(checker, text, offset, offset + 1, "Y")
+		offset = text.index("procedure FILL")
+		text = self.assertEdit(checker, text, offset + 10, offset + 14, "FILLED")
+		# a string literal opened and closed again over the rest of the program
+		offset = text.index("J := +I;")
+		text = self.assertEdit(checker, text, offset, offset, "\"")
+		text = self.assertEdit(checker, text, offset, offset + 1, "")
+		# a quote inside an identifier does not open a string literal
+		text = self.assertEdit(checker, text, offset + 1, offset + 1, "\"")
+		# the end of the main body
+		text = self.assertEdit(checker, text, len(text) - 5, len(text), "")
+		self.assertEdit(checker, text, len(text), len(text), "MAIN;\n")
+
+	def testRandomEdits(self):
+		generator = random.Random(21)
+		for _ in range(40):
+			text = generator.choice((PROGRAM, ERRORS))
+			checker = IncrementalChecker(text)
+			for _ in range(generator.randint(1, 10)):
+				start = generator.randint(0, len(text))
+				end = min(len(text), start + generator.choice((0, 0, 1, 2, 5, 20)))
+				text = self.assertEdit(checker, text, start, end, generator.choice(PIECES))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,57 @@
+import io
+import unittest
+
+from Chario import Chario
+from Diagnostics import Diagnostics
+from Scanner import Scanner
+from IterativeParser import IterativeParser
+from Analyzer import Analyzer
+from Evaluator import Evaluator
+
+
+# deeper than the recursion limit allows Parser to go
+DEPTH = 20000
+
+
+def check(text):
+	"""
+	check a program with the IterativeParser, and return its tree and diagnostics
+	"""
+	stream = io.StringIO()
+	chario = Chario.FromText(text, Diagnostics(stream))
+	tree = IterativeParser(chario, Scanner(chario)).parse()
+	Analyzer(chario).analyze(tree)
+	Evaluator(chario.diagnostics).evaluate(tree)
+	chario.diagnostics.Flush()
+	return tree, stream.getvalue()
+
+
+def body(statements, declarations=""):
+	return "procedure P is\n" + declarations + "begin\n" + statements + "end P;\n"
+
+
+class IterativeParserTest(unittest.TestCase):
+
+	def testProcedures(self):
+		text = "".join("procedure P" + str(depth) + " is\n" for depth in range(DEPTH)) \
+			+ "".join("begin\nnull;\nend P" + str(depth) + ";\n" for depth in reversed(range(DEPTH)))
+		tree, output = check(text)
+		self.assertEqual(output, "")
+		self.assertTrue(tree.closed)
+
+	def testStatements(self):
+		tree, output = check(body("X := 0;\n" + "loop\n" * DEPTH + "exit;\n" + "end loop;\n" * DEPTH
+			+ "if X = 0 then\n" * DEPTH + "print(X);\n" + "end if;\n" * DEPTH, "X : INTEGER;\n"))
+		self.assertEqual(output, "0\n")
+		self.assertTrue(tree.closed)
+
+	def testExpressions(self):
+		tree, output = check(body("X := " + "(" * DEPTH + "1" + ")" * DEPTH + ";\nprint(X);\n"
+			+ "T(1) := " + "T(" * DEPTH + "1" + ")" * DEPTH + ";\n",
+			"type TABLE is array(INTEGER) of INTEGER;\nT : TABLE;\nX : INTEGER;\n"))
+		self.assertEqual(output, "1\n")
+		self.assertTrue(tree.closed)
+
+
+if __name__ == "__main__":
+	unittest.main()
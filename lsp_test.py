@@ -0,0 +1,133 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from NameTable import NameTable
+from LanguageServer import LanguageServer
+
+
+PROGRAM = "procedure P is\n\tX : INTEGER;\nbegin\n\tX := 1;\nend P;\n"
+
+
+def frame(message):
+	body = json.dumps(message).encode("utf-8")
+	return b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n\r\n" + body
+
+
+def session(*messages):
+	"""
+	serve the messages after an initialization, and return the exit code
+	and the messages written by the server
+	"""
+	messages = [{"id": 0, "method": "initialize", "params": {}}, {"method": "initialized"}] \
+		+ list(messages) + [{"id": -1, "method": "shutdown"}, {"method": "exit"}]
+	output = io.BytesIO()
+	server = LanguageServer(io.BytesIO(b"".join(frame(message) for message in messages)), output)
+	code = server.serve()
+	# read the messages back with the server's own framing
+	reader = LanguageServer(io.BytesIO(output.getvalue()), None)
+	written = []
+	while True:
+		message = reader.read()
+		if message is None:
+			return code, written
+		written.append(message)
+
+
+def response(written, id):
+	return next(message for message in written if message.get("id") == id)
+
+
+def openMessage(uri, text):
+	return {"method": "textDocument/didOpen", "params": {"textDocument": {"uri": uri, "text": text}}}
+
+
+class LanguageServerTest(unittest.TestCase):
+
+	def testFraming(self):
+		code, written = session()
+		self.assertEqual(code, 0)
+		self.assertEqual([message["id"] for message in written], [0, -1])
+		self.assertTrue(all(message["jsonrpc"] == "2.0" for message in written))
+
+	def testExitWithoutShutdown(self):
+		output = io.BytesIO()
+		server = LanguageServer(io.BytesIO(frame({"method": "exit"})), output)
+		self.assertEqual(server.serve(), 1)
+
+	def testNotInitialized(self):
+		output = io.BytesIO()
+		server = LanguageServer(io.BytesIO(frame({"id": 1, "method": "shutdown"})), output)
+		server.serve()
+		message = LanguageServer(io.BytesIO(output.getvalue()), None).read()
+		self.assertEqual(message["error"]["code"], LanguageServer.SERVER_NOT_INITIALIZED)
+
+	def testUnknownMethod(self):
+		_, written = session({"id": 1, "method": "textDocument/hover", "params": {}}, {"method": "$/unknown"})
+		self.assertEqual(response(written, 1)["error"]["code"], LanguageServer.METHOD_NOT_FOUND)
+
+	def testDiagnostics(self):
+		_, written = session(openMessage("a", PROGRAM), openMessage("b", PROGRAM.replace("X := 1", "Y := 1")))
+		published = {message["params"]["uri"]: message["params"]["diagnostics"] for message in written
+			if message.get("method") == "textDocument/publishDiagnostics"}
+		self.assertEqual(published["a"], [])
+		self.assertEqual(len(published["b"]), 1)
+		self.assertEqual(published["b"][0]["range"]["start"], {"line": 3, "character": 1})
+
+	def testDefinition(self):
+		_, written = session(openMessage("a", PROGRAM), {"id": 1, "method": "textDocument/definition",
+			"params": {"textDocument": {"uri": "a"}, "position": {"line": 3, "character": 1}}})
+		self.assertEqual(response(written, 1)["result"]["range"]["start"], {"line": 1, "character": 1})
+
+	def testUnopenedDocument(self):
+		change = {"method": "textDocument/didChange", "params": {"textDocument": {"uri": "a"},
+			"contentChanges": [{"text": PROGRAM}]}}
+		close = {"method": "textDocument/didClose", "params": {"textDocument": {"uri": "a"}}}
+		code, written = session(change, close, close)
+		self.assertEqual(code, 0)
+		self.assertFalse([message for message in written if message.get("method") == "window/logMessage"])
+
+	def testHandlerError(self):
+		# a broken request fails alone, with an internal error
+		bad = {"id": 1, "method": "textDocument/definition",
+			"params": {"textDocument": {"uri": "a"}, "position": {"line": "x", "character": 0}}}
+		# a broken notification is logged and ignored
+		change = {"method": "textDocument/didChange", "params": {"textDocument": {"uri": "a"}}}
+		code, written = session(openMessage("a", PROGRAM), bad, change, {"id": 2, "method": "textDocument/definition",
+			"params": {"textDocument": {"uri": "a"}, "position": {"line": 3, "character": 1}}})
+		self.assertEqual(code, 0)
+		self.assertEqual(response(written, 1)["error"]["code"], LanguageServer.INTERNAL_ERROR)
+		self.assertIsNotNone(response(written, 2)["result"])
+		logged = [message for message in written if message.get("method") == "window/logMessage"]
+		self.assertEqual(len(logged), 2)
+
+	def testNamesForgotten(self):
+		mark = NameTable.Mark()
+		close = {"method": "textDocument/didClose", "params": {"textDocument": {"uri": "a"}}}
+		session(openMessage("a", PROGRAM.replace("X", "FORGOTTEN")), close)
+		self.assertEqual(NameTable.Mark(), mark)
+
+	def testNamesCompacted(self):
+		# rename X of document a back and forth, through names seen only once
+		messages = [openMessage("a", PROGRAM), openMessage("b", PROGRAM.replace("X", "Y"))]
+		for index in range(50):
+			name = "TYPED" + str(index)
+			for old, new in (("X", name), (name, "X")):
+				messages.append({"method": "textDocument/didChange", "params": {"textDocument": {"uri": "a"},
+					"contentChanges": [{"range": {"start": {"line": 3, "character": 1},
+						"end": {"line": 3, "character": 1 + len(old)}}, "text": new}]}})
+		messages.append({"id": 1, "method": "textDocument/definition",
+			"params": {"textDocument": {"uri": "b"}, "position": {"line": 3, "character": 1}}})
+		mark = NameTable.Mark()
+		with mock.patch.object(LanguageServer, "NAME_SLACK", 10):
+			_, written = session(*messages)
+		self.assertLess(NameTable.Mark() - mark, 30)
+		self.assertEqual(response(written, 1)["result"]["range"]["start"], {"line": 1, "character": 1})
+		published = [message["params"] for message in written
+			if message.get("method") == "textDocument/publishDiagnostics"]
+		self.assertEqual(published[-1], {"uri": "a", "diagnostics": []})
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -1,17 +1,111 @@
+import argparse
+import json
+import sys
+
 from Token import Token
 from Chario import Chario
 from Scanner import Scanner
+from RegexScanner import RegexScanner
+from TokenBuffer import TokenBuffer
+from ParallelScanner import ParallelScanner
+from TokenFile import TokenFile, TokenFileError
 from Parser import Parser
+from IterativeParser import IterativeParser
+from Analyzer import Analyzer
+from Evaluator import Evaluator
+from InstrumentedSymbolTable import InstrumentedSymbolTable
+from LanguageServer import LanguageServer
+from Diagnostics import Diagnostics, ErrorLimitExceeded
+
+
+def parseArguments():
+	"""
+	read the command line options
+	"""
+	arguments = argparse.ArgumentParser(description="TinyAda syntax and semantic checker")
+	arguments.add_argument("source", nargs="?",
+		help="the source file, or - for the standard input (asked interactively if omitted)")
+	arguments.add_argument("--format", choices=Diagnostics.FORMATS, default="text",
+		help="output format of the diagnostics")
+	arguments.add_argument("--coalesce", action="store_true",
+		help="merge repeated identical errors into one message with a count")
+	arguments.add_argument("--max-errors", type=int, default=None, metavar="N",
+		help="stop the analysis after N errors")
+	arguments.add_argument("--scanner", choices=("char", "regex"), default="char",
+		help="scanner engine: character by character, or one master regular expression")
+	arguments.add_argument("--parser", choices=("recursive", "iterative"), default="recursive",
+		help="parser engine: recursive descent, or an explicit stack without a nesting limit")
+	arguments.add_argument("--level", choices=("syntax", "semantic", "full"), default="full",
+		help="analysis level: the syntax only, also the roles and scopes of the identifiers, "
+			"or also the evaluation of the constants and the print calls")
+	arguments.add_argument("--bulk", action="store_true",
+		help="tokenize the whole file into a compact token buffer before parsing")
+	arguments.add_argument("--jobs", type=int, default=None, metavar="N",
+		help="tokenize the whole file on N processes with the --scanner engine before parsing (implies --bulk)")
+	arguments.add_argument("--write-tokens", default=None, metavar="FILE",
+		help="save the tokens of the source into a binary token file instead of checking it")
+	arguments.add_argument("--tokens", action="store_true",
+		help="the source is a token file saved with --write-tokens")
+	arguments.add_argument("--symbol-stats", action="store_true",
+		help="print symbol table statistics as JSON to the standard error at the end, "
+			"unless the analysis stopped before the semantic checks")
+	arguments.add_argument("--lsp", action="store_true",
+		help="serve the Language Server Protocol over the standard input and output, ignoring the other options")
+	options = arguments.parse_args()
+	# the symbol table is only used by the semantic analysis
+	if options.symbol_stats and options.level == "syntax":
+		arguments.error("--symbol-stats needs the semantic analysis, not --level syntax")
+	return options
 
 
 def main():
+	options = parseArguments()
+	if options.lsp:
+		sys.exit(LanguageServer(sys.stdin.buffer, sys.stdout.buffer).serve())
+	diagnostics = Diagnostics(format=options.format, coalesce=options.coalesce, maxErrors=options.max_errors)
+
 	# submission code
-	FILE_NAME = input("Input the file name: ")
-	chario = Chario(FILE_NAME)	# link the input source file
-	scanner = Scanner(chario)
-	parser = Parser(chario, scanner)
-	# do syntax analysis
-	parser.subprogramBody()
+	FILE_NAME = options.source if options.source is not None else input("Input the file name: ")
+	if options.tokens:
+		# the tokens were scanned before: parse them straight from the token file
+		try:
+			tokenFile = TokenFile(FILE_NAME, diagnostics)
+		except TokenFileError as e:
+			sys.exit("E: " + str(e))
+		chario = tokenFile.chario
+	else:
+		# "-" reads the program from the rest of the standard input
+		chario = Chario(sys.stdin if FILE_NAME == "-" else FILE_NAME, diagnostics)	# link the input source file
+	table = None
+	try:
+		engine = RegexScanner if options.scanner == "regex" else Scanner
+		scanner = engine(chario)
+		if options.tokens:
+			scanner = tokenFile
+		elif options.write_tokens is not None:
+			TokenFile.Write(options.write_tokens, scanner, chario)
+			return
+		elif options.jobs is not None:
+			scanner = ParallelScanner(chario, jobs=options.jobs, scanner=engine).Tokenize()
+		elif options.bulk:
+			scanner = TokenBuffer.FromScanner(scanner)
+		parser = (IterativeParser if options.parser == "iterative" else Parser)(chario, scanner)
+		# do syntax analysis, then semantic analysis and the print calls on the syntax tree,
+		# up to the level asked: each pass only reads the tree of the ones before it
+		tree = parser.parse()
+		if options.level != "syntax":
+			# the statistics are printed only once the analysis has started
+			table = InstrumentedSymbolTable(chario, Analyzer.PRELUDE) if options.symbol_stats else None
+			Analyzer(chario, table).analyze(tree)
+		if options.level == "full":
+			Evaluator(diagnostics).evaluate(tree)
+	except ErrorLimitExceeded as e:
+		diagnostics.Note(str(e))
+	finally:
+		diagnostics.Flush()
+	if table is not None:
+		json.dump(table.statistics(), sys.stderr)
+		sys.stderr.write("\n")
 	
 	# DEV code
 	# FILE_NAME = "./sample_input/"	
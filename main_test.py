@@ -0,0 +1,96 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from Chario import Chario
+from Diagnostics import Diagnostics
+from Scanner import Scanner
+from RegexScanner import RegexScanner
+from ParallelScanner import ParallelScanner
+from TokenBuffer import TokenBuffer
+
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SAMPLES = os.path.join(DIRECTORY, "sample_input")
+
+# a string literal spanning lines, to be cut between chunks
+PROGRAM = 'procedure P is\nX : INTEGER;\nbegin\n' + 'X := 1;\nprint("A\n\nB");\n' * 50 + 'end P;\n'
+
+
+def check(*arguments):
+	"""
+	run main.py and return its standard output
+	"""
+	return subprocess.run([sys.executable, os.path.join(DIRECTORY, "main.py")] + list(arguments),
+		stdout=subprocess.PIPE, check=True, cwd=DIRECTORY).stdout
+
+
+def tokens(scanner):
+	return [(token.code, token.value, token.symbol, token.start, token.end) for token in scanner]
+
+
+class MainTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.sources = [os.path.join(SAMPLES, name) for name in sorted(os.listdir(SAMPLES))]
+		program = os.path.join(self.directory, "program.ada")
+		with open(program, "w") as file:
+			file.write(PROGRAM)
+		self.sources.append(program)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def testTokenSources(self):
+		tokenFile = os.path.join(self.directory, "program.tok")
+		for source in self.sources:
+			expected = check(source)
+			self.assertEqual(check("--bulk", source), expected, source)
+			for scanner in ("char", "regex"):
+				self.assertEqual(check("--scanner", scanner, "--jobs", "2", source), expected, source)
+			self.assertEqual(check("--scanner", "regex", "--parser", "iterative", source), expected, source)
+			check("--write-tokens", tokenFile, source)
+			self.assertEqual(check("--tokens", tokenFile), expected, source)
+
+	def testStandardInput(self):
+		with open(self.sources[-1], "rb") as file:
+			output = subprocess.run([sys.executable, os.path.join(DIRECTORY, "main.py"), "-"],
+				stdin=file, stdout=subprocess.PIPE, check=True, cwd=DIRECTORY).stdout
+		self.assertEqual(output, check(self.sources[-1]))
+
+	def testSymbolStats(self):
+		def run(*arguments):
+			return subprocess.run([sys.executable, os.path.join(DIRECTORY, "main.py")] + list(arguments),
+				stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=DIRECTORY)
+
+		process = run("--symbol-stats", self.sources[-1])
+		self.assertEqual(json.loads(process.stderr)["scopesEntered"], 1)
+		# the analysis stopped during the parse
+		errors = os.path.join(self.directory, "errors.ada")
+		with open(errors, "w") as file:
+			file.write("procedure P is\nbegin\nX := ;\nY := ;\nend P;\n")
+		process = run("--symbol-stats", "--max-errors", "1", errors)
+		self.assertEqual(process.returncode, 0)
+		self.assertEqual(process.stderr, b"")
+		self.assertEqual(run("--symbol-stats", "--level", "syntax", self.sources[-1]).returncode, 2)
+
+	def testChunks(self):
+		# small chunks cut the string literals, on one and on two processes
+		expected = tokens(Scanner(Chario.FromText(PROGRAM, Diagnostics(io.StringIO()))))
+		chario = Chario.FromText(PROGRAM, Diagnostics(io.StringIO()))
+		self.assertEqual(tokens(TokenBuffer.FromScanner(Scanner(chario))), expected)
+		for jobs in (1, 2):
+			for scanner in (Scanner, RegexScanner):
+				chario = Chario.FromText(PROGRAM, Diagnostics(io.StringIO()))
+				self.assertEqual(tokens(ParallelScanner(chario, jobs=jobs, chunkSize=16, scanner=scanner)),
+					expected, (jobs, scanner))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,48 @@
+import sys
+import tracemalloc
+
+from Const import Const
+from Token import Token
+from Chario import Chario
+from Scanner import Scanner
+from SymbolEntry import SymbolEntry
+from NameTable import NameTable
+
+
+def footprint(create, count):
+	"""
+	measure the memory allocated per object by creating count objects
+
+	Arguments:
+		create {function} -- creates one object from its index
+		count {int} -- how many objects to create
+
+	Returns:
+		[float] -- allocated bytes per object
+	"""
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	objects = [create(index) for index in range(count)]
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	# the list holding the objects is not a part of their footprint
+	return (after - before - sys.getsizeof(objects)) / len(objects)
+
+
+if __name__ == "__main__":
+	count = 100000
+	symbols = [NameTable.Intern("name" + str(index)) for index in range(count)]
+
+	print("Token: %.1f bytes per token" % footprint(
+		lambda index: Token(Const.ID, None, index, index + 1, symbol=symbols[index]), count))
+	print("SymbolEntry: %.1f bytes per entry" % footprint(
+		lambda index: SymbolEntry(symbols[index], SymbolEntry.VAR), count))
+
+	# tokens of a real source, held at once as a TokenBuffer-less parser would
+	FILE_NAME = sys.argv[1] if len(sys.argv) > 1 else "./sample_input/testcase1.ada"
+	chario = Chario(FILE_NAME)
+	tracemalloc.start()
+	tokens = list(Scanner(chario))
+	size = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	print("%s: %d tokens, %.1f bytes per token" % (FILE_NAME, len(tokens), size / len(tokens)))
@@ -0,0 +1,128 @@
+import io
+import os
+import unittest
+
+from Chario import Chario
+from Diagnostics import Diagnostics
+from Scanner import Scanner
+from RegexScanner import RegexScanner
+from Parser import Parser
+from IterativeParser import IterativeParser
+from Grammar import Grammar, TINYADA
+from AST import Node
+from Token import Token
+
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_input")
+
+# every construct of the grammar, without syntax errors
+PROGRAM = """procedure MAIN is
+	SIZE : constant := 2 ** 3;
+	type COLOR is (RED, GREEN, BLUE);
+	type INDEX is range 1..SIZE;
+	type TABLE is array(INDEX, INDEX) of INTEGER;
+	T : TABLE;
+	I, J : INTEGER;
+	C : COLOR;
+	procedure FILL(X : in INTEGER; Y : in out TABLE; Z : out BOOLEAN) is
+	begin
+		Y(1, 1) := X;
+		Z := not (X = 0) and X /= 1 and X >= -2;
+	end FILL;
+begin
+	I := -(1 + 2) * 3 mod 4 - SIZE / 2;
+	if I < 0 then
+		null;
+	elsif I <= 1 or I > 10 then
+		J := +I;
+	else
+		J := I;
+	end if;
+	while J < SIZE loop
+		J := J + 1;
+	end loop;
+	loop
+		exit when J > 10;
+		exit;
+	end loop;
+	FILL(I, T, C);
+	print("Done");
+end MAIN;
+"""
+
+# syntax errors the recovery has to resume from
+ERRORS = """procedure P is
+	X : INTEGER
+	Y : ;
+begin
+	X := (1 + ;
+	if X then null; end loop;
+	Y := 1 < 2 < 3;
+	while INIT(X, Y);
+	X := 1 and 2 or 3;
+end Q;
+"""
+
+
+def dump(node):
+	"""
+	a comparable form of a syntax tree
+	"""
+	if isinstance(node, Node):
+		return (type(node).__name__,) + tuple((field, dump(getattr(node, field)))
+			for cls in type(node).__mro__ for field in getattr(cls, "__slots__", ()) if field != "entry")
+	if isinstance(node, (list, tuple)):
+		return tuple(dump(item) for item in node)
+	return node
+
+
+def parse(parser, scanner, text):
+	"""
+	parse a program and return its tree and diagnostics
+	"""
+	chario = Chario.FromText(text, Diagnostics(io.StringIO()))
+	tree = parser(chario, scanner(chario)).parse()
+	return dump(tree), chario.diagnostics.records
+
+
+def programs():
+	yield "PROGRAM", PROGRAM
+	yield "ERRORS", ERRORS
+	for name in sorted(os.listdir(SAMPLES)):
+		with open(os.path.join(SAMPLES, name), encoding="utf-8") as file:
+			yield name, file.read()
+
+
+class ParserTest(unittest.TestCase):
+
+	def testScanners(self):
+		for name, text in programs():
+			scanned = []
+			for scanner in (Scanner, RegexScanner):
+				chario = Chario.FromText(text, Diagnostics(io.StringIO()))
+				scanned.append([(token.code, token.value, token.symbol, token.start, token.end)
+					for token in scanner(chario)])
+			self.assertEqual(scanned[0], scanned[1], name)
+
+	def testParsers(self):
+		for name, text in programs():
+			expected = parse(Parser, Scanner, text)
+			for parser in (Parser, IterativeParser):
+				for scanner in (Scanner, RegexScanner):
+					self.assertEqual(parse(parser, scanner, text), expected, (name, parser, scanner))
+
+	def testGrammar(self):
+		# every alternative is predicted by its own tokens
+		table = TINYADA.parseTable()
+		self.assertEqual(set(table), set(TINYADA.productions))
+		self.assertEqual(table["statement"][Token.IF], ("compoundStatement",))
+		self.assertEqual(table["statementTail"][Token.END], ())
+		with self.assertRaises(ValueError):
+			Grammar({"a": ((Token.ID,), (Token.ID, Token.COMMA))}, "a").parseTable()
+
+	def testNoErrors(self):
+		self.assertEqual(parse(Parser, Scanner, PROGRAM)[1], [])
+
+
+if __name__ == "__main__":
+	unittest.main()
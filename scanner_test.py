@@ -1,3 +1,4 @@
+from Const import Const
 from Token import Token
 from Chario import Chario
 from Scanner import Scanner
@@ -9,8 +10,9 @@ if __name__ == "__main__":
 	while True:
 		token = scanner.GetNextToken()
 		if token.value is not None:
-			print("token: " + token.code + " value: " + token.value)
+			print("token: " + Const.names[token.code] + " value: " + token.value)
 		else:
-			print("token: " + token.code)
-		if token.code == "EOF":
+			print("token: " + Const.names[token.code])
+		if token.code == Const.EOF:
 			break
+	chario.diagnostics.Flush()
@@ -0,0 +1,122 @@
+import io
+import unittest
+
+from Chario import Chario
+from Diagnostics import Diagnostics
+from NameTable import NameTable
+from SymbolEntry import SymbolEntry
+from SymbolTable import SymbolTable
+from InstrumentedSymbolTable import InstrumentedSymbolTable
+from Scanner import Scanner
+from Parser import Parser
+from Analyzer import Analyzer
+
+
+# a redefinition, an undefined name, and lookups from one, two and three scopes deep
+PROGRAM = """procedure P is
+	X : INTEGER;
+	X : BOOLEAN;
+	procedure Q is
+		Y : INTEGER;
+	begin
+		Y := X;
+	end Q;
+begin
+	X := Z;
+	Q;
+end P;
+"""
+
+X = NameTable.Intern("x")
+Y = NameTable.Intern("y")
+INTEGER = NameTable.Intern("integer")
+
+
+class SymbolTableTest(unittest.TestCase):
+
+	def setUp(self):
+		self.chario = Chario.FromText("", Diagnostics(io.StringIO()))
+		self.table = SymbolTable(self.chario, Analyzer.PRELUDE)
+		self.table.enterScope()
+
+	def errors(self):
+		return [record[1] for record in self.chario.diagnostics.records]
+
+	def testShadowing(self):
+		outer = self.table.enterSymbol(X, SymbolEntry.VAR)
+		self.table.enterScope()
+		inner = self.table.enterSymbol(X, SymbolEntry.CONST)
+		self.assertIs(self.table.findSymbol(X), inner)
+		self.table.exitScope()
+		self.assertIs(self.table.findSymbol(X), outer)
+		self.table.exitScope()
+		self.assertIsNone(self.table.findSymbol(X))
+		self.assertEqual(self.errors(), ["undefined identifier [x] was used"])
+
+	def testRedefinition(self):
+		first = self.table.enterSymbol(X, SymbolEntry.VAR)
+		self.assertIsNone(self.table.enterSymbol(X, SymbolEntry.VAR))
+		self.assertIs(self.table.findSymbol(X), first)
+		self.assertEqual(self.errors(), ["redefinition of already defined identifier [x]"])
+
+	def testPrelude(self):
+		integer = Analyzer.PRELUDE[INTEGER]
+		self.assertIs(self.table.findSymbol(INTEGER), integer)
+		self.table.enterScope()
+		shadow = self.table.enterSymbol(INTEGER, SymbolEntry.VAR)
+		self.assertIs(self.table.findSymbol(INTEGER), shadow)
+		self.table.exitScope()
+		self.assertIs(self.table.findSymbol(INTEGER), integer)
+
+		# a symbol entered into the outermost scope copies the shared prelude
+		table = SymbolTable(self.chario, Analyzer.PRELUDE)
+		table.enterSymbol(X, SymbolEntry.PROC)
+		self.assertNotIn(X, Analyzer.PRELUDE)
+		self.assertIs(table.findSymbol(INTEGER), integer)
+		self.assertEqual(self.errors(), [])
+
+	def testSnapshot(self):
+		x = self.table.enterSymbol(X, SymbolEntry.VAR)
+		snapshot = self.table.snapshot()
+		self.table.enterSymbol(Y, SymbolEntry.VAR)
+		self.table.enterScope()
+		self.table.enterSymbol(X, SymbolEntry.CONST)
+
+		for _ in range(2):
+			# a snapshot can be restored any number of times
+			self.table.restore(snapshot)
+			self.assertIs(self.table.findSymbol(X), x)
+			self.assertIsNone(self.table.findSymbol(Y))
+			self.table.enterSymbol(Y, SymbolEntry.CONST)
+		self.assertEqual(self.errors(), ["undefined identifier [y] was used"] * 2)
+
+	def testReset(self):
+		self.table.enterSymbol(X, SymbolEntry.VAR)
+		self.table.reset(self.chario)
+		self.assertIsNone(self.table.findSymbol(X))
+		self.assertIsNotNone(self.table.findSymbol(INTEGER))
+
+	def testStatistics(self):
+		chario = Chario.FromText(PROGRAM, Diagnostics(io.StringIO()))
+		table = InstrumentedSymbolTable(chario, Analyzer.PRELUDE)
+		Analyzer(chario, table).analyze(Parser(chario, Scanner(chario)).parse())
+		self.assertEqual(table.statistics(), {
+			"scopesEntered": 2,
+			"scopesExited": 2,
+			# the prelude, P and Q
+			"maxDepth": 3,
+			# Y in Q, then X and Q in P
+			"scopeSizes": [1, 2],
+			# the copied prelude with P
+			"openScopeSizes": [8],
+			"hits": 9,
+			"misses": 1,
+			"redefinitions": 1,
+			# Y, X and Q in P, and the names after "end";
+			# the types in P, X in Q and Z; INTEGER in Q
+			"scopesWalked": {"1": 5, "2": 4, "3": 1},
+		})
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Const import Const
+from Chario import Chario
+from Scanner import Scanner
+from TokenFile import TokenFile, TokenFileError
+
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_input")
+
+
+def fields(tokens):
+	return [(token.code, token.value, token.symbol, token.start, token.end) for token in tokens]
+
+
+class TokenFileTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.fileName = os.path.join(self.directory, "program.tok")
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def write(self, data):
+		with open(self.fileName, "wb") as file:
+			file.write(data)
+
+	def testRoundTrip(self):
+		for source in sorted(os.listdir(SAMPLES)):
+			chario = Chario(os.path.join(SAMPLES, source))
+			scanned = list(Scanner(chario))
+			count = TokenFile.Write(self.fileName, scanned, chario)
+			tokenFile = TokenFile(self.fileName)
+			self.assertEqual(count, len(tokenFile))
+			self.assertEqual(fields(tokenFile), fields(scanned))
+			self.assertEqual(list(tokenFile.chario.lineStarts), list(chario.lineStarts))
+			self.assertEqual(tokenFile.token(count - 1).code, Const.EOF)
+			del tokenFile
+
+	def testEmptyFile(self):
+		self.write(b"")
+		with self.assertRaisesRegex(TokenFileError, "not a token file"):
+			TokenFile(self.fileName)
+
+	def testNotATokenFile(self):
+		self.write(b"procedure P is begin null; end P;\n")
+		with self.assertRaisesRegex(TokenFileError, "not a token file"):
+			TokenFile(self.fileName)
+
+	def testTruncatedFile(self):
+		chario = Chario(b"procedure P is\n\tX : INTEGER;\nbegin\n\tX := 1;\nend P;\n")
+		TokenFile.Write(self.fileName, Scanner(chario), chario)
+		with open(self.fileName, "rb") as file:
+			data = file.read()
+		# cut in the records, in the line starts and in the pool
+		for size in (TokenFile.HEADER.size, TokenFile.HEADER.size + 5, len(data) - 20, len(data) - 1):
+			self.write(data[:size])
+			with self.assertRaisesRegex(TokenFileError, "truncated"):
+				TokenFile(self.fileName)
+
+
+if __name__ == "__main__":
+	unittest.main()